@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+导师合作图离线分析脚本
+计算合作影响力（PageRank）、连通分量与合作社区，并写回 tutors 集合
+
+使用方法：
+python analyze_coops.py run       计算并写回
+python analyze_coops.py dry-run   只计算，输出统计信息
+
+写回后递增 tutor_meta 版本；运行中的 API 无需重启，
+在 TUTOR_VERSIONS_REFRESH_INTERVAL 秒内重新加载导师数据版本时清空搜索/列表结果缓存并更新 ETag
+"""
+
+import sys
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.config.database import database_settings
+from app.services.coop_analytics import run_coop_analytics
+
+
+async def analyze(dry_run: bool) -> None:
+    """连接数据库并执行一次分析"""
+    client = AsyncIOMotorClient(database_settings.MONGO_URI)
+    db = client[database_settings.DB_NAME]
+    try:
+        stats = await run_coop_analytics(db, dry_run=dry_run)
+        for key, value in stats.items():
+            print(f"{key}: {value}")
+    finally:
+        client.close()
+
+
+def main() -> None:
+    """主函数"""
+    if len(sys.argv) < 2:
+        print("用法: python analyze_coops.py [command]")
+        print("\n命令:")
+        print("  run       计算并写回 influence_score / coop_component / coop_community")
+        print("  dry-run   只计算，不写回")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "run":
+        asyncio.run(analyze(dry_run=False))
+    elif command == "dry-run":
+        asyncio.run(analyze(dry_run=True))
+    else:
+        print(f"未知命令: {command}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,8 @@ router = APIRouter(
 )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+# 可选认证：未携带 token 时不报错，供登录/未登录均可访问的接口使用
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
 # 模拟微信API调用
 async def verify_wechat_code(code: str) -> dict:
@@ -93,6 +95,21 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     )
 
 
+async def get_optional_current_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Optional[User]:
+    """
+    获取当前登录用户（可选）
+    未携带 token 或 token 无效时返回 None，按未登录处理
+    """
+    if not token:
+        return None
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
+
+
 @router.post(
     "/login",
     summary="微信登录",
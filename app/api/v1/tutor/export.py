@@ -22,6 +22,7 @@ from app.utils import (
 )
 from app.utils.admin import get_current_admin as get_admin_user
 from app.db.mongo import get_db
+from app.crud.tutor_crud import live_tutor_filter
 
 router = APIRouter(
     prefix="/tutor",
@@ -52,12 +53,7 @@ async def get_tutors_data(
         导师数据列表
     """
     # 构建查询条件
-    query = {
-        "$or": [
-            {"is_deleted": {"$exists": False}},
-            {"is_deleted": False}
-        ]
-    }
+    query = live_tutor_filter()
     
     if keyword:
         query["$and"] = query.get("$and", [])
@@ -351,12 +347,7 @@ async def get_export_stats(
         db = get_db()
         
         # 构建查询条件
-        query = {
-            "$or": [
-                {"is_deleted": {"$exists": False}},
-                {"is_deleted": False}
-            ]
-        }
+        query = live_tutor_filter()
         
         if keyword:
             query["$and"] = query.get("$and", [])
@@ -3,25 +3,62 @@
 提供导师信息的查询和筛选功能
 """
 
-from fastapi import APIRouter, HTTPException, Request, Query
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Request, Response, Query, Depends
 from typing import List, Optional
 from datetime import datetime
 from urllib.parse import unquote
 
-from app.models import TutorBrief
+from app.models import TutorBrief, User
+from app.schemas import CountMode, TutorBatchFetchRequest
+from app.api.v1.auth.login import get_optional_current_user
 from app.utils import (
     success_response,
     error_response,
     business_error_response,
-    api_logger
+    api_logger,
+    decode_cursor,
+    build_cursor_filter,
+    cursor_sort,
+    next_cursor,
+    make_etag,
+    conditional_response,
+    parse_fieldset,
+    fieldset_projection
+)
+from app.db.mongo import get_db, find_page
+from app.crud.tutor_crud import (
+    live_tutor_filter,
+    TUTOR_BRIEF_PROJECTION,
+    TUTOR_LIST_FIELD_SOURCES
+)
+from app.services.tutor_index import tutor_search_index
+from app.services.tutor_pinyin import pinyin_conditions
+from app.services.suggestions import suggestion_engine
+from app.services.tutor_fuzzy import tutor_fuzzy_index
+from app.services.query_cache import query_cache
+from app.services.single_flight import tutor_query_flight
+from app.services.tutor_versions import tutor_versions
+from app.services.tutor_similarity import tutor_similarity_index
+from app.services.tutor_detail import (
+    DETAIL_FIELD_SOURCES,
+    collected_tutor_ids,
+    get_tutor_detail_cached,
+    load_tutor_batch
 )
-from app.db.mongo import get_db
 
 router = APIRouter(
     prefix="/tutor",
     tags=["tutor"]
 )
 
+# 缓存提示：客户端/CDN 可短暂复用，过期后携带 If-None-Match 重新验证
+LIST_CACHE_CONTROL = "public, max-age=30, must-revalidate"
+DETAIL_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+# 登录用户的详情包含个人收藏状态，只允许客户端缓存
+USER_DETAIL_CACHE_CONTROL = "private, max-age=60, must-revalidate"
+
 
 @router.get(
     "/list",
@@ -30,39 +67,55 @@ router = APIRouter(
 )
 async def get_tutor_list(
     request: Request,
+    response: Response,
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 nextCursor），传入后按游标翻页，page 仅为兼容保留"),
+    count: CountMode = Query(CountMode.EXACT, description="总数统计模式：exact(精确)/estimated(超过10000只返回10000+)/none(不计数)"),
     keyword: Optional[str] = Query(None, description="搜索关键词(姓名/研究方向)"),
     school: Optional[str] = Query(None, description="学校筛选"),
     department: Optional[str] = Query(None, description="学院筛选"),
-    city: Optional[str] = Query(None, description="城市筛选")
+    city: Optional[str] = Query(None, description="城市筛选"),
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔），如 id,name,school"),
+    exclude: Optional[str] = Query(None, description="不返回指定字段（逗号分隔），如 tags")
 ):
     """
     导师列表接口
     
+    导师数据版本未变化时直接返回 304
+    
     Args:
         request: 请求对象
+        response: 响应对象（写入缓存响应头）
         page: 页码
         page_size: 每页数量
+        cursor: 分页游标
+        count: 总数统计模式
         keyword: 搜索关键词
         school: 学校筛选
         department: 学院筛选
         city: 城市筛选
+        fields: 只返回的字段
+        exclude: 不返回的字段
     
     Returns:
         导师列表
     """
     try:
-        db = get_db()
-        tutors_coll = db.tutors
-
+        # 稀疏字段集：未请求的字段不从数据库读取
+        try:
+            fieldset = parse_fieldset(fields, exclude, TUTOR_LIST_FIELD_SOURCES)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=business_error_response(
+                    code="INVALID_FIELDS",
+                    message=str(e)
+                )
+            )
+        
         # 构建查询条件
-        query = {
-            "$or": [
-                {"is_deleted": {"$exists": False}},  # 没有is_deleted字段
-                {"is_deleted": False}  # 或者is_deleted为False
-            ]
-        }
+        query = live_tutor_filter()
         
         if keyword:
             # 兼容小程序可能传入的已 URL 编码形式（例如：%E5%BC%A0%E5%AD%90%E5%A8%81）
@@ -71,50 +124,119 @@ async def get_tutor_list(
                 # 只有在确实解码出中文等可见字符时才替换
                 if decoded != keyword:
                     keyword = decoded
+        
+        # 导师集合版本未变化时客户端缓存仍然有效，不执行查询
+        if tutor_versions.ready:
+            not_modified = conditional_response(
+                request,
+                response,
+                etag=make_etag("tutor_list", tutor_versions.token),
+                cache_control=LIST_CACHE_CONTROL,
+                last_modified=tutor_versions.last_modified
+            )
+            if not_modified:
+                return not_modified
+        
+        # 相同的规范化查询参数直接返回缓存结果
+        cache_key = query_cache.make_key(
+            "tutor_list",
+            page=page, page_size=page_size, cursor=cursor, count=count,
+            keyword=keyword, school=school, department=department, city=city,
+            fields=fieldset
+        )
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return success_response(data=cached, message="获取导师列表成功")
+        cache_version = query_cache.version
+        
+        # 优先使用内存倒排索引计算候选导师，索引未就绪或无法回答时回退到 $regex
+        candidate_ids = tutor_search_index.candidate_ids(
+            keyword=keyword,
+            keyword_fields=("name", "research_direction"),
+            school=school,
+            department=department,
+            city=city
+        )
+        
+        if candidate_ids is not None:
+            query["id"] = {"$in": list(candidate_ids)}
+        else:
+            if keyword:
+                # 搜索姓名或研究方向（字段名与当前 tutors 文档保持一致）
+                query["$and"] = [
+                    {
+                        "$or": [
+                            {"name": {"$regex": keyword, "$options": "i"}},
+                            {"direction": {"$regex": keyword, "$options": "i"}},
+                            *pinyin_conditions(keyword, ("name",))
+                        ]
+                    }
+                ]
             
-            # 搜索姓名或研究方向（字段名与当前 tutors 文档保持一致）
-            query["$and"] = [
-                {
-                    "$or": [
-                        {"name": {"$regex": keyword, "$options": "i"}},
-                        {"direction": {"$regex": keyword, "$options": "i"}},
-                    ]
-                }
-            ]
-        
-        if school:
-            # 导入的数据字段为 school，而不是 school_name
-            query["school"] = {"$regex": school, "$options": "i"}
-        
-        if department:
-            # 导入的数据字段为 department，而不是 department_name
-            query["department"] = {"$regex": department, "$options": "i"}
-        
-        if city:
-            query["city"] = {"$regex": city, "$options": "i"}
-        
-        # 计算分页
-        skip = (page - 1) * page_size
-        
-        # 获取总数（Motor 为异步接口）
-        total = await tutors_coll.count_documents(query)
-
-        # 获取数据（异步游标转列表）
-        cursor = tutors_coll.find(query).sort("created_at", -1).skip(skip).limit(page_size)
-        tutors = await cursor.to_list(length=page_size)
+            if school:
+                # 导入的数据字段为 school，而不是 school_name
+                query["school"] = {"$regex": school, "$options": "i"}
+            
+            if department:
+                # 导入的数据字段为 department，而不是 department_name
+                query["department"] = {"$regex": department, "$options": "i"}
+            
+            if city:
+                query["city"] = {"$regex": city, "$options": "i"}
+        
+        # 计算分页：传入游标时按 (created_at, id) 范围条件翻页，不再使用 skip
+        page_filter = None
+        if cursor:
+            try:
+                last_value, last_id = decode_cursor(cursor, "created_at", -1)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=business_error_response(
+                        code="INVALID_CURSOR",
+                        message=str(e)
+                    )
+                )
+            skip = 0
+            page_filter = build_cursor_filter("created_at", -1, last_value, last_id)
+        else:
+            skip = (page - 1) * page_size
+        
+        # 单次往返获取当前页数据和总数；索引确认没有匹配的导师时无需访问数据库
+        if candidate_ids is not None and not candidate_ids:
+            tutors, total, total_exact = [], (None if count == CountMode.NONE else 0), True
+        else:
+            # 并发的相同查询（同一数据版本）合并为一次数据库调用
+            tutors, total, total_exact = await tutor_query_flight.do(
+                (cache_key, cache_version),
+                lambda: find_page(
+                    "tutors",
+                    query,
+                    sort=cursor_sort("created_at", -1),
+                    skip=skip,
+                    limit=page_size,
+                    count_mode=count.value,
+                    page_filter=page_filter,
+                    projection=fieldset_projection(
+                        fieldset, TUTOR_LIST_FIELD_SOURCES, extra=("id", "created_at")
+                    ) or TUTOR_BRIEF_PROJECTION
+                )
+            )
         
         # 转换为响应模型
         tutor_list = []
         for tutor in tutors:
             tutor_brief = TutorBrief(
                 id=tutor["id"],
-                name=tutor["name"],
+                name=tutor.get("name", ""),
                 title=tutor.get("jobname") or tutor.get("title"),
                 school=tutor.get("school", ""),
                 department=tutor.get("department", ""),
                 tags=tutor.get("tags", []),
                 avatar=tutor.get("avatar"),
             )
+            if fieldset is not None:
+                tutor_brief = tutor_brief.model_dump(include=fieldset)
             tutor_list.append(tutor_brief)
         
         api_logger.info(
@@ -125,16 +247,23 @@ async def get_tutor_list(
             f"Request ID: {request.state.request_id}"
         )
         
+        data = {
+            "list": tutor_list,
+            "total": total,
+            "totalExact": total_exact,
+            "page": page,
+            "pageSize": page_size,
+            "nextCursor": next_cursor(tutors, page_size, "created_at", -1)
+        }
+        query_cache.set(cache_key, data, cache_version)
+        
         return success_response(
-            data={
-                "list": tutor_list,
-                "total": total,
-                "page": page,
-                "pageSize": page_size
-            },
+            data=data,
             message="获取导师列表成功"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         api_logger.error(
             f"获取导师列表失败: {str(e)}\n"
@@ -157,7 +286,11 @@ async def get_tutor_list(
 )
 async def get_tutor_detail(
     request: Request,
-    tutor_id: str
+    response: Response,
+    tutor_id: str,
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔），如 id,name,title,school,avatar"),
+    exclude: Optional[str] = Query(None, description="不返回指定字段（逗号分隔），如 coops,students,growthPath"),
+    current_user: Optional[User] = Depends(get_optional_current_user)
 ):
     """
     导师详情接口
@@ -171,28 +304,58 @@ async def get_tutor_detail(
     - 学生信息：指导的学生列表
     - 合作信息：合作者列表
     - 风险信息：风险提示
-    - 收藏状态：是否已被当前用户收藏
+    - 收藏状态：是否已被当前用户收藏（未登录时为 false）
+    
+    收藏状态与导师数据并发查询；未登录请求在导师未被修改时直接返回 304；
+    可通过 fields / exclude 只读取和返回需要的字段
     
     Args:
         request: 请求对象
+        response: 响应对象（写入缓存响应头）
         tutor_id: 导师ID
+        fields: 只返回的字段
+        exclude: 不返回的字段
+        current_user: 当前用户（可选）
     
     Returns:
         导师完整详细信息
     """
     try:
-        db = get_db()
+        try:
+            fieldset = parse_fieldset(fields, exclude, DETAIL_FIELD_SOURCES)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=business_error_response(
+                    code="INVALID_FIELDS",
+                    message=str(e)
+                )
+            )
         
-        # 获取导师基本信息（排除已删除的）
-        tutor = await db.tutors.find_one({
-            "id": tutor_id,
-            "$or": [
-                {"is_deleted": {"$exists": False}},
-                {"is_deleted": False}
-            ]
-        })
+        user_id = current_user.id if current_user else None
+        with_collected = fieldset is None or "is_collected" in fieldset
+        stamp = tutor_versions.tutor_stamp(tutor_id)
         
-        if not tutor:
+        # 未登录：导师修改时间未变化时客户端缓存仍然有效，不执行查询
+        if stamp is not None and user_id is None:
+            not_modified = conditional_response(
+                request,
+                response,
+                etag=make_etag("tutor_detail", tutor_id, stamp),
+                cache_control=DETAIL_CACHE_CONTROL,
+                last_modified=stamp,
+                vary="Authorization"
+            )
+            if not_modified:
+                return not_modified
+        
+        # 导师详情（优先读详情缓存）与收藏状态（命中 favorites 复合索引）并发查询
+        loaded, collected = await asyncio.gather(
+            get_tutor_detail_cached(tutor_id, fieldset),
+            collected_tutor_ids(user_id if with_collected else None, [tutor_id])
+        )
+        
+        if loaded is None:
             raise HTTPException(
                 status_code=404,
                 detail=business_error_response(
@@ -200,105 +363,27 @@ async def get_tutor_detail(
                     message="导师不存在或已被删除"
                 )
             )
+        detail_data, paper_records, project_records = loaded
+        if with_collected:
+            # 缓存中的详情为所有用户共享，复制后再写入个人收藏状态
+            detail_data = {**detail_data, "is_collected": tutor_id in collected}
         
-        # 获取导师详细信息（从tutor_details表）
-        tutor_detail = await db.tutor_details.find_one({"tutor_id": tutor_id})
-        
-        # 获取论文列表（从papers表）
-        papers_cursor = db.papers.find({"tutor_id": tutor_id}).sort("year", -1)
-        papers = await papers_cursor.to_list(length=100)
-        papers_list = [
-            {
-                "id": paper["id"],
-                "title": paper.get("title"),
-                "authors": paper.get("authors", []),
-                "journal": paper.get("journal"),
-                "year": paper.get("year"),
-                "doi": paper.get("doi"),
-                "abstract": paper.get("abstract"),
-                "citations": paper.get("citations", 0),
-                "url": paper.get("url")
-            }
-            for paper in papers
-        ]
-        
-        # 获取项目列表（从projects表）
-        projects_cursor = db.projects.find({"tutor_id": tutor_id}).sort("start_date", -1)
-        projects = await projects_cursor.to_list(length=50)
-        projects_list = [
-            {
-                "id": project["id"],
-                "title": project.get("title"),
-                "funding": project.get("funding"),
-                "start_date": project.get("start_date"),
-                "end_date": project.get("end_date"),
-                "description": project.get("description"),
-                "amount": project.get("amount"),
-                "status": project.get("status", "ongoing")
-            }
-            for project in projects
-        ]
-        
-        # 构建完整的响应数据 - 使用与导入数据一致的字段名
-        detail_data = {
-            # 基本信息
-            "id": tutor["id"],
-            "name": tutor["name"],
-            "title": tutor.get("jobname") or tutor.get("title"),
-            "school": tutor.get("school", ""),
-            "school_id": tutor.get("school_id"),
-            "department": tutor.get("department", ""),
-            "department_id": tutor.get("department_id"),
-            "avatar": tutor.get("avatar"),
-            "bio": tutor.get("bio"),
-            "achievements": tutor.get("achievements"),
-            
-            # 联系方式
-            "email": tutor.get("email"),
-            "phone": tutor.get("phone"),
-            "personal_page": tutor.get("personal_page"),
-            
-            # 研究信息
-            "research_direction": tutor.get("direction"),
-            "direction": tutor.get("direction"),
-            "tags": tutor.get("tags", []),
-            "guidance": tutor.get("guidance"),
-            
-            # 统计信息
-            "paper_count": len(tutor.get("coops", [])),  # 合作信息中包含论文
-            "project_count": len([c for c in tutor.get("coops", []) if c.get("tag") == "项目"]),
-            "student_count": len(tutor.get("students", [])),
-            
-            # 学术成果/合作信息（从tutors集合的coops字段）
-            "coops": tutor.get("coops", []),
-            "papers": [c for c in tutor.get("coops", []) if c.get("tag") == "论文"],
-            "projects": [c for c in tutor.get("coops", []) if c.get("tag") == "项目"],
-            
-            # 学生信息
-            "students": tutor.get("students", []),
-            
-            # 社交/服务信息
-            "socials": tutor.get("socials", []),
-            "service": tutor.get("service"),
-            
-            # 成长路径
-            "growthPath": tutor.get("growthPath", []),
-            
-            # 风险信息
-            "risks": tutor.get("risks", []),
-            
-            # 其他信息
-            "created_at": tutor.get("created_at"),
-            "updated_at": tutor.get("updated_at"),
-            "crawled_at": tutor.get("crawled_at"),
-            
-            # 收藏状态（未登录用户默认未收藏）
-            "is_collected": False
-        }
+        # 登录用户：ETag 包含用户与收藏状态，收藏变化后客户端缓存随之失效；
+        # 收藏变化不会更新导师修改时间，因此不使用 Last-Modified
+        if stamp is not None and user_id is not None:
+            not_modified = conditional_response(
+                request,
+                response,
+                etag=make_etag("tutor_detail", tutor_id, stamp, user_id, tutor_id in collected),
+                cache_control=USER_DETAIL_CACHE_CONTROL,
+                vary="Authorization"
+            )
+            if not_modified:
+                return not_modified
         
         api_logger.info(
-            f"获取导师详情成功: {tutor_id} - {tutor['name']}\n"
-            f"论文数: {len(papers_list)}, 项目数: {len(projects_list)}\n"
+            f"获取导师详情成功: {tutor_id}\n"
+            f"论文数: {paper_records}, 项目数: {project_records}\n"
             f"Request ID: {request.state.request_id}"
         )
         
@@ -324,6 +409,174 @@ async def get_tutor_detail(
         )
 
 
+@router.post(
+    "/batch",
+    summary="批量获取导师",
+    description="按ID批量获取导师卡片信息（最多200个），按输入顺序返回并附带当前用户的收藏状态",
+)
+async def get_tutor_batch(
+    request: Request,
+    batch_request: TutorBatchFetchRequest,
+    current_user: Optional[User] = Depends(get_optional_current_user)
+):
+    """
+    批量获取导师接口
+    
+    用于卡片列表、导师对比等场景，一次 $in 查询读取全部导师，
+    收藏状态与导师数据并发查询；未登录时 is_collected 均为 false
+    
+    Args:
+        request: 请求对象
+        batch_request: 批量获取请求（导师ID列表、可选字段集）
+        current_user: 当前用户（可选）
+    
+    Returns:
+        list: 按输入顺序排列的导师数据
+        missing: 不存在或已删除的导师ID
+    """
+    try:
+        try:
+            fieldset = parse_fieldset(
+                batch_request.fields, None, DETAIL_FIELD_SOURCES,
+                required=("id", "is_collected")
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=business_error_response(
+                    code="INVALID_FIELDS",
+                    message=str(e)
+                )
+            )
+        
+        tutor_ids = batch_request.tutor_ids
+        items, missing = await load_tutor_batch(
+            tutor_ids,
+            fieldset,
+            user_id=current_user.id if current_user else None
+        )
+        
+        api_logger.info(
+            f"批量获取导师成功: 请求 {len(tutor_ids)} 个, 返回 {len(items)} 个\n"
+            f"Request ID: {request.state.request_id}"
+        )
+        
+        return success_response(
+            data={
+                "list": items,
+                "missing": missing
+            },
+            message="批量获取导师成功"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_logger.error(
+            f"批量获取导师失败: {str(e)}\n"
+            f"Request ID: {request.state.request_id}"
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(
+                message="批量获取导师失败",
+                error={"request_id": request.state.request_id}
+            )
+        )
+
+
+@router.get(
+    "/{tutor_id}/similar",
+    summary="相似导师",
+    description="按标签、研究方向与合作记录标签的 Jaccard 相似度返回最相似的导师（MinHash/LSH 索引）",
+)
+async def get_similar_tutors(
+    request: Request,
+    tutor_id: str,
+    limit: int = Query(10, ge=1, le=50, description="返回数量"),
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔"),
+    current_user: Optional[User] = Depends(get_optional_current_user)
+):
+    """
+    相似导师接口
+    
+    候选导师由内存中的 LSH 索引给出（不访问数据库），
+    只有最终结果通过一次批量查询读取卡片信息
+    
+    Args:
+        request: 请求对象
+        tutor_id: 导师ID
+        limit: 返回数量
+        fields: 稀疏字段集
+        current_user: 当前用户（可选）
+    
+    Returns:
+        list: 相似导师（附 similarity 相似度与 common_tags 共同标签），按相似度降序
+    """
+    try:
+        try:
+            fieldset = parse_fieldset(
+                fields, None, DETAIL_FIELD_SOURCES,
+                required=("id", "is_collected")
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=business_error_response(
+                    code="INVALID_FIELDS",
+                    message=str(e)
+                )
+            )
+        
+        if not tutor_similarity_index.ready:
+            raise HTTPException(
+                status_code=503,
+                detail=business_error_response(
+                    code="INDEX_NOT_READY",
+                    message="相似导师索引正在构建，请稍后再试"
+                )
+            )
+        
+        similar = tutor_similarity_index.similar(tutor_id, limit=limit)
+        if similar is None:
+            raise HTTPException(
+                status_code=404,
+                detail=business_error_response(
+                    code="TUTOR_NOT_FOUND",
+                    message="导师不存在"
+                )
+            )
+        
+        items, _ = await load_tutor_batch(
+            [other for other, _, _ in similar],
+            fieldset,
+            user_id=current_user.id if current_user else None
+        )
+        scores = {other: (score, common) for other, score, common in similar}
+        for item in items:
+            item["similarity"], item["common_tags"] = scores[item["id"]]
+        
+        return success_response(
+            data={"list": items},
+            message="获取相似导师成功"
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_logger.error(
+            f"获取相似导师失败: {str(e)}, tutor: {tutor_id}\n"
+            f"Request ID: {request.state.request_id}"
+        )
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(
+                message="获取相似导师失败",
+                error={"request_id": request.state.request_id}
+            )
+        )
+
+
 @router.get(
     "/search/suggestions",
     summary="搜索建议",
@@ -346,22 +599,32 @@ async def get_search_suggestions(
         搜索建议列表
     """
     try:
-        db = get_db()
-        
         if not keyword:
             return success_response(
                 data={"suggestions": []},
                 message="获取搜索建议成功"
             )
         
+        # 优先使用内存前缀索引，不访问数据库；前缀没有命中时返回编辑距离相近的纠错建议
+        suggestions = suggestion_engine.suggest(keyword, field, limit=10)
+        if suggestions is not None:
+            if not suggestions:
+                suggestions = tutor_fuzzy_index.suggest(keyword, field, limit=10)
+            return success_response(
+                data={"suggestions": suggestions},
+                message="获取搜索建议成功"
+            )
+        
+        # 索引尚未就绪时回退到数据库查询
+        db = get_db()
         suggestions = []
         
         if field in ["all", "name"]:
             # 获取姓名建议
-            name_suggestions = db.tutors.find(
-                {"name": {"$regex": keyword, "$options": "i"}},
+            name_suggestions = await db.tutors.find(
+                live_tutor_filter({"name": {"$regex": keyword, "$options": "i"}}),
                 {"name": 1}
-            ).limit(5)
+            ).limit(5).to_list(length=5)
             
             for s in name_suggestions:
                 suggestions.append({
@@ -372,10 +635,10 @@ async def get_search_suggestions(
         
         if field in ["all", "school"]:
             # 获取学校建议
-            school_suggestions = db.schools.find(
+            school_suggestions = await db.schools.find(
                 {"name": {"$regex": keyword, "$options": "i"}},
                 {"name": 1}
-            ).limit(3)
+            ).limit(3).to_list(length=3)
             
             for s in school_suggestions:
                 suggestions.append({
@@ -386,10 +649,10 @@ async def get_search_suggestions(
         
         if field in ["all", "department"]:
             # 获取学院建议
-            department_suggestions = db.departments.find(
+            department_suggestions = await db.departments.find(
                 {"name": {"$regex": keyword, "$options": "i"}},
                 {"name": 1}
-            ).limit(3)
+            ).limit(3).to_list(length=3)
             
             for s in department_suggestions:
                 suggestions.append({
@@ -24,7 +24,14 @@ from app.utils import (
     api_logger
 )
 from app.utils.admin import get_current_admin
-from app.db.mongo import find_one, insert_one, update_one, delete_one, get_collection
+from app.crud.tutor_crud import new_tutor_document
+from app.db.mongo import find_one, insert_one, update_one, delete_one, get_collection, get_db
+from app.services.tutor_events import publish_tutor_change
+from app.services.tutor_pinyin import pinyin_fields
+from app.services.query_cache import query_cache
+from app.services.single_flight import tutor_query_flight
+from app.services.tutor_detail import tutor_detail_cache
+from app.services.tutor_index import tutor_search_index
 
 router = APIRouter(
     prefix="/tutor",
@@ -60,8 +67,8 @@ async def create_tutor(
         # 生成导师ID
         tutor_id = f"tutor_{uuid.uuid4().hex[:12]}"
         
-        # 构建导师基本信息
-        tutor_doc = {
+        # 构建导师基本信息（补齐 is_deleted 等必填默认值）
+        tutor_doc = new_tutor_document({
             "id": tutor_id,
             "name": tutor_data.name,
             "school_name": tutor_data.school,
@@ -74,10 +81,16 @@ async def create_tutor(
             "personal_page_url": tutor_data.personal_page_url,
             "bio": tutor_data.bio,
             "tags": tutor_data.tags,
+            # 姓名/学校/院系的拼音检索键
+            **pinyin_fields({
+                "name": tutor_data.name,
+                "school": tutor_data.school,
+                "department": tutor_data.department
+            }),
             "created_at": datetime.now(),
             "updated_at": datetime.now(),
             "created_by": current_admin.id  # 记录创建者
-        }
+        })
         
         # 插入导师基本信息
         result = await insert_one("tutors", tutor_doc)
@@ -132,6 +145,9 @@ async def create_tutor(
             if projects_to_insert:
                 await projects_collection.insert_many(projects_to_insert)
         
+        # 通知内存索引/缓存增量更新
+        await publish_tutor_change([tutor_id])
+        
         # 查询完整的导师信息（包括论文和项目）
         created_tutor = await get_tutor_with_details(tutor_id)
         
@@ -266,6 +282,14 @@ async def update_tutor(
         
         # 更新导师基本信息
         if update_data:
+            # 同步更新被修改字段的拼音检索键
+            update_data.update(pinyin_fields({
+                field: value for field, value in (
+                    ("name", tutor_data.name),
+                    ("school", tutor_data.school),
+                    ("department", tutor_data.department)
+                ) if value is not None
+            }))
             update_data["updated_at"] = datetime.now()
             update_data["updated_by"] = current_admin.id  # 记录更新者
             
@@ -331,6 +355,9 @@ async def update_tutor(
                     await projects_collection.insert_many(projects_to_insert)
             updated_fields.append("projects")
         
+        # 通知内存索引/缓存增量更新
+        await publish_tutor_change([tutor_id])
+        
         # 查询更新后的导师信息
         updated_tutor = await get_tutor_with_details(tutor_id)
         
@@ -441,6 +468,9 @@ async def delete_tutor(
                 )
             )
         
+        # 通知内存索引/缓存增量更新
+        await publish_tutor_change([tutor_id])
+        
         api_logger.info(
             f"导师信息软删除成功: {tutor_id} - {existing_tutor['name']}\n"
             f"删除者: {current_admin.id} - {current_admin.nickname}\n"
@@ -500,6 +530,7 @@ async def batch_delete_tutors(
         success_count = 0
         failed_count = 0
         failed_ids = []
+        succeeded_ids = []
         
         for tutor_id in tutor_ids:
             try:
@@ -528,6 +559,7 @@ async def batch_delete_tutors(
                 
                 if success:
                     success_count += 1
+                    succeeded_ids.append(tutor_id)
                 else:
                     failed_count += 1
                     failed_ids.append(tutor_id)
@@ -537,6 +569,9 @@ async def batch_delete_tutors(
                 failed_count += 1
                 failed_ids.append(tutor_id)
         
+        # 通知内存索引/缓存增量更新
+        await publish_tutor_change(succeeded_ids)
+        
         api_logger.info(
             f"批量软删除导师: 成功{success_count}个，失败{failed_count}个\n"
             f"管理员: {current_admin.id} - {current_admin.nickname}\n"
@@ -614,6 +649,7 @@ async def batch_update_tutors(
         success_count = 0
         failed_count = 0
         failed_ids = []
+        succeeded_ids = []
         
         # 构建更新数据
         update_data = {}
@@ -654,6 +690,7 @@ async def batch_update_tutors(
                 
                 if success:
                     success_count += 1
+                    succeeded_ids.append(tutor_id)
                 else:
                     failed_count += 1
                     failed_ids.append(tutor_id)
@@ -663,6 +700,9 @@ async def batch_update_tutors(
                 failed_count += 1
                 failed_ids.append(tutor_id)
         
+        # 通知内存索引/缓存增量更新
+        await publish_tutor_change(succeeded_ids)
+        
         api_logger.info(
             f"批量修改导师: 成功{success_count}个，失败{failed_count}个\n"
             f"管理员: {current_admin.id} - {current_admin.nickname}\n"
@@ -764,6 +804,9 @@ async def restore_tutor(
                 )
             )
         
+        # 通知内存索引/缓存增量更新
+        await publish_tutor_change([tutor_id])
+        
         api_logger.info(
             f"导师信息恢复成功: {tutor_id} - {existing_tutor['name']}\n"
             f"恢复者: {current_admin.id} - {current_admin.nickname}\n"
@@ -797,6 +840,73 @@ async def restore_tutor(
         )
 
 
+@router.get(
+    "/admin/query-stats",
+    summary="导师查询缓存统计（管理员）",
+    description="查看结果缓存、详情缓存命中情况与并发相同查询的合并情况"
+)
+async def get_query_stats(
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    导师查询缓存统计接口（管理员权限）
+    
+    Args:
+        current_admin: 当前管理员用户
+    
+    Returns:
+        结果缓存、详情缓存与查询合并统计
+    """
+    return success_response(
+        message="获取查询统计成功",
+        data={
+            "cache": query_cache.stats(),
+            "detail_cache": tutor_detail_cache.stats(),
+            "single_flight": tutor_query_flight.stats()
+        }
+    )
+
+
+@router.post(
+    "/admin/synonyms/reload",
+    summary="重新加载同义词词典（管理员）",
+    description="修改 tutor_synonyms 集合后重新加载同义词词典并重建导师检索索引"
+)
+async def reload_synonyms(
+    request: Request,
+    current_admin: User = Depends(get_current_admin)
+):
+    """
+    重新加载同义词词典接口（管理员权限）
+    
+    同义词在构建索引时编译进倒排表，词典变更后需要重建索引；
+    重建期间查询继续使用旧索引，完成后清空结果缓存
+    
+    Args:
+        request: 请求对象
+        current_admin: 当前管理员用户
+    
+    Returns:
+        同义词组数量与已索引的导师数量
+    """
+    await tutor_search_index.build(get_db())
+    query_cache.invalidate()
+    
+    api_logger.info(
+        f"重新加载同义词词典: {tutor_search_index.synonym_groups} 个同义词组\n"
+        f"Admin: {current_admin.id}\n"
+        f"Request ID: {request.state.request_id}"
+    )
+    
+    return success_response(
+        message="重新加载同义词词典成功",
+        data={
+            "synonym_groups": tutor_search_index.synonym_groups,
+            "indexed_tutors": tutor_search_index.size
+        }
+    )
+
+
 async def get_tutor_with_details(tutor_id: str) -> dict:
     """
     获取导师完整信息（包括论文和项目）
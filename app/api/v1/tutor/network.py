@@ -1,12 +1,11 @@
 """
 导师学术关系图谱接口
-基于数据库中的真实coops数据生成合作关系网络
+基于数据库中的真实coops数据生成合作关系网络（合作者读取内存中的合作图）
 """
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import List, Dict, Any
 from collections import defaultdict
-import random
 
 from app.utils import (
     success_response,
@@ -14,13 +13,29 @@ from app.utils import (
     business_error_response,
     api_logger
 )
+from app.utils.http_cache import make_etag, conditional_response
 from app.db.mongo import get_db
+from app.services.coop_graph import (
+    EXPAND_MAX_NODES,
+    PATH_MAX_DEPTH,
+    coop_graph,
+    load_pair_weights
+)
+from app.services.tutor_versions import tutor_versions
+from app.services.tutor_similarity import tutor_similarity_index
+from app.crud.tutor_crud import live_tutor_filter
 
 router = APIRouter(
     prefix="/tutor",
     tags=["tutor", "network"]
 )
 
+# 关系图谱的 HTTP 缓存策略（内容只随导师数据与合作图变化）
+NETWORK_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+# 论文类合作记录的 type
+PAPER_COOP_TYPE = "paper"
+
 
 @router.get(
     "/network/{tutor_id}",
@@ -29,25 +44,42 @@ router = APIRouter(
 )
 async def get_tutor_network(
     request: Request,
+    response: Response,
     tutor_id: str
 ):
     """
     导师学术关系图谱接口
     
     生成逻辑：
-    1. 从coops集合查找当前导师参与的合作
+    1. 从合作图读取当前导师的合作者（按共同合作记录数降序，O(度数) 且不访问数据库）
     2. 提取该导师的真实coops记录作为"合作内容"
-    3. 基于相同研究领域/学校/标签，从其他导师中找"潜在合作者"
-    4. 构建合作关系网络
+    3. 合作者不足时，从相似导师索引（标签/研究方向/合作标签的 Jaccard 相似度）中补充"潜在合作者"
+    4. 仍然不足时从同校导师中补充
+    5. 构建合作关系网络（合作次数为按合作类型统计的真实共同合作记录数）
     
     Args:
         request: 请求对象
+        response: 响应对象（写入缓存响应头）
         tutor_id: 导师ID (如: tutor_Ziwei_Zhang)
     
     Returns:
         合作关系网络数据
     """
     try:
+        # 导师数据、合作图与相似导师索引均未变化时客户端缓存仍然有效，不执行查询
+        if coop_graph.ready and tutor_versions.ready:
+            not_modified = conditional_response(
+                request,
+                response,
+                etag=make_etag(
+                    "tutor_network", tutor_id, tutor_versions.token,
+                    coop_graph.version, tutor_similarity_index.version
+                ),
+                cache_control=NETWORK_CACHE_CONTROL
+            )
+            if not_modified:
+                return not_modified
+        
         db = get_db()
         tutors_coll = db.tutors
         coops_coll = db.coops
@@ -69,55 +101,34 @@ async def get_tutor_network(
                 )
             )
         
-        # 2. 获取当前导师的真实coops记录
-        my_coops = await coops_coll.find(
-            {"members.id": tutor_id}
-        ).to_list(length=100)
-        
-        # 3. 提取我的研究领域标签（从coops和tutor记录）
-        my_tags = set()
-        my_tags.update(center_tutor.get("tags", []))
-        my_direction = center_tutor.get("direction", "")
-        
-        for coop in my_coops:
-            my_tags.update(coop.get("tags", []))
-            my_tags.add(coop.get("type_cn", ""))
-            my_tags.add(coop.get("core_area", ""))
-        
-        # 4. 找潜在合作者（基于相同标签/学校/研究方向）
-        # 策略：找有相似coops的其他导师
         potential_collabs = []
         
-        # 方法A: 找有相同类型coops的导师
-        for coop in my_coops[:5]:  # 最多取5条我的coops
-            coop_type = coop.get("type", "")
-            coop_tags = coop.get("tags", [])
-            
-            # 找相同类型的其他coops
-            similar_coops = await coops_coll.find({
-                "members.id": {"$ne": tutor_id},  # 不包含我
-                "$or": [
-                    {"type": coop_type},
-                    {"tags": {"$in": coop_tags}},
-                ]
-            }).limit(10).to_list(length=10)
-            
-            for sc in similar_coops:
-                for member in sc.get("members", []):
-                    member_id = member.get("id")
-                    if member_id and member_id != tutor_id:
-                        potential_collabs.append({
-                            "id": member_id,
-                            "name": member.get("name", "未知"),
-                            "school": member.get("school", ""),
-                            "department": member.get("department", ""),
-                            "jobname": member.get("jobname", ""),
-                            "avatar": member.get("avatar"),
-                            "common_type": coop_type,
-                            "relation_basis": f"共同{coop.get('type_cn', '研究')}领域"
-                        })
+        if coop_graph.ready:
+            # 2. 合作图中的真实合作者与合作记录摘要
+            my_coops = coop_graph.coops_of(tutor_id)
+            for collab_id, weight in coop_graph.neighbors(tutor_id, limit=8):
+                info = coop_graph.node_info(collab_id)
+                potential_collabs.append({
+                    "id": collab_id,
+                    "name": info.get("name", "未知"),
+                    "school": info.get("school", ""),
+                    "department": info.get("department", ""),
+                    "jobname": info.get("jobname", ""),
+                    "avatar": info.get("avatar"),
+                    "common_type": "共同合作",
+                    "relation_basis": f"共同参与{weight}项合作"
+                })
+        else:
+            my_coops = await _load_my_coops(coops_coll, tutor_id)
         
-        # 方法B: 如果方法A找到的不够，从同校导师中补充
+        # 方法A: 合作者不够时，补充研究领域最相似的导师
+        if len(potential_collabs) < 3:
+            if tutor_similarity_index.ready:
+                await _find_similar_tutors(tutors_coll, tutor_id, potential_collabs)
+            elif not coop_graph.ready:
+                await _find_similar_coop_members(coops_coll, tutor_id, my_coops, potential_collabs)
+        
+        # 方法B: 如果合作者不够，从同校导师中补充
         if len(potential_collabs) < 3:
             same_school_tutors = await tutors_coll.find({
                 "id": {"$ne": tutor_id},
@@ -146,17 +157,24 @@ async def get_tutor_network(
                 if len(unique_collabs) >= 8:  # 最多8个合作者
                     break
         
-        # 5. 为每个合作者生成"合作内容"
+        # 5. 为每个合作者填充"合作内容"（按合作类型的共同合作记录数）
+        pair_weights = None if coop_graph.ready else await load_pair_weights(db, tutor_id)
         collaborators = []
         for collab in unique_collabs[:6]:  # 最多显示6个
-            # 随机生成合作论文/项目数
-            papers_count = random.randint(1, 5)
-            projects_count = random.randint(0, 2)
+            if pair_weights is None:
+                coop_types = coop_graph.pair_weights(tutor_id, collab["id"])
+                shared_coops = coop_graph.shared_coops(tutor_id, collab["id"])
+            else:
+                coop_types = pair_weights.get(tuple(sorted((tutor_id, collab["id"]))), {})
+                shared_coops = []
             
-            # 从我的coops中选几条作为代表作
-            my_coops_sample = my_coops[:3] if my_coops else []
-            projects = [c.get("title_cn") or c.get("title", "合作项目") 
-                       for c in my_coops_sample if c.get("type_cn") == "论文" or c.get("type") == "paper"][:2]
+            # 优先展示共同参与的合作记录（论文在前），没有时从我的coops中选几条作为代表作
+            shared_coops.sort(key=lambda c: c.get("type") != PAPER_COOP_TYPE)
+            projects = [c["title"] for c in shared_coops if c.get("title")][:2]
+            if not projects:
+                my_coops_sample = my_coops[:3] if my_coops else []
+                projects = [c.get("title") or "合作项目"
+                           for c in my_coops_sample if c.get("type_cn") == "论文" or c.get("type") == PAPER_COOP_TYPE][:2]
             
             if not projects:
                 projects = ["联合研究项目"]
@@ -168,9 +186,10 @@ async def get_tutor_network(
                 "school": collab["school"],
                 "department": collab["department"],
                 "relation": collab.get("relation_basis", "学术合作"),
-                "papers": papers_count,
+                "papers": coop_types.get(PAPER_COOP_TYPE, 0),
                 "projects": projects,
-                "coop_count": papers_count + projects_count
+                "coop_count": sum(coop_types.values()),
+                "coop_types": coop_types
             })
         
         # 6. 计算布局位置（根据合作者数量选择布局）
@@ -214,6 +233,253 @@ async def get_tutor_network(
         )
 
 
+def _require_graph() -> None:
+    """合作图尚未构建完成时返回 503（多跳查询不回退到数据库）"""
+    if not coop_graph.ready:
+        raise HTTPException(
+            status_code=503,
+            detail=business_error_response(
+                code="GRAPH_NOT_READY",
+                message="合作关系图正在构建，请稍后再试"
+            )
+        )
+
+
+def _graph_node(tutor_id: str, **extra: Any) -> Dict[str, Any]:
+    """合作图节点的展示信息"""
+    info = coop_graph.node_info(tutor_id)
+    return {
+        "id": tutor_id,
+        "name": info.get("name", "未知"),
+        "school": info.get("school", ""),
+        "department": info.get("department", ""),
+        "jobname": info.get("jobname", ""),
+        "avatar": info.get("avatar"),
+        **extra
+    }
+
+
+@router.get(
+    "/network/{tutor_id}/expand",
+    summary="导师多跳合作关系",
+    description="在内存合作图上做有界广度优先扩展，返回 N 跳以内的合作者与合作关系",
+)
+async def expand_tutor_network(
+    request: Request,
+    tutor_id: str,
+    hops: int = Query(2, ge=1, le=3, description="扩展跳数"),
+    limit: int = Query(100, ge=1, le=EXPAND_MAX_NODES, description="最多返回的导师数（含中心导师）")
+):
+    """
+    导师多跳合作关系接口
+    
+    每个导师只展开合作次数最多的若干位合作者，节点数与耗时达到预算即停止，
+    截断时 truncated 为 true
+    
+    Args:
+        request: 请求对象
+        tutor_id: 导师ID
+        hops: 扩展跳数（1-3）
+        limit: 最多返回的导师数
+    
+    Returns:
+        nodes（含跳数 hop）、edges（source/target/weight）
+    """
+    try:
+        _require_graph()
+        result = coop_graph.expand(tutor_id, hops, max_nodes=limit)
+        if result is None:
+            # 导师存在但没有任何合作记录时只返回中心导师
+            tutor = await get_db().tutors.find_one(
+                {"id": tutor_id},
+                {"_id": 0, "id": 1, "name": 1, "school": 1, "department": 1, "jobname": 1, "avatar": 1}
+            )
+            if not tutor:
+                raise HTTPException(
+                    status_code=404,
+                    detail=business_error_response(
+                        code="TUTOR_NOT_FOUND",
+                        message="导师不存在"
+                    )
+                )
+            result = {"nodes": [], "edges": [], "truncated": False}
+            nodes = [{**tutor, "hop": 0}]
+        else:
+            nodes = [_graph_node(node_id, hop=hop) for node_id, hop in result["nodes"]]
+        
+        return success_response(
+            data={
+                "center_id": tutor_id,
+                "hops": hops,
+                "nodes": nodes,
+                "edges": [
+                    {"source": source, "target": target, "weight": weight}
+                    for source, target, weight in result["edges"]
+                ],
+                "truncated": result["truncated"]
+            },
+            message="获取多跳合作关系成功"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_logger.error(f"获取多跳合作关系失败: {str(e)}, tutor: {tutor_id}")
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(message=f"获取多跳合作关系失败: {str(e)}")
+        )
+
+
+@router.get(
+    "/network/{tutor_id}/path/{target_id}",
+    summary="两位导师之间的合作路径",
+    description="在内存合作图上做双向广度优先搜索，返回跳数最少的合作路径",
+)
+async def get_tutor_path(
+    request: Request,
+    tutor_id: str,
+    target_id: str,
+    max_hops: int = Query(PATH_MAX_DEPTH, ge=1, le=PATH_MAX_DEPTH, description="最大跳数")
+):
+    """
+    导师合作路径接口（"我和导师X是怎么联系起来的"）
+    
+    Args:
+        request: 请求对象
+        tutor_id: 起点导师ID
+        target_id: 终点导师ID
+        max_hops: 最大跳数
+    
+    Returns:
+        found、path（依次经过的导师，weight 为与上一位导师的合作次数）、truncated（搜索预算耗尽）
+    """
+    try:
+        _require_graph()
+        path, truncated = coop_graph.shortest_path(tutor_id, target_id, max_depth=max_hops)
+        
+        return success_response(
+            data={
+                "source_id": tutor_id,
+                "target_id": target_id,
+                "found": path is not None,
+                "hops": len(path) - 1 if path else None,
+                "path": [_graph_node(node_id, weight=weight) for node_id, weight in path or []],
+                "truncated": truncated
+            },
+            message="获取合作路径成功"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_logger.error(f"获取合作路径失败: {str(e)}, tutor: {tutor_id}, target: {target_id}")
+        raise HTTPException(
+            status_code=500,
+            detail=error_response(message=f"获取合作路径失败: {str(e)}")
+        )
+
+
+async def _load_my_coops(coops_coll, tutor_id: str) -> List[Dict]:
+    """
+    合作图未就绪时从 coops 集合读取当前导师的合作记录
+    
+    Returns:
+        当前导师的合作记录摘要 [{type, type_cn, title, tags}]
+    """
+    my_coops = await coops_coll.find(
+        {"members.id": tutor_id},
+        {"_id": 0, "type": 1, "type_cn": 1, "title": 1, "title_cn": 1, "tags": 1}
+    ).to_list(length=100)
+    return [
+        {
+            "type": coop.get("type"),
+            "type_cn": coop.get("type_cn"),
+            "title": coop.get("title_cn") or coop.get("title"),
+            "tags": coop.get("tags", [])
+        }
+        for coop in my_coops
+    ]
+
+
+async def _find_similar_tutors(tutors_coll, tutor_id: str, potential_collabs: List[Dict]) -> None:
+    """
+    方法A: 从相似导师索引中取标签/研究方向/合作标签最相近的导师作为潜在合作者
+    
+    Args:
+        tutors_coll: tutors 集合
+        tutor_id: 导师ID
+        potential_collabs: 潜在合作者列表（追加写入）
+    """
+    similar = tutor_similarity_index.similar(tutor_id, limit=8) or []
+    if not similar:
+        return
+    tutors = await tutors_coll.find(
+        live_tutor_filter({"id": {"$in": [other for other, _, _ in similar]}}),
+        {"_id": 0, "id": 1, "name": 1, "school": 1, "department": 1, "jobname": 1, "avatar": 1}
+    ).to_list(length=len(similar))
+    by_id = {tutor["id"]: tutor for tutor in tutors}
+    
+    for other, _, common_tags in similar:
+        tutor = by_id.get(other)
+        if tutor is None:
+            continue
+        potential_collabs.append({
+            "id": other,
+            "name": tutor.get("name", "未知"),
+            "school": tutor.get("school", ""),
+            "department": tutor.get("department", ""),
+            "jobname": tutor.get("jobname", ""),
+            "avatar": tutor.get("avatar"),
+            "common_type": "研究相似",
+            "relation_basis": f"共同研究领域: {'、'.join(common_tags[:2])}" if common_tags else "研究方向相似"
+        })
+
+
+async def _find_similar_coop_members(
+    coops_coll,
+    tutor_id: str,
+    my_coops: List[Dict],
+    potential_collabs: List[Dict]
+) -> None:
+    """
+    相似导师索引未就绪时的回退：从 coops 集合查找相同类型/标签的合作记录，其成员作为潜在合作者
+    
+    Args:
+        coops_coll: coops 集合
+        tutor_id: 导师ID
+        my_coops: 当前导师的合作记录摘要
+        potential_collabs: 潜在合作者列表（追加写入）
+    """
+    for coop in my_coops[:5]:  # 最多取5条我的coops
+        coop_type = coop.get("type", "")
+        coop_tags = coop.get("tags", [])
+        
+        # 找相同类型的其他coops
+        similar_coops = await coops_coll.find({
+            "members.id": {"$ne": tutor_id},  # 不包含我
+            "$or": [
+                {"type": coop_type},
+                {"tags": {"$in": coop_tags}},
+            ]
+        }).limit(10).to_list(length=10)
+        
+        for sc in similar_coops:
+            for member in sc.get("members", []):
+                member_id = member.get("id")
+                if member_id and member_id != tutor_id:
+                    potential_collabs.append({
+                        "id": member_id,
+                        "name": member.get("name", "未知"),
+                        "school": member.get("school", ""),
+                        "department": member.get("department", ""),
+                        "jobname": member.get("jobname", ""),
+                        "avatar": member.get("avatar"),
+                        "common_type": coop_type,
+                        "relation_basis": f"共同{coop.get('type_cn') or '研究'}领域"
+                    })
+
+
 def calculate_layout(count: int) -> List[Dict]:
     """
     根据合作者数量计算布局位置
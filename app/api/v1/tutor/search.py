@@ -3,9 +3,10 @@
 提供基础查询和高级筛选功能
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Request, Query
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Query
 from typing import List, Optional
 from datetime import datetime
+import asyncio
 import math
 
 from app.models import User, TutorBrief
@@ -15,6 +16,7 @@ from app.schemas import (
     TutorFilterOptions,
     SortField,
     SortOrder,
+    CountMode,
     RecruitmentType
 )
 from app.api.v1.auth.login import get_current_user
@@ -22,15 +24,110 @@ from app.utils import (
     success_response,
     error_response,
     business_error_response,
-    api_logger
+    api_logger,
+    decode_cursor,
+    build_cursor_filter,
+    cursor_sort,
+    next_cursor,
+    make_etag,
+    conditional_response,
+    parse_fieldset,
+    fieldset_projection,
+    pick_fields
 )
-from app.db.mongo import get_db
+from app.db.mongo import get_db, find_page_with_facets, facet_counts
+from app.crud.tutor_crud import (
+    live_tutor_filter,
+    TUTOR_BRIEF_PROJECTION,
+    TUTOR_SEARCH_FIELD_SOURCES
+)
+from app.services.tutor_index import KEYWORD_FIELDS, tutor_search_index
+from app.services.tutor_fuzzy import tutor_fuzzy_index
+from app.services.tutor_relevance import tutor_relevance_index
+from app.services.tutor_pinyin import pinyin_conditions
+from app.services.filter_options import filter_options_snapshot
+from app.services.query_cache import query_cache
+from app.services.single_flight import tutor_query_flight
 
 router = APIRouter(
     prefix="/tutor",
     tags=["tutor_search"]
 )
 
+# 筛选选项变化很少，允许客户端/CDN 缓存较长时间
+FILTER_OPTIONS_CACHE_CONTROL = "public, max-age=300"
+
+# 相关度排序的游标字段
+RELEVANCE_FIELD = SortField.RELEVANCE.value
+
+# 搜索结果支持的分面统计维度 -> 分组表达式（兼容导入数据与管理接口写入的字段名）
+SEARCH_FACETS = {
+    "school": {"$ifNull": ["$school_name", "$school"]},
+    "title": {"$ifNull": ["$title", "$jobname"]},
+    "recruitment_type": "$recruitment_type",
+}
+
+
+async def find_relevance_page(
+    query: dict,
+    candidate_ids: Optional[set],
+    keyword: str,
+    skip: int,
+    limit: int,
+    after: Optional[tuple],
+    count_mode: str,
+    projection: dict,
+    facets: Optional[dict] = None
+):
+    """
+    按 BM25 相关度分页查询
+
+    满足全部筛选条件的导师ID由内存索引给出（存在数据库侧筛选条件时只查询 id），
+    在内存中打分排序后只读取当前页的导师文档
+
+    Args:
+        query: 完整查询条件
+        candidate_ids: 内存索引给出的候选ID（无法给出时为 None）
+        keyword: 搜索关键词
+        skip: 跳过数量（页码分页）
+        limit: 每页数量
+        after: 上一页最后一条记录的 (分数, id)（游标分页）
+        count_mode: 总数统计模式
+        projection: 文档投影
+        facets: 分面统计维度（与打分并发统计）
+
+    Returns:
+        (当前页文档（含 relevance 分数）, 总数, 总数是否精确, 分面统计)
+    """
+    db = get_db()
+    db_filters = set(query) - set(live_tutor_filter()) - {"id"}
+    if candidate_ids is not None and not db_filters:
+        matched_ids = candidate_ids
+    else:
+        matched_ids = [
+            doc["id"] async for doc in db.tutors.find(query, {"_id": 0, "id": 1})
+        ]
+
+    ranked = tutor_relevance_index.rank(keyword, matched_ids, limit, skip=skip, after=after)
+    page_query = {"id": {"$in": [tutor_id for tutor_id, _ in ranked]}}
+    page_future = db.tutors.find(page_query, projection).to_list(length=limit)
+    if facets:
+        page_docs, facet_result = await asyncio.gather(
+            page_future, facet_counts("tutors", query, facets)
+        )
+    else:
+        page_docs, facet_result = await page_future, None
+    docs = {doc["id"]: doc for doc in page_docs}
+
+    tutors = []
+    for tutor_id, score in ranked:
+        doc = docs.get(tutor_id)
+        if doc is not None:
+            doc[RELEVANCE_FIELD] = score
+            tutors.append(doc)
+    total = None if count_mode == CountMode.NONE.value else len(matched_ids)
+    return tutors, total, True, facet_result
+
 
 @router.get(
     "/search",
@@ -63,11 +160,22 @@ async def search_tutors(
     # 分页参数
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(10, ge=1, le=100, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="分页游标（上一页返回的 next_cursor），传入后按游标翻页，page 仅为兼容保留"),
     
     # 排序参数
-    sort_by: SortField = Query(SortField.CREATED_AT, description="排序字段"),
+    sort_by: SortField = Query(SortField.CREATED_AT, description="排序字段（relevance 按关键词相关度排序，influence_score 按合作影响力排序）"),
     sort_order: SortOrder = Query(SortOrder.DESC, description="排序方向"),
     
+    # 计数模式
+    count: CountMode = Query(CountMode.EXACT, description="总数统计模式：exact(精确)/estimated(超过10000只返回10000+)/none(不计数)"),
+    
+    # 稀疏字段集
+    fields: Optional[str] = Query(None, description="只返回指定字段（逗号分隔），如 id,name,school"),
+    exclude: Optional[str] = Query(None, description="不返回指定字段（逗号分隔），如 tags,research_direction"),
+    
+    # 分面统计
+    facets: Optional[str] = Query(None, description="同时返回当前筛选条件下的分面统计（逗号分隔）：school,title,recruitment_type"),
+    
     # 用户认证（可选）
     current_user: Optional[User] = Depends(get_current_user)
 ):
@@ -77,7 +185,11 @@ async def search_tutors(
     支持：
     1. 基础模糊查询：姓名、院校、专业
     2. 高级筛选：研究方向、职称、招生类型、是否有课题等
-    3. 分页和排序
+    3. 分页和排序（支持 page 页码分页与 cursor 游标分页，深分页推荐使用游标）
+    4. 相关度排序：sort_by=relevance 时按姓名/研究方向/标签/简介的 BM25 分数降序，
+       未传关键词或统计尚未构建完成时按创建时间降序；sort_by=influence_score 按离线计算的合作影响力排序
+    5. 纠错：关键词没有精确匹配时按编辑距离匹配相近词条，使用的词条通过 fuzzy_terms 返回
+    6. 分面统计：facets 指定的维度按当前筛选条件统计数量，与当前页数据同一次聚合返回
     
     Args:
         request: 请求对象
@@ -97,55 +209,135 @@ async def search_tutors(
         max_projects: 最多项目数
         page: 页码
         page_size: 每页数量
+        cursor: 分页游标
         sort_by: 排序字段
         sort_order: 排序方向
+        count: 总数统计模式
+        fields: 只返回的字段
+        exclude: 不返回的字段
+        facets: 分面统计维度
         current_user: 当前用户（可选）
     
     Returns:
         导师列表
     """
     try:
-        db = get_db()
+        # 稀疏字段集：未请求的字段不从数据库读取
+        try:
+            fieldset = parse_fieldset(fields, exclude, TUTOR_SEARCH_FIELD_SOURCES)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=business_error_response(
+                    code="INVALID_FIELDS",
+                    message=str(e)
+                )
+            )
         
-        # 构建查询条件
-        query = {
-            "$or": [
-                {"is_deleted": {"$exists": False}},
-                {"is_deleted": False}
-            ]
-        }
+        # 分面统计维度
+        facet_names = sorted({f.strip() for f in facets.split(",") if f.strip()}) if facets else []
+        unknown_facets = set(facet_names) - set(SEARCH_FACETS)
+        if unknown_facets:
+            raise HTTPException(
+                status_code=400,
+                detail=business_error_response(
+                    code="INVALID_FACETS",
+                    message=f"不支持的分面统计: {', '.join(sorted(unknown_facets))}"
+                )
+            )
+        facet_fields = {name: SEARCH_FACETS[name] for name in facet_names} or None
         
-        # 基础关键词查询（搜索姓名、研究方向、学校、院系）
-        if keyword:
-            query["$and"] = query.get("$and", [])
-            query["$and"].append({
-                "$or": [
-                    {"name": {"$regex": keyword, "$options": "i"}},
-                    {"research_direction": {"$regex": keyword, "$options": "i"}},
-                    {"school_name": {"$regex": keyword, "$options": "i"}},
-                    {"department_name": {"$regex": keyword, "$options": "i"}}
-                ]
-            })
+        # 标签列表（任意匹配）
+        tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
         
-        # 姓名模糊查询
-        if name:
-            query["name"] = {"$regex": name, "$options": "i"}
+        # 相同的规范化查询参数直接返回缓存结果
+        cache_key = query_cache.make_key(
+            "tutor_search",
+            keyword=keyword, name=name, school=school, department=department,
+            research_direction=research_direction, title=title,
+            recruitment_type=recruitment_type, has_projects=has_projects,
+            has_funding=has_funding, tags=tag_list,
+            min_papers=min_papers, max_papers=max_papers,
+            min_projects=min_projects, max_projects=max_projects,
+            page=page, page_size=page_size, cursor=cursor,
+            sort_by=sort_by, sort_order=sort_order, count=count,
+            fields=fieldset, facets=facet_names
+        )
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return success_response(data=cached, message="查询导师列表成功")
+        cache_version = query_cache.version
         
-        # 学校模糊查询
-        if school:
-            query["school_name"] = {"$regex": school, "$options": "i"}
+        # 构建查询条件
+        query = live_tutor_filter()
         
-        # 院系模糊查询
-        if department:
-            query["department_name"] = {"$regex": department, "$options": "i"}
+        # 优先使用内存倒排索引计算关键词与文本类筛选的候选导师，
+        # 索引未就绪或无法回答时回退到 $regex
+        candidate_ids = tutor_search_index.candidate_ids(
+            keyword=keyword,
+            tags=tag_list,
+            name=name,
+            school=school,
+            department=department,
+            research_direction=research_direction,
+            title=title
+        )
         
-        # 研究方向模糊查询
-        if research_direction:
-            query["research_direction"] = {"$regex": research_direction, "$options": "i"}
+        # 关键词没有精确匹配时，按编辑距离查找相近的姓名/研究方向/院校词条作为纠错
+        fuzzy_terms = None
+        if keyword and candidate_ids is not None and not candidate_ids:
+            fuzzy = tutor_fuzzy_index.match(keyword, KEYWORD_FIELDS)
+            if fuzzy and fuzzy[0]:
+                other_filters = dict(
+                    name=name, school=school, department=department,
+                    research_direction=research_direction, title=title
+                )
+                other_ids = tutor_search_index.candidate_ids(tags=tag_list, **other_filters)
+                if other_ids is not None or not (tag_list or any(other_filters.values())):
+                    fuzzy_ids = fuzzy[0] if other_ids is None else fuzzy[0] & other_ids
+                    if fuzzy_ids:
+                        candidate_ids, fuzzy_terms = fuzzy_ids, fuzzy[1]
         
-        # 职称筛选（支持模糊匹配）
-        if title:
-            query["title"] = {"$regex": title, "$options": "i"}
+        if candidate_ids is not None:
+            query["id"] = {"$in": list(candidate_ids)}
+        else:
+            # 基础关键词查询（搜索姓名、研究方向、学校、院系）
+            if keyword:
+                query["$and"] = query.get("$and", [])
+                query["$and"].append({
+                    "$or": [
+                        {"name": {"$regex": keyword, "$options": "i"}},
+                        {"research_direction": {"$regex": keyword, "$options": "i"}},
+                        {"school_name": {"$regex": keyword, "$options": "i"}},
+                        {"department_name": {"$regex": keyword, "$options": "i"}},
+                        # 拼音/首字母输入匹配预计算的拼音键（前缀匹配可走索引）
+                        *pinyin_conditions(keyword)
+                    ]
+                })
+            
+            # 姓名模糊查询
+            if name:
+                query["name"] = {"$regex": name, "$options": "i"}
+            
+            # 学校模糊查询
+            if school:
+                query["school_name"] = {"$regex": school, "$options": "i"}
+            
+            # 院系模糊查询
+            if department:
+                query["department_name"] = {"$regex": department, "$options": "i"}
+            
+            # 研究方向模糊查询
+            if research_direction:
+                query["research_direction"] = {"$regex": research_direction, "$options": "i"}
+            
+            # 职称筛选（支持模糊匹配）
+            if title:
+                query["title"] = {"$regex": title, "$options": "i"}
+            
+            # 标签筛选（任意匹配）
+            if tag_list:
+                query["tags"] = {"$in": tag_list}
         
         # 招生类型筛选
         if recruitment_type:
@@ -164,12 +356,6 @@ async def search_tutors(
         if has_funding is not None:
             query["has_funding"] = has_funding
         
-        # 标签筛选（任意匹配）
-        if tags:
-            tag_list = [t.strip() for t in tags.split(",") if t.strip()]
-            if tag_list:
-                query["tags"] = {"$in": tag_list}
-        
         # 论文数量筛选
         if min_papers is not None or max_papers is not None:
             paper_query = {}
@@ -190,29 +376,90 @@ async def search_tutors(
             if project_query:
                 query["project_count"] = project_query
         
-        # 获取总数
-        total = await db.tutors.count_documents(query)
+        # 构建排序条件（相关度排序固定为分数降序）
+        use_relevance = (
+            sort_by == SortField.RELEVANCE and bool(keyword) and tutor_relevance_index.ready
+        )
+        if use_relevance:
+            sort_field, sort_direction = RELEVANCE_FIELD, -1
+        elif sort_by == SortField.RELEVANCE:
+            sort_field, sort_direction = SortField.CREATED_AT.value, -1
+        else:
+            sort_field = sort_by.value
+            sort_direction = -1 if sort_order == SortOrder.DESC else 1
         
-        # 计算总页数
-        total_pages = math.ceil(total / page_size) if total > 0 else 0
+        # 计算分页：传入游标时按 (排序字段, id) 范围条件翻页，不再使用 skip
+        page_filter = None
+        if cursor:
+            try:
+                last_value, last_id = decode_cursor(cursor, sort_field, sort_direction)
+                if use_relevance and not isinstance(last_value, (int, float)):
+                    raise ValueError("游标格式错误")
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=business_error_response(
+                        code="INVALID_CURSOR",
+                        message=str(e)
+                    )
+                )
+            skip = 0
+            if not use_relevance:
+                page_filter = build_cursor_filter(sort_field, sort_direction, last_value, last_id)
+        else:
+            skip = (page - 1) * page_size
         
-        # 构建排序条件
-        sort_direction = -1 if sort_order == SortOrder.DESC else 1
-        sort_field = sort_by.value
+        # 列表字段投影（始终读取游标所需的排序字段，相关度分数在内存中计算）
+        projection = fieldset_projection(
+            fieldset, TUTOR_SEARCH_FIELD_SOURCES,
+            extra=("id",) if use_relevance else ("id", sort_field)
+        ) or TUTOR_BRIEF_PROJECTION
         
-        # 计算分页
-        skip = (page - 1) * page_size
+        # 单次往返获取当前页数据和总数；索引确认没有匹配的导师时无需访问数据库
+        if candidate_ids is not None and not candidate_ids:
+            tutors, total, total_exact = [], (None if count == CountMode.NONE else 0), True
+            facet_result = {name: [] for name in facet_fields} if facet_fields else None
+        elif use_relevance:
+            tutors, total, total_exact, facet_result = await tutor_query_flight.do(
+                (cache_key, cache_version),
+                lambda: find_relevance_page(
+                    query,
+                    candidate_ids,
+                    " ".join(fuzzy_terms) if fuzzy_terms else keyword,
+                    skip=skip,
+                    limit=page_size,
+                    after=(last_value, last_id) if cursor else None,
+                    count_mode=count.value,
+                    projection=projection,
+                    facets=facet_fields
+                )
+            )
+        else:
+            # 并发的相同查询（同一数据版本）合并为一次数据库调用
+            tutors, total, total_exact, facet_result = await tutor_query_flight.do(
+                (cache_key, cache_version),
+                lambda: find_page_with_facets(
+                    "tutors",
+                    query,
+                    sort=cursor_sort(sort_field, sort_direction),
+                    skip=skip,
+                    limit=page_size,
+                    count_mode=count.value,
+                    page_filter=page_filter,
+                    projection=projection,
+                    facets=facet_fields
+                )
+            )
         
-        # 获取数据
-        tutors_cursor = db.tutors.find(query).sort(sort_field, sort_direction).skip(skip).limit(page_size)
-        tutors = await tutors_cursor.to_list(length=page_size)
+        # 计算总页数
+        total_pages = None if total is None else (math.ceil(total / page_size) if total > 0 else 0)
         
         # 转换为响应模型
         tutor_list = []
         for tutor in tutors:
             tutor_brief = {
                 "id": tutor["id"],
-                "name": tutor["name"],
+                "name": tutor.get("name"),
                 "title": tutor.get("title"),
                 "school": tutor.get("school_name", ""),
                 "department": tutor.get("department_name", ""),
@@ -224,7 +471,7 @@ async def search_tutors(
                 "recruitment_type": tutor.get("recruitment_type"),
                 "has_funding": tutor.get("has_funding", False)
             }
-            tutor_list.append(tutor_brief)
+            tutor_list.append(pick_fields(tutor_brief, fieldset))
         
         api_logger.info(
             f"导师高级查询成功\n"
@@ -235,17 +482,26 @@ async def search_tutors(
             f"Request ID: {request.state.request_id}"
         )
         
+        data = {
+            "list": tutor_list,
+            "total": total,
+            "total_exact": total_exact,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": total_pages,
+            "next_cursor": next_cursor(tutors, page_size, sort_field, sort_direction),
+            "fuzzy_terms": fuzzy_terms,
+            "facets": facet_result
+        }
+        query_cache.set(cache_key, data, cache_version)
+        
         return success_response(
-            data={
-                "list": tutor_list,
-                "total": total,
-                "page": page,
-                "page_size": page_size,
-                "total_pages": total_pages
-            },
+            data=data,
             message="查询导师列表成功"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         api_logger.error(
             f"导师高级查询失败: {str(e)}\n"
@@ -268,126 +524,59 @@ async def search_tutors(
 )
 async def get_filter_options(
     request: Request,
+    response: Response,
     school: Optional[str] = Query(None, description="学校筛选（获取该学校的院系列表）")
 ):
     """
     获取筛选选项接口
     
-    返回可用的筛选选项，用于前端展示筛选条件
+    返回可用的筛选选项，用于前端展示筛选条件；
+    数据来自预先计算的快照，不再每次请求扫描 tutors 集合；快照未变化时直接返回 304
     
     Args:
         request: 请求对象
+        response: 响应对象（写入缓存响应头）
         school: 学校名称（可选，用于获取该学校的院系列表）
     
     Returns:
         筛选选项
     """
     try:
-        db = get_db()
-        
-        # 获取学校列表（去重）
-        schools_cursor = db.tutors.distinct("school_name", {
-            "$or": [
-                {"is_deleted": {"$exists": False}},
-                {"is_deleted": False}
-            ]
-        })
-        schools = await schools_cursor
-        schools = sorted([s for s in schools if s])  # 过滤空值并排序
-        
-        # 获取院系列表
-        department_query = {
-            "$or": [
-                {"is_deleted": {"$exists": False}},
-                {"is_deleted": False}
-            ]
-        }
-        if school:
-            department_query["school_name"] = school
+        built_at = filter_options_snapshot.built_at
         
-        departments_cursor = db.tutors.distinct("department_name", department_query)
-        departments = await departments_cursor
-        departments = sorted([d for d in departments if d])
-        
-        # 获取职称列表
-        titles_cursor = db.tutors.distinct("title", {
-            "$or": [
-                {"is_deleted": {"$exists": False}},
-                {"is_deleted": False}
-            ]
-        })
-        titles = await titles_cursor
-        titles = sorted([t for t in titles if t])
+        # 快照未刷新时客户端缓存仍然有效
+        if built_at is not None:
+            not_modified = conditional_response(
+                request,
+                response,
+                etag=make_etag("filter_options", built_at, school or ""),
+                cache_control=FILTER_OPTIONS_CACHE_CONTROL,
+                last_modified=built_at
+            )
+            if not_modified:
+                return not_modified
         
-        # 获取研究方向列表（取前50个最常见的）
-        research_directions_pipeline = [
-            {
-                "$match": {
-                    "$or": [
-                        {"is_deleted": {"$exists": False}},
-                        {"is_deleted": False}
-                    ],
-                    "research_direction": {"$exists": True, "$ne": None, "$ne": ""}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$research_direction",
-                    "count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"count": -1}},
-            {"$limit": 50},
-            {"$project": {"_id": 1}}
-        ]
-        research_directions_cursor = db.tutors.aggregate(research_directions_pipeline)
-        research_directions = [doc["_id"] for doc in await research_directions_cursor.to_list(length=50)]
+        # 结果以快照生成时间为键的一部分缓存，快照刷新后自然换用新的缓存键
+        cache_key = query_cache.make_key("filter_options", school=school, built_at=built_at)
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return success_response(data=cached, message="获取筛选选项成功")
+        cache_version = query_cache.version
         
-        # 获取标签列表（取前30个最常见的）
-        tags_pipeline = [
-            {
-                "$match": {
-                    "$or": [
-                        {"is_deleted": {"$exists": False}},
-                        {"is_deleted": False}
-                    ],
-                    "tags": {"$exists": True, "$ne": []}
-                }
-            },
-            {"$unwind": "$tags"},
-            {
-                "$group": {
-                    "_id": "$tags",
-                    "count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"count": -1}},
-            {"$limit": 30},
-            {"$project": {"_id": 1}}
-        ]
-        tags_cursor = db.tutors.aggregate(tags_pipeline)
-        tags = [doc["_id"] for doc in await tags_cursor.to_list(length=30)]
+        # 直接返回内存中的筛选选项快照（导师变更或定时器触发后台刷新）
+        options = await filter_options_snapshot.get(school)
+        if built_at is not None and options["updated_at"] == built_at:
+            query_cache.set(cache_key, options, cache_version)
         
         api_logger.info(
             f"获取筛选选项成功\n"
-            f"学校数: {len(schools)}, 院系数: {len(departments)}, 职称数: {len(titles)}\n"
-            f"研究方向数: {len(research_directions)}, 标签数: {len(tags)}\n"
+            f"学校数: {len(options['schools'])}, 院系数: {len(options['departments'])}, 职称数: {len(options['titles'])}\n"
+            f"研究方向数: {len(options['research_directions'])}, 标签数: {len(options['tags'])}\n"
             f"Request ID: {request.state.request_id}"
         )
         
         return success_response(
-            data={
-                "schools": schools,
-                "departments": departments,
-                "titles": titles,
-                "research_directions": research_directions,
-                "tags": tags,
-                "recruitment_types": [
-                    {"value": "academic", "label": "学硕"},
-                    {"value": "professional", "label": "专硕"},
-                    {"value": "both", "label": "学硕+专硕"}
-                ]
-            },
+            data=options,
             message="获取筛选选项成功"
         )
         
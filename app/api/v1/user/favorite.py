@@ -26,6 +26,7 @@ from app.utils import (
     api_logger
 )
 from app.db.mongo import find_one, find_many, insert_one, delete_one, get_collection
+from app.crud.tutor_crud import TUTOR_BRIEF_PROJECTION
 
 router = APIRouter(
     prefix="/user",
@@ -216,11 +217,18 @@ async def get_favorite_list(
         
         favorites = await favorites_cursor.to_list(length=page_size)
         
-        # 获取导师详细信息
+        # 一次查询取回本页所有导师的简略字段
+        tutor_ids = [favorite["target_id"] for favorite in favorites]
+        tutors = await get_collection("tutors").find(
+            {"id": {"$in": tutor_ids}},
+            TUTOR_BRIEF_PROJECTION
+        ).to_list(length=len(tutor_ids))
+        tutors_by_id = {tutor["id"]: tutor for tutor in tutors}
+        
+        # 按收藏时间顺序构建导师简略信息
         tutor_list = []
         for favorite in favorites:
-            tutor_id = favorite["target_id"]
-            tutor = await find_one("tutors", {"id": tutor_id})
+            tutor = tutors_by_id.get(favorite["target_id"])
             
             if tutor:
                 # 构建导师简略信息
@@ -67,9 +67,30 @@ class AppSettings(BaseSettings):
     # 数据验证配置
     STRICT_VALIDATION: bool = True
     
-    # 缓存配置
-    CACHE_ENABLED: bool = False
+    # 缓存配置（导师列表/搜索结果的进程内缓存，导师写入后立即失效）
+    CACHE_ENABLED: bool = True
     CACHE_TTL: int = 300  # 5分钟
+    CACHE_MAX_ENTRIES: int = 1000
+    DETAIL_CACHE_MAX_ENTRIES: int = 5000  # 导师详情缓存条数
+    DETAIL_CACHE_TTL: int = 3600  # 详情缓存兜底过期时间（秒），0 表示只依赖写入失效
+    
+    # 导师检索索引、相关度统计与模糊匹配索引定时全量重建间隔（秒，同步其他进程/脚本写入的导师；本进程写入时增量更新）
+    TUTOR_INDEX_REBUILD_INTERVAL: int = 300
+    
+    # 导师数据版本定时重新加载间隔（秒，发现导入脚本/离线任务等其他写入方的变更）
+    TUTOR_VERSIONS_REFRESH_INTERVAL: int = 60
+    
+    # 筛选选项快照定时刷新间隔（秒）
+    FILTER_OPTIONS_REFRESH_INTERVAL: int = 600
+    
+    # 搜索建议索引定时重建间隔（秒，同步学校/院系参考数据和收藏热度）
+    SUGGESTION_REBUILD_INTERVAL: int = 1800
+    
+    # 导师合作图全量重建间隔（秒，期间通过 change stream 增量更新）
+    COOP_GRAPH_REBUILD_INTERVAL: int = 3600
+    
+    # 相似导师索引全量重建间隔（秒，同步合作记录标签；导师写入时增量更新）
+    SIMILAR_TUTOR_REBUILD_INTERVAL: int = 3600
     
     # 清理配置
     CLEANUP_INTERVAL: int = 3600  # 1小时
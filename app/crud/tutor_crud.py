@@ -0,0 +1,89 @@
+"""
+导师数据访问辅助
+统一导师读路径使用的公共查询条件
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+# 新写入导师文档的必填默认值：读路径只匹配 is_deleted 为 false 的导师，
+# 缺少该字段的文档对搜索、列表、详情及各内存索引都不可见
+TUTOR_INSERT_DEFAULTS: Dict[str, Any] = {"is_deleted": False}
+
+
+def live_tutor_filter(conditions: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    构建未删除导师的查询条件
+    
+    is_deleted 已由迁移统一回填为布尔值，使用单一等值条件，
+    可以命中 partialFilterExpression 为 {is_deleted: false} 的部分索引
+    
+    Args:
+        conditions: 额外的查询条件
+    
+    Returns:
+        新的查询条件字典（调用方可以直接修改）
+    """
+    query: Dict[str, Any] = {"is_deleted": False}
+    if conditions:
+        query.update(conditions)
+    return query
+
+
+def new_tutor_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    补齐新导师文档的必填默认值（导入/初始化等所有插入路径都应经过此函数）
+    
+    Args:
+        doc: 待插入的导师文档
+    
+    Returns:
+        新的文档字典，文档中已显式设置的字段不被覆盖
+    """
+    return {**TUTOR_INSERT_DEFAULTS, **doc}
+
+
+# 列表类接口构建导师简略信息所需的字段（兼容导入数据与管理接口写入的两套字段名），
+# 不读取 coops / students / growthPath / risks 等大数组
+TUTOR_BRIEF_FIELDS = (
+    "id", "name",
+    "title", "jobname",
+    "school", "school_name",
+    "department", "department_name",
+    "research_direction", "direction",
+    "tags", "avatar", "avatar_url",
+    "paper_count", "project_count", "recruitment_type", "has_funding",
+    # 排序/游标字段
+    "created_at", "updated_at", "influence_score",
+)
+
+TUTOR_BRIEF_PROJECTION: Dict[str, int] = {
+    "_id": 0,
+    **{field: 1 for field in TUTOR_BRIEF_FIELDS}
+}
+
+# search_tutors 响应字段 -> 文档来源字段（用于 fields / exclude 稀疏字段集）
+TUTOR_SEARCH_FIELD_SOURCES: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "name": ("name",),
+    "title": ("title",),
+    "school": ("school_name",),
+    "department": ("department_name",),
+    "research_direction": ("research_direction",),
+    "tags": ("tags",),
+    "avatar": ("avatar_url",),
+    "paper_count": ("paper_count",),
+    "project_count": ("project_count",),
+    "recruitment_type": ("recruitment_type",),
+    "has_funding": ("has_funding",),
+}
+
+# get_tutor_list 响应字段（TutorBrief）-> 文档来源字段
+TUTOR_LIST_FIELD_SOURCES: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "name": ("name",),
+    "title": ("jobname", "title"),
+    "school": ("school",),
+    "department": ("department",),
+    "tags": ("tags",),
+    "avatar": ("avatar",),
+}
@@ -96,6 +96,7 @@ class DatabaseInitializer:
                 "research_direction": "人工智能，机器学习，深度学习",
                 "tags": ["AI", "机器学习", "深度学习"],
                 "city": "北京",
+                "is_deleted": False,
                 "crawled_at": datetime.now(),
                 "created_at": datetime.now(),
                 "updated_at": datetime.now()
@@ -116,6 +117,7 @@ class DatabaseInitializer:
                 "research_direction": "计算机视觉，图像处理，模式识别",
                 "tags": ["计算机视觉", "图像处理"],
                 "city": "上海",
+                "is_deleted": False,
                 "crawled_at": datetime.now(),
                 "created_at": datetime.now(),
                 "updated_at": datetime.now()
@@ -0,0 +1,35 @@
+"""
+导师排序字段复合索引
+为游标分页提供 (排序字段, id) 复合索引，深分页与第一页代价相同
+"""
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+# 与 SortField 枚举保持一致
+SORT_FIELDS = ["created_at", "updated_at", "name", "paper_count", "project_count"]
+
+
+async def upgrade(db):
+    """
+    执行迁移操作：创建索引
+    """
+    tutors_collection = db["tutors"]
+    
+    # 复合索引可双向遍历，同时覆盖升序和降序的游标翻页
+    await tutors_collection.create_indexes([
+        IndexModel([("id", ASCENDING)], name="idx_tutor_id"),
+        *[
+            IndexModel([(field, DESCENDING), ("id", DESCENDING)], name=f"idx_{field}_id")
+            for field in SORT_FIELDS
+        ]
+    ])
+
+    print("导师排序索引创建完成")
+
+
+async def downgrade(db):
+    """
+    回滚操作（可选）
+    """
+    await db["tutors"].drop_index("idx_tutor_id")
+    for field in SORT_FIELDS:
+        await db["tutors"].drop_index(f"idx_{field}_id")
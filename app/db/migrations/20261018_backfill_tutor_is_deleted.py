@@ -0,0 +1,93 @@
+"""
+统一导师软删除标记
+1. 分批回填缺失的 is_deleted 字段为 false（可重复执行，中断后重跑会从剩余文档继续）
+2. 将排序复合索引重建为 {is_deleted: false} 的部分索引，只索引未删除导师
+"""
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+# 每批回填的文档数量
+BATCH_SIZE = 1000
+
+# 与 SortField 枚举保持一致
+SORT_FIELDS = ["created_at", "updated_at", "name", "paper_count", "project_count"]
+
+LIVE_FILTER = {"is_deleted": False}
+
+
+async def backfill_is_deleted(db, batch_size: int = BATCH_SIZE) -> int:
+    """
+    分批回填 is_deleted
+    
+    每批只选取 is_deleted 缺失或为 null 的文档，已回填的文档不会被再次选中，
+    因此迁移中断后重新执行即可从剩余文档继续
+    
+    Returns:
+        本次回填的文档数量
+    """
+    tutors_collection = db["tutors"]
+    total = 0
+    
+    while True:
+        batch = await tutors_collection.find(
+            {"is_deleted": None},
+            {"_id": 1}
+        ).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        
+        result = await tutors_collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}, "is_deleted": None},
+            {"$set": {"is_deleted": False}}
+        )
+        total += result.modified_count
+        print(f"已回填 is_deleted: {total}")
+    
+    return total
+
+
+async def upgrade(db):
+    """
+    执行迁移操作：回填软删除标记并重建部分索引
+    """
+    total = await backfill_is_deleted(db)
+    print(f"is_deleted 回填完成，共 {total} 条")
+    
+    tutors_collection = db["tutors"]
+    
+    # 替换 20261017 创建的全量排序索引
+    existing = await tutors_collection.index_information()
+    for field in SORT_FIELDS:
+        if f"idx_{field}_id" in existing:
+            await tutors_collection.drop_index(f"idx_{field}_id")
+    
+    await tutors_collection.create_indexes([
+        IndexModel(
+            [(field, DESCENDING), ("id", DESCENDING)],
+            name=f"idx_live_{field}_id",
+            partialFilterExpression=LIVE_FILTER
+        )
+        for field in SORT_FIELDS
+    ] + [
+        IndexModel(
+            [("school", ASCENDING), ("department", ASCENDING)],
+            name="idx_live_school_dept",
+            partialFilterExpression=LIVE_FILTER
+        )
+    ])
+
+    print("导师部分索引创建完成")
+
+
+async def downgrade(db):
+    """
+    回滚操作（可选）：恢复全量排序索引，保留已回填的 is_deleted 字段
+    """
+    tutors_collection = db["tutors"]
+    for field in SORT_FIELDS:
+        await tutors_collection.drop_index(f"idx_live_{field}_id")
+    await tutors_collection.drop_index("idx_live_school_dept")
+    
+    await tutors_collection.create_indexes([
+        IndexModel([(field, DESCENDING), ("id", DESCENDING)], name=f"idx_{field}_id")
+        for field in SORT_FIELDS
+    ])
@@ -0,0 +1,92 @@
+"""
+导师拼音检索键
+1. 分批回填 name_pinyin / school_pinyin / department_pinyin（可重复执行，中断后重跑会从剩余文档继续）
+2. 为拼音键数组创建多键部分索引，拼音前缀查询不再扫描全表
+"""
+from pymongo import IndexModel, ASCENDING, UpdateOne
+
+from app.services.tutor_pinyin import PINYIN_AVAILABLE, PINYIN_FIELDS, pinyin_field, pinyin_fields
+
+# 每批回填的文档数量
+BATCH_SIZE = 1000
+
+LIVE_FILTER = {"is_deleted": False}
+
+# 拼音字段 -> 文档中的候选字段（导入数据与管理接口写入的数据字段名不一致）
+SOURCE_FIELDS = {
+    "name": ("name",),
+    "school": ("school_name", "school"),
+    "department": ("department_name", "department"),
+}
+
+
+async def backfill_pinyin_keys(db, batch_size: int = BATCH_SIZE) -> int:
+    """
+    分批回填拼音检索键
+
+    每批只选取 name_pinyin 缺失的文档，已回填的文档不会被再次选中
+
+    Returns:
+        本次回填的文档数量
+    """
+    tutors_collection = db["tutors"]
+    projection = {"_id": 1, **{s: 1 for sources in SOURCE_FIELDS.values() for s in sources}}
+    total = 0
+
+    while True:
+        batch = await tutors_collection.find(
+            {pinyin_field("name"): {"$exists": False}},
+            projection
+        ).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            values = {
+                field: next((doc[s] for s in sources if doc.get(s)), None)
+                for field, sources in SOURCE_FIELDS.items()
+            }
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": pinyin_fields(values)}))
+
+        result = await tutors_collection.bulk_write(operations, ordered=False)
+        total += result.modified_count
+        print(f"已回填拼音检索键: {total}")
+
+    return total
+
+
+async def upgrade(db):
+    """
+    执行迁移操作：回填拼音检索键并创建索引
+    """
+    if not PINYIN_AVAILABLE:
+        raise RuntimeError("未安装 pypinyin，无法生成拼音检索键")
+
+    total = await backfill_pinyin_keys(db)
+    print(f"拼音检索键回填完成，共 {total} 条")
+
+    await db["tutors"].create_indexes([
+        IndexModel(
+            [(pinyin_field(field), ASCENDING)],
+            name=f"idx_live_{pinyin_field(field)}",
+            partialFilterExpression=LIVE_FILTER
+        )
+        for field in PINYIN_FIELDS
+    ])
+
+    print("拼音检索键索引创建完成")
+
+
+async def downgrade(db):
+    """
+    回滚操作（可选）：删除拼音键索引与字段
+    """
+    tutors_collection = db["tutors"]
+    for field in PINYIN_FIELDS:
+        await tutors_collection.drop_index(f"idx_live_{pinyin_field(field)}")
+
+    await tutors_collection.update_many(
+        {},
+        {"$unset": {pinyin_field(field): "" for field in PINYIN_FIELDS}}
+    )
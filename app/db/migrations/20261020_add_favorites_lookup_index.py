@@ -0,0 +1,29 @@
+"""
+收藏查询复合索引
+导师详情、批量获取与收藏状态接口按 (user_id, target_type, target_id) 查询收藏，
+复合索引使单个导师与 $in 批量查询都只需扫描命中的索引项
+"""
+from pymongo import IndexModel, ASCENDING
+
+INDEX_NAME = "idx_favorite_user_target"
+
+
+async def upgrade(db):
+    """
+    执行迁移操作：创建索引
+    """
+    await db["favorites"].create_indexes([
+        IndexModel(
+            [("user_id", ASCENDING), ("target_type", ASCENDING), ("target_id", ASCENDING)],
+            name=INDEX_NAME
+        )
+    ])
+
+    print("收藏查询索引创建完成")
+
+
+async def downgrade(db):
+    """
+    回滚操作（可选）
+    """
+    await db["favorites"].drop_index(INDEX_NAME)
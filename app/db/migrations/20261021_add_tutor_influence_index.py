@@ -0,0 +1,36 @@
+"""
+导师合作影响力索引
+为 analyze_coops.py 写回的 influence_score 提供 (influence_score, id) 排序部分索引，
+并为按合作社区筛选提供 coop_community 索引
+"""
+from pymongo import IndexModel, ASCENDING, DESCENDING
+
+LIVE_FILTER = {"is_deleted": False}
+
+
+async def upgrade(db):
+    """
+    执行迁移操作：创建索引
+    """
+    await db["tutors"].create_indexes([
+        IndexModel(
+            [("influence_score", DESCENDING), ("id", DESCENDING)],
+            name="idx_live_influence_score_id",
+            partialFilterExpression=LIVE_FILTER
+        ),
+        IndexModel(
+            [("coop_community", ASCENDING), ("influence_score", DESCENDING)],
+            name="idx_live_coop_community",
+            partialFilterExpression=LIVE_FILTER
+        )
+    ])
+
+    print("导师合作影响力索引创建完成")
+
+
+async def downgrade(db):
+    """
+    回滚操作（可选）：删除索引，保留已写入的分析字段
+    """
+    await db["tutors"].drop_index("idx_live_influence_score_id")
+    await db["tutors"].drop_index("idx_live_coop_community")
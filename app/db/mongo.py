@@ -4,7 +4,8 @@ MongoDB 数据库连接与操作封装
 """
 
 import time
-from typing import Any, Dict, List, Optional, Union
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, PyMongoError
 from app.core.config.database import database_settings
@@ -107,6 +108,194 @@ async def find_many(
         logger.error(f"批量查询失败 ({collection_name}): {str(e)}")
         raise
 
+# 估算计数模式下最多精确统计到该数量，超出时只返回"N+"
+ESTIMATED_COUNT_LIMIT = 10000
+
+# 分面统计每个维度最多返回的取值数量
+FACET_LIMIT = 20
+
+
+def _facet_pipelines(facets: Dict[str, Any], limit: int = FACET_LIMIT) -> Dict[str, List[Dict[str, Any]]]:
+    """分面统计的 $facet 子管道：按取值分组计数，数量多的在前"""
+    return {
+        name: [
+            {"$group": {"_id": expression, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit + 1}
+        ]
+        for name, expression in facets.items()
+    }
+
+
+def _facet_results(raw: Dict[str, List[Dict[str, Any]]], facets: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """整理分面统计结果（去掉空值）"""
+    return {
+        name: [
+            {"value": bucket["_id"], "count": bucket["count"]}
+            for bucket in raw.get(name, [])
+            if bucket["_id"] not in (None, "")
+        ][:FACET_LIMIT]
+        for name in facets
+    }
+
+
+async def facet_counts(
+    collection_name: str,
+    query: Dict[str, Any],
+    facets: Dict[str, Any]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    分面统计（单次聚合统计全部维度）
+
+    Args:
+        collection_name: 集合名称
+        query: 查询条件
+        facets: 维度名称 -> 分组表达式，如 {"school": "$school_name"}
+
+    Returns:
+        维度名称 -> [{"value": 取值, "count": 数量}]
+    """
+    try:
+        coll = get_collection(collection_name)
+        pipeline = [{"$match": query}, {"$facet": _facet_pipelines(facets)}]
+        result = await coll.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        return _facet_results(result[0] if result else {}, facets)
+    except PyMongoError as e:
+        logger.error(f"分面统计失败 ({collection_name}): {str(e)}")
+        raise
+
+
+async def find_page(
+    collection_name: str,
+    query: Dict[str, Any],
+    sort: List[tuple],
+    skip: int = 0,
+    limit: int = 20,
+    count_mode: str = "exact",
+    page_filter: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
+    """
+    分页查询并统计总数（单次往返）
+    
+    通过 $facet 在同一个聚合管道中返回当前页数据和总数，
+    避免 count_documents + find 两次遍历匹配集合
+    
+    Args:
+        collection_name: 集合名称
+        query: 查询条件
+        sort: 排序条件，如 [("created_at", -1), ("id", -1)]
+        skip: 跳过数量
+        limit: 每页数量
+        count_mode: 计数模式 exact(精确) / estimated(超过上限只返回上限) / none(不计数)
+        page_filter: 游标分页条件（只作用于当前页数据，不影响总数）
+        projection: 当前页数据的字段投影（需包含排序字段）
+    
+    Returns:
+        (当前页数据, 总数, 总数是否精确)；count_mode 为 none 时总数为 None
+    """
+    items, total, total_exact, _ = await find_page_with_facets(
+        collection_name, query, sort,
+        skip=skip, limit=limit, count_mode=count_mode,
+        page_filter=page_filter, projection=projection
+    )
+    return items, total, total_exact
+
+
+async def find_page_with_facets(
+    collection_name: str,
+    query: Dict[str, Any],
+    sort: List[tuple],
+    skip: int = 0,
+    limit: int = 20,
+    count_mode: str = "exact",
+    page_filter: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    facets: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], Optional[int], bool, Optional[Dict[str, List[Dict[str, Any]]]]]:
+    """
+    分页查询，同时返回总数与分面统计
+    
+    页码分页且需要精确总数时，分面统计作为同一个 $facet 聚合的分支，与当前页数据、总数一次往返返回；
+    游标分页、估算总数或不计数时当前页走 find 索引查询，（限量）计数与分面统计单独执行并发返回
+    
+    Args:
+        collection_name: 集合名称
+        query: 查询条件
+        sort: 排序条件
+        skip: 跳过数量
+        limit: 每页数量
+        count_mode: 计数模式
+        page_filter: 游标分页条件
+        projection: 当前页数据的字段投影
+        facets: 分面统计维度 -> 分组表达式（None 表示不统计）
+    
+    Returns:
+        (当前页数据, 总数, 总数是否精确, 分面统计)；未请求分面统计时为 None
+    """
+    try:
+        coll = get_collection(collection_name)
+        count_limit = ESTIMATED_COUNT_LIMIT + 1 if count_mode == "estimated" else None
+        
+        async def separate_facets():
+            """不走 $facet 分支时单独统计分面"""
+            return await facet_counts(collection_name, query, facets) if facets else None
+        
+        # 游标分页（当前页条件与总数条件不同）或估算/不计数：数据走索引查询，只排序读取当前页，
+        # 计数最多数到 count_limit 并发执行；$facet 需要先对整个匹配集合排序，只用于精确计数
+        if page_filter or count_mode != "exact":
+            if page_filter:
+                page_query = {**query, "$and": query.get("$and", []) + [page_filter]}
+                cursor = coll.find(page_query, projection)
+            else:
+                cursor = coll.find(query, projection).skip(skip)
+            items_future = cursor.sort(sort).limit(limit).to_list(length=limit)
+            if count_mode == "none":
+                items, facet_result = await asyncio.gather(items_future, separate_facets())
+                return items, None, False, facet_result
+            count_kwargs = {"limit": count_limit} if count_limit else {}
+            items, total, facet_result = await asyncio.gather(
+                items_future,
+                coll.count_documents(query, **count_kwargs),
+                separate_facets()
+            )
+        else:
+            # 投影放在 $facet 之前，$facet 内只携带列表需要的字段，不再搬运大数组；
+            # 分面统计的取值以 _facet_ 前缀字段一并投影
+            facet_fields = facets or {}
+            if projection and facets:
+                projection = {
+                    **projection,
+                    **{f"_facet_{name}": expression for name, expression in facets.items()}
+                }
+                facet_fields = {name: f"$_facet_{name}" for name in facets}
+            projection_stages = [{"$project": projection}] if projection else []
+            pipeline = [
+                {"$match": query},
+                {"$sort": dict(sort)},
+                *projection_stages,
+                {
+                    "$facet": {
+                        "items": [{"$skip": skip}, {"$limit": limit}],
+                        "total": [{"$count": "count"}],
+                        **_facet_pipelines(facet_fields)
+                    }
+                }
+            ]
+            # 整个匹配集合排序后才进入 $facet，匹配量大时超出 100MB 内存上限，允许落盘
+            result = await coll.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+            facet = result[0] if result else {"items": [], "total": []}
+            items = facet["items"]
+            total = facet["total"][0]["count"] if facet["total"] else 0
+            facet_result = _facet_results(facet, facets) if facets else None
+        
+        if count_limit and total > ESTIMATED_COUNT_LIMIT:
+            return items, ESTIMATED_COUNT_LIMIT, False, facet_result
+        return items, total, True, facet_result
+    except PyMongoError as e:
+        logger.error(f"分页查询失败 ({collection_name}): {str(e)}")
+        raise
+
 async def insert_one(collection_name: str, document: Dict[str, Any]) -> str:
     """
     通用插入单条记录
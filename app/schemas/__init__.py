@@ -32,7 +32,8 @@ from .tutor_schema import (
     TutorResponse,
     TutorDeleteResponse,
     TutorBatchDeleteRequest,
-    TutorBatchDeleteResponse
+    TutorBatchDeleteResponse,
+    TutorBatchFetchRequest
 )
 
 from .tutor_query_schema import (
@@ -41,6 +42,7 @@ from .tutor_query_schema import (
     TutorFilterOptions,
     SortField,
     SortOrder,
+    CountMode,
     RecruitmentType
 )
 
@@ -63,6 +65,7 @@ __all__ = [
     "TutorDeleteResponse",
     "TutorBatchDeleteRequest",
     "TutorBatchDeleteResponse",
+    "TutorBatchFetchRequest",
     
     # 收藏相关
     "FavoriteToggleRequest",
@@ -79,5 +82,6 @@ __all__ = [
     "TutorFilterOptions",
     "SortField",
     "SortOrder",
+    "CountMode",
     "RecruitmentType",
 ]
@@ -15,6 +15,8 @@ class SortField(str, Enum):
     NAME = "name"  # 姓名
     PAPER_COUNT = "paper_count"  # 论文数量
     PROJECT_COUNT = "project_count"  # 项目数量
+    RELEVANCE = "relevance"  # 相关度（仅关键词搜索，忽略排序方向）
+    INFLUENCE = "influence_score"  # 合作影响力（由 analyze_coops.py 离线计算）
 
 
 class SortOrder(str, Enum):
@@ -23,6 +25,13 @@ class SortOrder(str, Enum):
     DESC = "desc"  # 降序
 
 
+class CountMode(str, Enum):
+    """总数统计模式枚举"""
+    EXACT = "exact"  # 精确计数
+    ESTIMATED = "estimated"  # 超过上限时只返回"10000+"
+    NONE = "none"  # 不计数
+
+
 class RecruitmentType(str, Enum):
     """招生类型枚举"""
     ACADEMIC = "academic"  # 学硕
@@ -56,19 +65,27 @@ class TutorQueryParams(BaseModel):
     # 分页参数
     page: int = Field(1, ge=1, description="页码")
     page_size: int = Field(10, ge=1, le=100, description="每页数量")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的 next_cursor）")
     
     # 排序参数
     sort_by: SortField = Field(SortField.CREATED_AT, description="排序字段")
     sort_order: SortOrder = Field(SortOrder.DESC, description="排序方向")
+    
+    # 计数模式
+    count: CountMode = Field(CountMode.EXACT, description="总数统计模式：exact/estimated/none")
 
 
 class TutorListResponse(BaseModel):
     """导师列表响应模型"""
     list: List[dict]  # 导师列表
-    total: int  # 总数
+    total: Optional[int]  # 总数（count=none 时为空）
+    total_exact: bool = True  # 总数是否精确（count=estimated 且超过上限时为 False）
     page: int  # 当前页码
     page_size: int  # 每页数量
-    total_pages: int  # 总页数
+    total_pages: Optional[int]  # 总页数
+    next_cursor: Optional[str] = None  # 下一页游标
+    fuzzy_terms: Optional[List[str]] = None  # 关键词无精确匹配时实际使用的纠错词条
+    facets: Optional[dict] = None  # 分面统计 {维度: [{"value": 取值, "count": 数量}]}
     
     class Config:
         from_attributes = True
@@ -299,6 +299,28 @@ class TutorBatchDeleteRequest(BaseModel):
         }
 
 
+class TutorBatchFetchRequest(BaseModel):
+    """批量获取导师请求模型"""
+    tutor_ids: List[str] = Field(..., min_items=1, max_items=200, description="导师ID列表（最多200个）")
+    fields: Optional[str] = Field(None, description="只返回指定字段（逗号分隔），默认返回卡片字段")
+    
+    @validator('tutor_ids')
+    def validate_tutor_ids(cls, v):
+        """验证导师ID列表：去除空值并去重，保持输入顺序"""
+        v = [tutor_id.strip() for tutor_id in v if tutor_id and tutor_id.strip()]
+        if not v:
+            raise ValueError('导师ID列表不能为空')
+        return list(dict.fromkeys(v))
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tutor_ids": ["tutor_123", "tutor_456", "tutor_789"],
+                "fields": "id,name,title,school,avatar,is_collected"
+            }
+        }
+
+
 class TutorBatchDeleteResponse(BaseModel):
     """批量删除导师响应模型"""
     success_count: int = Field(..., description="成功删除的数量")
@@ -0,0 +1,4 @@
+"""
+业务服务模块
+提供导师检索索引等进程内服务
+"""
@@ -0,0 +1,268 @@
+"""
+导师合作图离线分析
+基于 coops 共同参与关系（pair_weight_pipeline 聚合出的带权无向图），用 NumPy 稀疏迭代计算：
+1. 加权 PageRank（合作影响力）
+2. 连通分量（最小标签传播 + 指针跳跃）
+3. 标签传播社区划分
+结果写回 tutors 的 influence_score / coop_component / coop_community 字段，
+搜索按 influence_score 排序时不再需要任何请求期的图计算；
+写回后递增 tutor_meta 版本，运行中的服务在下一次导师数据版本重新加载时清空结果缓存并更新 ETag
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from pymongo import UpdateOne
+
+from app.utils.logger import app_logger as logger
+
+# PageRank 参数；二部图（如星形合作关系）的振荡分量每轮只按阻尼系数衰减，
+# 收敛到 1e-8 约需 log(1e-8) / log(0.85) ≈ 113 轮，迭代上限留出余量
+PAGERANK_DAMPING = 0.85
+PAGERANK_TOLERANCE = 1e-8
+PAGERANK_MAX_ITER = 200
+
+# 标签传播社区划分的最大迭代次数
+LPA_MAX_ITER = 30
+
+# 每批写回的导师数量
+WRITE_BATCH_SIZE = 1000
+
+# 写回 tutors 的字段
+INFLUENCE_FIELD = "influence_score"
+COMPONENT_FIELD = "coop_component"
+COMMUNITY_FIELD = "coop_community"
+UPDATED_AT_FIELD = "influence_updated_at"
+
+
+class CoopEdges:
+    """
+    对称的 COO 稀疏邻接表
+
+    每条无向边存两次（rows[i] -> cols[i]），矩阵乘向量用 np.bincount 按行聚合
+    """
+
+    def __init__(self, ids: List[str], rows: np.ndarray, cols: np.ndarray, weights: np.ndarray):
+        self.ids = ids
+        self.rows = rows
+        self.cols = cols
+        self.weights = weights
+
+    @property
+    def size(self) -> int:
+        """节点数量"""
+        return len(self.ids)
+
+    @classmethod
+    def from_pair_weights(cls, pair_weights: Dict[Tuple[str, str], Dict[str, int]]) -> "CoopEdges":
+        """由 {(导师ID a, 导师ID b): {合作类型: 记录数}} 构建（边权为各类型记录数之和）"""
+        ids = sorted({tutor_id for pair in pair_weights for tutor_id in pair})
+        index = {tutor_id: i for i, tutor_id in enumerate(ids)}
+        count = len(pair_weights)
+        a = np.fromiter((index[pair[0]] for pair in pair_weights), dtype=np.int64, count=count)
+        b = np.fromiter((index[pair[1]] for pair in pair_weights), dtype=np.int64, count=count)
+        w = np.fromiter((sum(c.values()) for c in pair_weights.values()), dtype=np.float64, count=count)
+        return cls(ids, np.concatenate([a, b]), np.concatenate([b, a]), np.concatenate([w, w]))
+
+    def multiply(self, vector: np.ndarray) -> np.ndarray:
+        """邻接矩阵乘向量：result[i] = sum_j w(i, j) * vector[j]"""
+        return np.bincount(self.rows, weights=self.weights * vector[self.cols], minlength=self.size)
+
+
+def pagerank(edges: CoopEdges) -> Tuple[np.ndarray, int]:
+    """
+    加权 PageRank（幂迭代）
+
+    Returns:
+        (各节点分数（和为 1）, 迭代次数)
+    """
+    n = edges.size
+    if not n:
+        return np.zeros(0), 0
+    strength = np.bincount(edges.rows, weights=edges.weights, minlength=n)
+    dangling = strength == 0
+    inv_strength = np.divide(1.0, strength, out=np.zeros(n), where=~dangling)
+    scores = np.full(n, 1.0 / n)
+    for iteration in range(1, PAGERANK_MAX_ITER + 1):
+        spread = edges.multiply(scores * inv_strength)
+        updated = (1 - PAGERANK_DAMPING) / n + PAGERANK_DAMPING * (spread + scores[dangling].sum() / n)
+        delta = np.abs(updated - scores).sum()
+        scores = updated
+        if delta < PAGERANK_TOLERANCE:
+            return scores, iteration
+    return scores, PAGERANK_MAX_ITER
+
+
+def connected_components(edges: CoopEdges) -> np.ndarray:
+    """
+    连通分量：每个节点反复取邻居中的最小标签，并用指针跳跃（labels[labels]）加速收敛
+
+    Returns:
+        各节点所在分量的标签（分量内最小的节点号）
+    """
+    labels = np.arange(edges.size)
+    while True:
+        updated = labels.copy()
+        np.minimum.at(updated, edges.rows, labels[edges.cols])
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def greedy_coloring(edges: CoopEdges) -> np.ndarray:
+    """
+    贪心着色：按度数降序，每个节点取邻居未使用的最小颜色（相邻节点颜色不同）
+
+    Returns:
+        各节点的颜色编号
+    """
+    n = edges.size
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges.rows, minlength=n), out=indptr[1:])
+    neighbors = edges.cols[np.argsort(edges.rows, kind="stable")]
+    colors = np.full(n, -1, dtype=np.int64)
+    for node in np.argsort(-np.diff(indptr), kind="stable").tolist():
+        used = set(colors[neighbors[indptr[node]:indptr[node + 1]]].tolist())
+        color = 0
+        while color in used:
+            color += 1
+        colors[node] = color
+    return colors
+
+
+def label_propagation(edges: CoopEdges) -> Tuple[np.ndarray, int]:
+    """
+    半同步加权标签传播
+
+    每个节点取邻居中边权总和最大的标签（同分取较小标签），只有该标签的总权重严格大于
+    邻居中当前标签的总权重时才改变，每次改变都使同标签边权之和严格增加；
+    节点按贪心着色分批更新，同色节点互不相邻，批内同时更新等价于逐个异步更新，
+    不会出现同步更新的两两互换振荡；标签不再变化或达到 LPA_MAX_ITER 时停止
+
+    Returns:
+        (各节点社区标签, 迭代次数)
+    """
+    n = edges.size
+    labels = np.arange(n)
+    if not n:
+        return labels, 0
+    colors = greedy_coloring(edges)
+    batches = []
+    for color in range(int(colors.max()) + 1):
+        edge_mask = colors[edges.rows] == color
+        batches.append((edges.rows[edge_mask], edges.cols[edge_mask], edges.weights[edge_mask]))
+
+    for iteration in range(1, LPA_MAX_ITER + 1):
+        changed = False
+        for rows, cols, weights in batches:
+            candidates = labels[cols]
+            # 按 (节点, 邻居标签) 聚合边权
+            keys, inverse = np.unique(rows * n + candidates, return_inverse=True)
+            totals = np.bincount(inverse, weights=weights)
+            key_rows, key_labels = keys // n, keys % n
+            current_totals = np.zeros(n)
+            current = key_labels == labels[key_rows]
+            current_totals[key_rows[current]] = totals[current]
+            # 每个节点取总权重最大、同分时标签最小的一项
+            order = np.lexsort((key_labels, -totals, key_rows))
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = key_rows[order][1:] != key_rows[order][:-1]
+            best = order[first]
+            move = totals[best] > current_totals[key_rows[best]]
+            if move.any():
+                labels[key_rows[best][move]] = key_labels[best][move]
+                changed = True
+        if not changed:
+            return labels, iteration
+    return labels, LPA_MAX_ITER
+
+
+def rank_labels(labels: np.ndarray) -> np.ndarray:
+    """把标签重新编号为 0, 1, 2...（按规模降序，同规模按原标签升序）"""
+    if not len(labels):
+        return labels
+    unique, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+    order = np.lexsort((unique, -counts))
+    rank = np.empty(len(unique), dtype=np.int64)
+    rank[order] = np.arange(len(unique))
+    return rank[inverse]
+
+
+async def write_scores(db, edges: CoopEdges, scores: np.ndarray, components: np.ndarray, communities: np.ndarray) -> Dict[str, int]:
+    """
+    分批写回分析结果；本次不在合作图中、但仍保留旧分数的导师清零（已清零的导师不再重复写入）。
+    写回不修改导师的 updated_at，因此写完后递增 tutor_meta 版本，通知运行中的服务
+
+    Returns:
+        {"updated": 写入分数的导师数, "reset": 清零的导师数, "tutor_version": 递增后的导师数据版本}
+    """
+    # 延迟导入：图算法部分是纯 NumPy 计算，单元测试不需要数据库连接
+    from app.services.tutor_versions import bump_tutor_meta
+
+    run_at = datetime.utcnow()
+    # 分数按平均值为 1 缩放，便于阅读；排序只依赖相对大小
+    influence = np.round(scores * edges.size, 6)
+    updated = 0
+    operations = []
+    for i, tutor_id in enumerate(edges.ids):
+        operations.append(UpdateOne({"id": tutor_id}, {"$set": {
+            INFLUENCE_FIELD: float(influence[i]),
+            COMPONENT_FIELD: int(components[i]),
+            COMMUNITY_FIELD: int(communities[i]),
+            UPDATED_AT_FIELD: run_at,
+        }}))
+        if len(operations) >= WRITE_BATCH_SIZE:
+            updated += (await db.tutors.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await db.tutors.bulk_write(operations, ordered=False)).modified_count
+
+    reset = await db.tutors.update_many(
+        {UPDATED_AT_FIELD: {"$ne": run_at}, INFLUENCE_FIELD: {"$ne": 0.0}},
+        {"$set": {
+            INFLUENCE_FIELD: 0.0,
+            COMPONENT_FIELD: None,
+            COMMUNITY_FIELD: None,
+            UPDATED_AT_FIELD: run_at,
+        }}
+    )
+    tutor_version = await bump_tutor_meta(db)
+    return {"updated": updated, "reset": reset.modified_count, "tutor_version": tutor_version}
+
+
+async def run_coop_analytics(db, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    执行一次合作图分析
+
+    Args:
+        db: 数据库实例
+        dry_run: 只计算不写回
+
+    Returns:
+        统计信息（节点/边/分量/社区数量、迭代次数、写入数量、耗时）
+    """
+    from app.services.coop_graph import load_pair_weights
+
+    start = time.time()
+    edges = CoopEdges.from_pair_weights(await load_pair_weights(db))
+    scores, pagerank_iterations = pagerank(edges)
+    components = rank_labels(connected_components(edges))
+    communities, lpa_iterations = label_propagation(edges)
+    communities = rank_labels(communities)
+
+    stats: Dict[str, Any] = {
+        "nodes": edges.size,
+        "edges": len(edges.rows) // 2,
+        "components": int(components.max()) + 1 if edges.size else 0,
+        "communities": int(communities.max()) + 1 if edges.size else 0,
+        "pagerank_iterations": pagerank_iterations,
+        "lpa_iterations": lpa_iterations,
+    }
+    if not dry_run:
+        stats.update(await write_scores(db, edges, scores, components, communities))
+    stats["elapsed_ms"] = round((time.time() - start) * 1000)
+    logger.info(f"导师合作图分析完成: {stats}")
+    return stats
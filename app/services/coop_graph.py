@@ -0,0 +1,581 @@
+"""
+导师合作关系图
+从 coops 集合的 members.id 构建无向合作图：同一条合作记录中的任意两位成员之间连一条边，
+边权为共同参与的合作记录数（按合作类型分别计数，由一次 $unwind/$group 聚合批量算出）；
+邻接关系以 CSR 数组（indptr / indices / weights）常驻内存，
+每行按边权降序存放，读取一位导师的合作者只需 O(度数) 的切片，不访问 MongoDB。
+coops 变更通过 change stream 增量更新（不支持时按间隔全量重建）
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from pymongo.errors import PyMongoError
+
+from app.db.mongo import get_db
+from app.utils.logger import app_logger as logger
+
+# 成员超过 N 位的合作记录不生成边（避免超大作者列表产生平方级的边）
+MAX_COOP_MEMBERS = 50
+
+# 缺少 type 的合作记录计入该类型
+OTHER_COOP_TYPE = "other"
+
+# 增量更新的行超过该数量时重新压缩为 CSR
+COMPACT_THRESHOLD = 1000
+
+# change stream 单次等待时间（毫秒）
+WATCH_AWAIT_MS = 1000
+
+# 多跳扩展的默认预算：最多返回的节点数、每个节点最多展开的合作者数、耗时上限（秒）
+EXPAND_MAX_NODES = 200
+EXPAND_MAX_FANOUT = 30
+GRAPH_TIME_BUDGET = 0.05
+
+# 最短路径查询的默认预算：最大跳数、最多检查的边数
+PATH_MAX_DEPTH = 6
+PATH_MAX_VISITS = 50000
+
+# 节点展示信息取自合作记录中的成员字段
+MEMBER_FIELDS = ("name", "school", "department", "jobname", "avatar")
+
+# 构建图时读取的字段
+COOP_PROJECTION = {
+    "_id": 1,
+    "type": 1,
+    "type_cn": 1,
+    "title": 1,
+    "title_cn": 1,
+    **{f"members.{field}": 1 for field in ("id",) + MEMBER_FIELDS},
+}
+
+# 无向边 (较小节点号, 较大节点号)
+Pair = Tuple[int, int]
+
+
+def coop_members(coop: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """合作记录中带ID的成员（按ID去重，保持顺序）"""
+    members = {}
+    for member in coop.get("members") or []:
+        if isinstance(member, dict) and member.get("id") and member["id"] not in members:
+            members[member["id"]] = member
+    return list(members.values())
+
+
+def coop_type(coop: Dict[str, Any]) -> str:
+    """合作记录的类型（与 pair_weight_pipeline 的 $ifNull 一致）"""
+    value = coop.get("type")
+    return OTHER_COOP_TYPE if value is None else str(value)
+
+
+def pair_weight_pipeline(match: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    导师两两共同参与的合作记录数（按合作类型分组）的聚合管道
+
+    展开成员后按合作记录收集去重的成员ID，再展开两次只保留 a < b 的成员对，
+    最后一次 $group 得到 {_id: {a, b, type}, count}；与 CoopGraph 增量更新的计数规则一致
+
+    Args:
+        match: 额外的 coops 筛选条件（如只统计某位导师参与的合作）
+    """
+    return [
+        {"$match": {"members.id": {"$exists": True}, **(match or {})}},
+        {"$unwind": "$members"},
+        {"$match": {"members.id": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": "$_id",
+            "type": {"$first": {"$ifNull": ["$type", OTHER_COOP_TYPE]}},
+            "ids": {"$addToSet": "$members.id"}
+        }},
+        {"$match": {f"ids.{MAX_COOP_MEMBERS}": {"$exists": False}}},
+        {"$project": {"_id": 0, "type": 1, "a": "$ids", "b": "$ids"}},
+        {"$unwind": "$a"},
+        {"$unwind": "$b"},
+        {"$match": {"$expr": {"$lt": ["$a", "$b"]}}},
+        {"$group": {"_id": {"a": "$a", "b": "$b", "type": "$type"}, "count": {"$sum": 1}}},
+    ]
+
+
+async def load_pair_weights(db, tutor_id: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, int]]:
+    """
+    读取导师两两之间按合作类型的共同合作记录数
+
+    Args:
+        db: 数据库实例
+        tutor_id: 只统计该导师参与的合作记录（为空时统计全部）
+
+    Returns:
+        {(导师ID a, 导师ID b): {合作类型: 记录数}}，a < b
+    """
+    weights: Dict[Tuple[str, str], Dict[str, int]] = {}
+    match = {"members.id": tutor_id} if tutor_id else None
+    async for row in db.coops.aggregate(pair_weight_pipeline(match)):
+        key = row["_id"]
+        weights.setdefault((key["a"], key["b"]), {})[str(key["type"])] = row["count"]
+    return weights
+
+
+class CoopGraph:
+    """
+    导师合作图
+
+    _pair_weights 保存全部边按合作类型的计数（增量更新的依据），_indptr/_indices/_weights 为压缩后的只读邻接表（总边权）；
+    增量更新只改动涉及的行，改动的行暂存在 _overlay 中（读取时优先），累计过多时整体重新压缩
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.built_at: Optional[float] = None
+        self.version = 0
+        self._index: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._nodes: List[Dict[str, Any]] = []
+        self._coop_members: Dict[str, List[int]] = {}
+        self._coop_info: Dict[str, Dict[str, Any]] = {}
+        self._node_coops: Dict[int, Dict[str, None]] = {}
+        self._pair_weights: Dict[Pair, Dict[str, int]] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.int32)
+        self._overlay: Dict[int, Dict[int, int]] = {}
+
+    @property
+    def node_count(self) -> int:
+        """节点（出现在合作记录中的导师）数量"""
+        return len(self._ids)
+
+    @property
+    def edge_count(self) -> int:
+        """无向边数量"""
+        return len(self._pair_weights)
+
+    def _node(self, member: Dict[str, Any]) -> int:
+        """成员对应的节点号（新成员分配节点号），同时刷新展示信息"""
+        tutor_id = member["id"]
+        node = self._index.get(tutor_id)
+        if node is None:
+            node = len(self._ids)
+            self._index[tutor_id] = node
+            self._ids.append(tutor_id)
+            self._nodes.append({})
+        attrs = self._nodes[node]
+        for field in MEMBER_FIELDS:
+            if member.get(field):
+                attrs[field] = member[field]
+        return node
+
+    def _register_coop(self, key: str, coop: Dict[str, Any]) -> List[int]:
+        """登记合作记录的成员与摘要（不改动边权），返回成员节点号"""
+        members = [self._node(member) for member in coop_members(coop)]
+        self._coop_members[key] = members
+        self._coop_info[key] = {
+            "type": coop_type(coop),
+            "type_cn": coop.get("type_cn"),
+            "title": coop.get("title_cn") or coop.get("title")
+        }
+        for node in members:
+            self._node_coops.setdefault(node, {})[key] = None
+        return members
+
+    def _coop_pairs(self, members: List[int]) -> List[Pair]:
+        """合作记录产生的边（成员过多时不产生边）"""
+        if len(members) > MAX_COOP_MEMBERS:
+            return []
+        return [
+            (a, b) if a < b else (b, a)
+            for i, a in enumerate(members)
+            for b in members[i + 1:]
+        ]
+
+    def _add_coop(self, key: str, coop: Dict[str, Any], touched: Set[int]) -> None:
+        """加入一条合作记录：成员两两之间该类型计数 +1"""
+        members = self._register_coop(key, coop)
+        type_ = self._coop_info[key]["type"]
+        for pair in self._coop_pairs(members):
+            counts = self._pair_weights.setdefault(pair, {})
+            counts[type_] = counts.get(type_, 0) + 1
+            self._touch_pair(pair, 1, touched)
+
+    def _remove_coop(self, key: str, touched: Set[int]) -> None:
+        """移除一条合作记录：成员两两之间该类型计数 -1"""
+        members = self._coop_members.pop(key, None)
+        info = self._coop_info.pop(key, None)
+        if not members:
+            return
+        for node in members:
+            coops = self._node_coops.get(node)
+            if coops is not None:
+                coops.pop(key, None)
+        for pair in self._coop_pairs(members):
+            counts = self._pair_weights.get(pair)
+            if counts is None:
+                continue
+            count = counts.get(info["type"], 0) - 1
+            if count > 0:
+                counts[info["type"]] = count
+            else:
+                counts.pop(info["type"], None)
+            if not counts:
+                del self._pair_weights[pair]
+            self._touch_pair(pair, -1, touched)
+
+    def _touch_pair(self, pair: Pair, delta: int, touched: Set[int]) -> None:
+        """增量更新时同步改动两端节点的暂存行"""
+        for node, other in (pair, pair[::-1]):
+            row = self._overlay.get(node)
+            if row is None:
+                row = self._overlay[node] = dict(self._csr_row(node))
+            weight = row.get(other, 0) + delta
+            if weight > 0:
+                row[other] = weight
+            else:
+                row.pop(other, None)
+            touched.add(node)
+
+    def _csr_row(self, node: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """压缩邻接表中一行的前 limit 项 [(邻居节点号, 边权)]（边权降序）"""
+        if node + 1 >= len(self._indptr):
+            return []
+        start, end = self._indptr[node], self._indptr[node + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        return list(zip(self._indices[start:end].tolist(), self._weights[start:end].tolist()))
+
+    def _compact(self) -> None:
+        """由全部边权重新生成 CSR 数组（每行按边权降序、邻居节点号升序）"""
+        n = len(self._ids)
+        if self._pair_weights:
+            pairs = np.array(list(self._pair_weights.keys()), dtype=np.int32)
+            weights = np.fromiter(
+                (sum(counts.values()) for counts in self._pair_weights.values()),
+                dtype=np.int32,
+                count=len(self._pair_weights)
+            )
+            rows = np.concatenate([pairs[:, 0], pairs[:, 1]])
+            cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+            weights = np.concatenate([weights, weights])
+            order = np.lexsort((cols, -weights, rows))
+            rows, cols, weights = rows[order], cols[order], weights[order]
+        else:
+            rows = cols = weights = np.zeros(0, dtype=np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        self._indptr, self._indices, self._weights = indptr, cols.astype(np.int32), weights.astype(np.int32)
+        self._overlay = {}
+
+    async def build(self, db) -> None:
+        """
+        从 coops 集合全量构建合作图
+
+        成员与摘要逐条读取，边权由 pair_weight_pipeline 在数据库端一次聚合得到；
+        先在新实例中构建，完成后整体替换，构建期间查询继续使用旧图
+
+        Args:
+            db: 数据库实例
+        """
+        start = time.time()
+        try:
+            fresh = CoopGraph()
+            async for coop in db.coops.find({"members.id": {"$exists": True}}, COOP_PROJECTION):
+                fresh._register_coop(str(coop["_id"]), coop)
+            for (a, b), counts in (await load_pair_weights(db)).items():
+                node_a, node_b = fresh._index.get(a), fresh._index.get(b)
+                if node_a is not None and node_b is not None:
+                    pair = (node_a, node_b) if node_a < node_b else (node_b, node_a)
+                    fresh._pair_weights[pair] = counts
+            fresh._compact()
+            fresh.ready = True
+            fresh.built_at = time.time()
+            fresh.version = self.version + 1
+            self.__dict__.update(fresh.__dict__)
+            logger.info(
+                f"导师合作图构建完成: {self.node_count} 位导师, {self.edge_count} 条合作关系, "
+                f"{len(self._coop_members)} 条合作记录, 耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.error(f"导师合作图构建失败，关系图谱回退到数据库查询: {str(e)}")
+
+    def apply_coop_changes(self, coops: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """
+        合作记录变更处理（增量更新）
+
+        Args:
+            coops: {合作记录 _id 字符串: 最新合作记录（已删除时为 None）}
+        """
+        touched: Set[int] = set()
+        for key, coop in coops.items():
+            self._remove_coop(key, touched)
+            if coop is not None:
+                self._add_coop(key, coop, touched)
+        self.version += 1
+        if len(self._overlay) > COMPACT_THRESHOLD:
+            self._compact()
+
+    def _row(self, node: int, limit: Optional[int] = None) -> List[Tuple[int, int]]:
+        """节点的邻接行 [(邻居节点号, 边权)]（边权降序，暂存行优先）"""
+        row = self._overlay.get(node)
+        if row is None:
+            return self._csr_row(node, limit)
+        return sorted(row.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def _edge_weight(self, a: int, b: int) -> int:
+        """两节点之间的总边权"""
+        return sum(self._pair_weights.get((a, b) if a < b else (b, a), {}).values())
+
+    def neighbors(self, tutor_id: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        导师的合作者（按共同合作记录数降序）
+
+        Args:
+            tutor_id: 导师ID
+            limit: 最多返回数量
+
+        Returns:
+            [(合作者ID, 共同合作记录数)]；导师不在图中时返回空列表
+        """
+        node = self._index.get(tutor_id)
+        if node is None:
+            return []
+        return [(self._ids[other], weight) for other, weight in self._row(node, limit)]
+
+    def expand(
+        self,
+        tutor_id: str,
+        hops: int,
+        max_nodes: int = EXPAND_MAX_NODES,
+        max_fanout: int = EXPAND_MAX_FANOUT,
+        time_budget: float = GRAPH_TIME_BUDGET
+    ) -> Optional[Dict[str, Any]]:
+        """
+        从导师出发的有界广度优先扩展
+
+        每个节点只展开边权最高的 max_fanout 位合作者，节点数或耗时达到预算时停止，
+        高度数的导师不会让单次查询的耗时失控
+
+        Args:
+            tutor_id: 起点导师ID
+            hops: 最大跳数
+            max_nodes: 最多返回的节点数（含起点）
+            max_fanout: 每个节点最多展开的合作者数
+            time_budget: 耗时上限（秒）
+
+        Returns:
+            {"nodes": [(导师ID, 跳数)], "edges": [(导师ID, 导师ID, 边权)], "truncated": 是否因预算截断}；
+            导师不在图中时返回 None
+        """
+        start = self._index.get(tutor_id)
+        if start is None:
+            return None
+        deadline = time.perf_counter() + time_budget
+        depth = {start: 0}
+        edges: Dict[Pair, int] = {}
+        frontier = [start]
+        truncated = False
+        for level in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                if time.perf_counter() > deadline:
+                    truncated = True
+                    break
+                row = self._row(node, max_fanout + 1)
+                if len(row) > max_fanout:
+                    truncated = True
+                for other, weight in row[:max_fanout]:
+                    if other not in depth:
+                        if len(depth) >= max_nodes:
+                            truncated = True
+                            continue
+                        depth[other] = level
+                        next_frontier.append(other)
+                    edges[(node, other) if node < other else (other, node)] = weight
+            frontier = next_frontier
+            if not frontier or (truncated and len(depth) >= max_nodes):
+                break
+        return {
+            "nodes": [(self._ids[node], hop) for node, hop in depth.items()],
+            "edges": [(self._ids[a], self._ids[b], weight) for (a, b), weight in edges.items()],
+            "truncated": truncated
+        }
+
+    def shortest_path(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: int = PATH_MAX_DEPTH,
+        max_visits: int = PATH_MAX_VISITS,
+        time_budget: float = GRAPH_TIME_BUDGET
+    ) -> Tuple[Optional[List[Tuple[str, int]]], bool]:
+        """
+        两位导师之间跳数最少的合作路径（双向广度优先搜索）
+
+        每轮扩展较小的一侧前沿，整层扩展完再在相遇节点中取总跳数最小者
+
+        Args:
+            source_id: 起点导师ID
+            target_id: 终点导师ID
+            max_depth: 最大跳数
+            max_visits: 最多检查的边数
+            time_budget: 耗时上限（秒）
+
+        Returns:
+            (路径 [(导师ID, 与上一节点的边权)]（起点边权为 0）或 None, 是否因预算未能完成搜索)
+        """
+        source, target = self._index.get(source_id), self._index.get(target_id)
+        if source is None or target is None:
+            return None, False
+        if source == target:
+            return [(source_id, 0)], False
+
+        deadline = time.perf_counter() + time_budget
+        # 两侧的 {节点: (父节点, 到本侧起点的跳数)}
+        seen: Tuple[Dict[int, Tuple[Optional[int], int]], ...] = ({source: (None, 0)}, {target: (None, 0)})
+        frontiers = [[source], [target]]
+        depths = [0, 0]
+        visits = 0
+        while frontiers[0] and frontiers[1] and depths[0] + depths[1] < max_depth:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, theirs = seen[side], seen[1 - side]
+            depths[side] += 1
+            next_frontier = []
+            meets = []
+            for node in frontiers[side]:
+                if time.perf_counter() > deadline:
+                    return None, True
+                for other, _ in self._row(node):
+                    visits += 1
+                    if visits > max_visits:
+                        return None, True
+                    if other in mine:
+                        continue
+                    mine[other] = (node, depths[side])
+                    next_frontier.append(other)
+                    if other in theirs:
+                        meets.append(other)
+            if meets:
+                meet = min(meets, key=lambda n: (seen[0][n][1] + seen[1][n][1], n))
+                return self._join_path(meet, seen), False
+            frontiers[side] = next_frontier
+        return None, bool(frontiers[0] and frontiers[1])
+
+    def _join_path(self, meet: int, seen: Tuple[Dict[int, Tuple[Optional[int], int]], ...]) -> List[Tuple[str, int]]:
+        """由双向搜索的父节点表拼出 起点 -> 相遇节点 -> 终点 的路径"""
+        nodes = []
+        node: Optional[int] = meet
+        while node is not None:
+            nodes.append(node)
+            node = seen[0][node][0]
+        nodes.reverse()
+        node = seen[1][meet][0]
+        while node is not None:
+            nodes.append(node)
+            node = seen[1][node][0]
+        return [
+            (self._ids[node], self._edge_weight(nodes[i - 1], node) if i else 0)
+            for i, node in enumerate(nodes)
+        ]
+
+    def degree(self, tutor_id: str) -> int:
+        """导师的合作者数量"""
+        node = self._index.get(tutor_id)
+        if node is None:
+            return 0
+        row = self._overlay.get(node)
+        if row is not None:
+            return len(row)
+        if node + 1 >= len(self._indptr):
+            return 0
+        return int(self._indptr[node + 1] - self._indptr[node])
+
+    def pair_weights(self, tutor_id: str, other_id: str) -> Dict[str, int]:
+        """两位导师按合作类型的共同合作记录数 {合作类型: 记录数}"""
+        a, b = self._index.get(tutor_id), self._index.get(other_id)
+        if a is None or b is None:
+            return {}
+        return dict(self._pair_weights.get((a, b) if a < b else (b, a), {}))
+
+    def shared_coops(self, tutor_id: str, other_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """两位导师共同参与的合作记录摘要（按加入图的先后）"""
+        a, b = self._index.get(tutor_id), self._index.get(other_id)
+        if a is None or b is None:
+            return []
+        other_coops = self._node_coops.get(b, {})
+        shared = [self._coop_info[key] for key in self._node_coops.get(a, {}) if key in other_coops]
+        return shared[:limit]
+
+    def node_info(self, tutor_id: str) -> Dict[str, Any]:
+        """合作记录中该导师的展示信息（姓名/学校/院系/职称/头像）"""
+        node = self._index.get(tutor_id)
+        return dict(self._nodes[node]) if node is not None else {}
+
+    def coops_of(self, tutor_id: str) -> List[Dict[str, Any]]:
+        """导师参与的合作记录摘要 [{type, type_cn, title}]（按加入图的先后）"""
+        node = self._index.get(tutor_id)
+        if node is None:
+            return []
+        return [self._coop_info[key] for key in self._node_coops.get(node, ()) if key in self._coop_info]
+
+    def _apply_change_event(self, change: Dict[str, Any]) -> None:
+        """处理一条 change stream 事件"""
+        key = str(change.get("documentKey", {}).get("_id"))
+        operation = change.get("operationType")
+        if operation == "delete":
+            self.apply_coop_changes({key: None})
+        elif operation in ("insert", "update", "replace"):
+            self.apply_coop_changes({key: change.get("fullDocument")})
+
+    async def _resume_token(self, db) -> Optional[Dict[str, Any]]:
+        """
+        打开 coops change stream 并记录当前位置（在全量读取之前调用）
+
+        Returns:
+            resume token；数据库不支持 change stream（单机部署）时返回 None
+        """
+        try:
+            async with db.coops.watch(max_await_time_ms=WATCH_AWAIT_MS) as stream:
+                return stream.resume_token
+        except PyMongoError as e:
+            logger.info(f"coops 不支持 change stream，合作图按间隔全量重建: {str(e)}")
+            return None
+
+    async def _watch(self, db, duration: float, resume_after: Dict[str, Any]) -> bool:
+        """
+        从 resume_after 开始监听 coops 变更并增量更新，持续 duration 秒；
+        全量构建期间发生的变更同样会被重放（重复应用同一变更是幂等的）
+
+        Returns:
+            change stream 不可用（如 oplog 已覆盖 resume token）时返回 False
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        try:
+            async with db.coops.watch(
+                full_document="updateLookup", max_await_time_ms=WATCH_AWAIT_MS,
+                resume_after=resume_after
+            ) as stream:
+                while loop.time() < deadline:
+                    change = await stream.try_next()
+                    if change is not None:
+                        self._apply_change_event(change)
+            return True
+        except PyMongoError as e:
+            logger.warning(f"coops change stream 中断，合作图按间隔全量重建: {str(e)}")
+            return False
+
+    async def run(self, interval: int) -> None:
+        """
+        启动时构建合作图，之后监听增量变更，并按间隔全量重建（校正展示信息与压缩）
+
+        构建前先记录 change stream 位置，构建完成后从该位置重放，构建期间的变更不会丢失
+        """
+        while True:
+            db = get_db()
+            resume_after = await self._resume_token(db)
+            await self.build(db)
+            if resume_after is None or not await self._watch(db, interval, resume_after):
+                await asyncio.sleep(interval)
+
+
+# 全局合作图实例
+coop_graph = CoopGraph()
@@ -0,0 +1,219 @@
+"""
+导师筛选选项快照
+预先计算筛选抽屉所需的学校/院系/职称/研究方向/标签列表，
+常驻内存并持久化到 tutor_filter_options 集合；导师变更或定时器触发后台刷新，
+请求始终直接返回最近一次快照（stale-while-revalidate）
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.utils.logger import app_logger as logger
+
+# 快照持久化集合与文档ID
+SNAPSHOT_COLLECTION = "tutor_filter_options"
+SNAPSHOT_ID = "current"
+
+# 研究方向与标签保留的数量
+TOP_RESEARCH_DIRECTIONS = 50
+TOP_TAGS = 30
+
+RECRUITMENT_TYPES = [
+    {"value": "academic", "label": "学硕"},
+    {"value": "professional", "label": "专硕"},
+    {"value": "both", "label": "学硕+专硕"}
+]
+
+# 单次聚合同时计算所有筛选项（兼容导入数据与管理接口写入的两套字段名）
+SNAPSHOT_PIPELINE = [
+    {"$match": live_tutor_filter()},
+    {
+        "$project": {
+            "school": {"$ifNull": ["$school_name", "$school"]},
+            "department": {"$ifNull": ["$department_name", "$department"]},
+            "title": {"$ifNull": ["$jobname", "$title"]},
+            "research_direction": {"$ifNull": ["$research_direction", "$direction"]},
+            "tags": 1
+        }
+    },
+    {
+        "$facet": {
+            "departments": [
+                {"$group": {"_id": {"school": "$school", "department": "$department"}}}
+            ],
+            "titles": [
+                {"$group": {"_id": "$title"}}
+            ],
+            "research_directions": [
+                {"$match": {"research_direction": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$research_direction", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": TOP_RESEARCH_DIRECTIONS}
+            ],
+            "tags": [
+                {"$unwind": "$tags"},
+                {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": TOP_TAGS}
+            ]
+        }
+    }
+]
+
+
+class FilterOptionsSnapshot:
+    """筛选选项快照（进程内单例）"""
+
+    def __init__(self):
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._dirty = False
+
+    @property
+    def built_at(self) -> Optional[datetime]:
+        """当前快照的生成时间"""
+        return self._snapshot["built_at"] if self._snapshot else None
+
+    async def load(self) -> bool:
+        """从持久化集合加载上一次的快照，返回是否加载成功"""
+        try:
+            doc = await get_db()[SNAPSHOT_COLLECTION].find_one({"_id": SNAPSHOT_ID})
+        except Exception as e:
+            logger.error(f"加载筛选选项快照失败: {str(e)}")
+            return False
+        if not doc:
+            return False
+        doc.pop("_id", None)
+        self._snapshot = doc
+        return True
+
+    async def refresh(self) -> Dict[str, Any]:
+        """重新计算快照并持久化"""
+        start = time.time()
+        db = get_db()
+        result = await db.tutors.aggregate(SNAPSHOT_PIPELINE).to_list(length=1)
+        facet = result[0] if result else {}
+
+        departments_by_school: Dict[str, set] = {}
+        for item in facet.get("departments", []):
+            school = item["_id"].get("school")
+            department = item["_id"].get("department")
+            if not school:
+                continue
+            departments = departments_by_school.setdefault(school, set())
+            if department:
+                departments.add(department)
+
+        snapshot = {
+            "schools": sorted(departments_by_school),
+            "school_departments": [
+                {"school": school, "departments": sorted(departments)}
+                for school, departments in sorted(departments_by_school.items())
+            ],
+            "departments": sorted({
+                item["_id"]["department"] for item in facet.get("departments", [])
+                if item["_id"].get("department")
+            }),
+            "titles": sorted(item["_id"] for item in facet.get("titles", []) if item["_id"]),
+            "research_directions": [item["_id"] for item in facet.get("research_directions", [])],
+            "tags": [item["_id"] for item in facet.get("tags", [])],
+            "built_at": datetime.now()
+        }
+        self._snapshot = snapshot
+
+        try:
+            await db[SNAPSHOT_COLLECTION].replace_one(
+                {"_id": SNAPSHOT_ID}, snapshot, upsert=True
+            )
+        except Exception as e:
+            logger.error(f"持久化筛选选项快照失败: {str(e)}")
+
+        logger.info(
+            f"筛选选项快照刷新完成: 学校 {len(snapshot['schools'])}, "
+            f"院系 {len(snapshot['departments'])}, 耗时 {(time.time() - start) * 1000:.0f}ms"
+        )
+        return snapshot
+
+    def schedule_refresh(self) -> None:
+        """
+        触发后台刷新
+
+        刷新进行中时只标记为脏，当前刷新结束后再补一次，
+        短时间内的多次写入合并为最多两次聚合
+        """
+        if self._refresh_task and not self._refresh_task.done():
+            self._dirty = True
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_until_clean())
+
+    async def _refresh_until_clean(self) -> None:
+        """后台刷新，直到刷新期间没有新的变更"""
+        while True:
+            self._dirty = False
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"刷新筛选选项快照失败: {str(e)}")
+                return
+            if not self._dirty:
+                return
+
+    def handle_tutor_change(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理：安排后台刷新"""
+        self.schedule_refresh()
+
+    async def run(self, interval: int) -> None:
+        """
+        启动时加载持久化快照并在后台刷新，之后按固定间隔定时刷新
+
+        Args:
+            interval: 定时刷新间隔（秒）
+        """
+        await self.load()
+        while True:
+            self.schedule_refresh()
+            await asyncio.sleep(interval)
+
+    async def get(self, school: Optional[str] = None) -> Dict[str, Any]:
+        """
+        获取筛选选项
+
+        有快照时立即返回（可能略旧），尚无任何快照时同步计算一次
+
+        Args:
+            school: 学校名称（可选，返回该学校的院系列表）
+
+        Returns:
+            筛选选项
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.refresh()
+
+        departments = snapshot["departments"]
+        if school:
+            departments = next(
+                (item["departments"] for item in snapshot["school_departments"]
+                 if item["school"] == school),
+                []
+            )
+
+        return {
+            "schools": snapshot["schools"],
+            "departments": departments,
+            "titles": snapshot["titles"],
+            "research_directions": snapshot["research_directions"],
+            "tags": snapshot["tags"],
+            "recruitment_types": RECRUITMENT_TYPES,
+            "updated_at": snapshot["built_at"]
+        }
+
+
+# 全局快照实例
+filter_options_snapshot = FilterOptionsSnapshot()
+on_tutor_change(filter_options_snapshot.handle_tutor_change)
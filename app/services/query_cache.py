@@ -0,0 +1,125 @@
+"""
+导师查询结果缓存
+以规范化后的筛选/排序/分页参数为键，在进程内缓存列表与搜索接口的响应数据；
+容量按 LRU 淘汰并带 TTL，导师写入后递增版本号使全部已缓存结果失效
+"""
+
+import time
+import unicodedata
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config.app import app_settings
+from app.services.tutor_events import on_tutor_change
+
+
+def _canonical(value: Any) -> Any:
+    """规范化单个参数值：枚举取值、字符串去空白并统一全半角、列表去重排序"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, str):
+        return unicodedata.normalize("NFKC", value).strip()
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted({_canonical(v) for v in value}))
+    return value
+
+
+class QueryCache:
+    """
+    LRU + TTL 结果缓存
+
+    每条缓存记录写入时的数据版本，读取时版本不一致即视为失效；
+    请求开始时取得版本号、查询完成后再以该版本写入，
+    查询期间发生的写操作会使这次结果直接被丢弃，不会缓存旧数据
+    """
+
+    def __init__(self, max_entries: int, ttl: int, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, Tuple[int, float, Any]]" = OrderedDict()
+
+    @staticmethod
+    def make_key(namespace: str, **params: Any) -> Tuple:
+        """
+        生成缓存键
+
+        Args:
+            namespace: 接口名，如 "tutor_search"
+            **params: 查询参数，值为 None / 空字符串的参数与未传入等价
+
+        Returns:
+            可哈希的缓存键
+        """
+        items = []
+        for name, value in params.items():
+            value = _canonical(value)
+            if value is None or value == "" or value == ():
+                continue
+            items.append((name, value))
+        return (namespace, tuple(sorted(items)))
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """读取缓存，未命中、已过期或版本过旧时返回 None"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        version, expires_at, value = entry
+        if version != self.version or expires_at < time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Tuple, value: Any, version: int) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 响应数据（写入后不应再被修改）
+            version: 开始查询时的数据版本，与当前版本不一致时不写入
+        """
+        if not self.enabled or version != self.version:
+            return
+        self._entries[key] = (version, time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """递增版本号，使全部已缓存结果失效"""
+        self.version += 1
+        self._entries.clear()
+
+    def handle_tutor_change(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理：任意导师写入都会影响列表/搜索结果"""
+        self.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# 全局结果缓存实例
+query_cache = QueryCache(
+    max_entries=app_settings.CACHE_MAX_ENTRIES,
+    ttl=app_settings.CACHE_TTL,
+    enabled=app_settings.CACHE_ENABLED
+)
+on_tutor_change(query_cache.handle_tutor_change)
@@ -0,0 +1,66 @@
+"""
+相同查询合并（single-flight）
+同一时刻到达的相同查询只执行一次数据库调用，结果分发给所有等待者，
+避免热门链接推送时大量相同请求同时打到 MongoDB
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    按键合并并发调用
+
+    首个请求把调用包装为独立任务执行，后续相同键的请求等待同一任务；
+    任一等待者被取消（如客户端断开）不会取消共享任务，其余等待者照常拿到结果
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        执行或加入一次调用
+
+        Args:
+            key: 查询键，相同键的并发调用只执行一次
+            fn: 实际执行查询的协程函数
+
+        Returns:
+            查询结果（所有等待者共享同一对象，调用方不应修改）
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        """任务结束后移除登记；所有等待者都已取消时取走异常，避免未处理异常警告"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """合并统计"""
+        total = self.executions + self.coalesced
+        return {
+            "inflight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0
+        }
+
+
+# 导师读接口共享的合并实例
+tutor_query_flight = SingleFlight()
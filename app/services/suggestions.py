@@ -0,0 +1,239 @@
+"""
+搜索建议引擎
+对导师姓名、学校名、院系名建立按热度排序的内存前缀索引，
+支持拼音全拼/首字母前缀（"zhangs"、"zs"），请求路径不访问 MongoDB；导师变更时增量更新，参考数据（schools/departments）定时重建
+"""
+
+import asyncio
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.services.tutor_index import get_field_value, normalize_text
+from app.services.tutor_pinyin import pinyin_keys
+from app.utils.logger import app_logger as logger
+
+# 建议类型与各类型默认返回数量（与原接口保持一致）
+SUGGESTION_LIMITS = {"name": 5, "school": 3, "department": 3}
+SUGGESTION_LABELS = {"name": "导师", "school": "学校", "department": "学院"}
+
+# 每个词条最多从前 N 个字符位置建立索引（支持"计算机"匹配"信息与计算机学院"）
+MAX_INFIX_POSITIONS = 12
+
+# 短前缀命中的词条很多，结果缓存到下次数据变更
+CACHED_PREFIX_LENGTH = 2
+
+# (类型, 原始值)
+EntryKey = Tuple[str, str]
+
+
+class SuggestionEngine:
+    """
+    排序前缀索引
+
+    所有词条的归一化文本（及其后缀起点）按字典序存放在有序列表中，
+    前缀查询用二分定位区间，再按 (是否从开头匹配, 热度) 取前 N 个
+    """
+
+    def __init__(self, bulk: bool = False):
+        self.ready = False
+        # 全量构建时只累计热度，最后一次性生成索引键并排序（逐条 insort 为平方级）
+        self._bulk = bulk
+        self._weights: Dict[EntryKey, float] = {}
+        self._reference: Set[EntryKey] = set()
+        self._keys: List[Tuple[str, int, str, str]] = []
+        self._tutor_refs: Dict[str, List[Tuple[EntryKey, float]]] = {}
+        self._favorites: Dict[str, int] = {}
+        self._cache: Dict[Tuple[str, str], List[Dict[str, str]]] = {}
+
+    @staticmethod
+    def _index_keys(entry: EntryKey) -> List[Tuple[str, int, str, str]]:
+        """词条的索引键：归一化文本从各字符位置开始的后缀，以及拼音全拼/首字母（视为从开头匹配）"""
+        entry_type, value = entry
+        text = normalize_text(value).strip()
+        keys = [
+            (text[pos:], pos, entry_type, value)
+            for pos in range(min(len(text), MAX_INFIX_POSITIONS))
+            if not text[pos].isspace()
+        ]
+        keys.extend((key, 0, entry_type, value) for key in pinyin_keys(value))
+        return keys
+
+    def _add_weight(self, entry: EntryKey, weight: float) -> None:
+        """增加词条热度，新词条写入有序索引"""
+        if entry not in self._weights:
+            self._weights[entry] = 0
+            if not self._bulk:
+                for key in self._index_keys(entry):
+                    insort(self._keys, key)
+        self._weights[entry] += weight
+
+    def _remove_weight(self, entry: EntryKey, weight: float) -> None:
+        """减少词条热度，热度归零且不属于参考数据时移出索引"""
+        if entry not in self._weights:
+            return
+        self._weights[entry] -= weight
+        if self._weights[entry] <= 0 and entry not in self._reference:
+            del self._weights[entry]
+            if self._bulk:
+                return
+            for key in self._index_keys(entry):
+                pos = bisect_left(self._keys, key)
+                if pos < len(self._keys) and self._keys[pos] == key:
+                    self._keys.pop(pos)
+
+    def _tutor_entries(self, doc: Dict[str, Any]) -> List[Tuple[EntryKey, float]]:
+        """导师文档贡献的词条及热度（姓名按收藏数加权，学校/院系按导师数计）"""
+        entries = []
+        name = doc.get("name")
+        if name:
+            entries.append((("name", name), 1 + self._favorites.get(doc.get("id"), 0)))
+        for field in ("school", "department"):
+            value = get_field_value(doc, field)
+            if isinstance(value, str) and value:
+                entries.append(((field, value), 1))
+        return entries
+
+    def upsert_tutor(self, doc: Dict[str, Any]) -> None:
+        """新增或更新导师贡献的词条；已删除导师只移除"""
+        tutor_id = doc.get("id")
+        if not tutor_id:
+            return
+        self.remove_tutor(tutor_id)
+        if doc.get("is_deleted"):
+            return
+        entries = self._tutor_entries(doc)
+        for entry, weight in entries:
+            self._add_weight(entry, weight)
+        self._tutor_refs[tutor_id] = entries
+        self._cache.clear()
+
+    def remove_tutor(self, tutor_id: str) -> None:
+        """移除导师贡献的词条热度"""
+        for entry, weight in self._tutor_refs.pop(tutor_id, []):
+            self._remove_weight(entry, weight)
+        self._cache.clear()
+
+    def apply_changes(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理"""
+        for tutor_id, doc in docs.items():
+            if doc is None:
+                self.remove_tutor(tutor_id)
+            else:
+                self.upsert_tutor(doc)
+
+    async def build(self) -> None:
+        """从 tutors / favorites / schools / departments 全量构建索引"""
+        start = time.time()
+        db = get_db()
+        try:
+            fresh = SuggestionEngine(bulk=True)
+
+            async for doc in db.favorites.aggregate([
+                {"$match": {"target_type": "tutor"}},
+                {"$group": {"_id": "$target_id", "count": {"$sum": 1}}}
+            ]):
+                fresh._favorites[doc["_id"]] = doc["count"]
+
+            for collection, entry_type in (("schools", "school"), ("departments", "department")):
+                async for doc in db[collection].find({}, {"_id": 0, "name": 1}):
+                    if doc.get("name"):
+                        entry = (entry_type, doc["name"])
+                        fresh._reference.add(entry)
+                        fresh._add_weight(entry, 0)
+
+            projection = {
+                "_id": 0, "id": 1, "name": 1,
+                "school": 1, "school_name": 1, "department": 1, "department_name": 1
+            }
+            async for doc in db.tutors.find(live_tutor_filter(), projection):
+                fresh.upsert_tutor(doc)
+            fresh._keys = sorted(
+                key for entry in fresh._weights for key in fresh._index_keys(entry)
+            )
+
+            self._weights = fresh._weights
+            self._reference = fresh._reference
+            self._keys = fresh._keys
+            self._tutor_refs = fresh._tutor_refs
+            self._favorites = fresh._favorites
+            self._cache = {}
+            self.ready = True
+            logger.info(
+                f"搜索建议索引构建完成: {len(self._weights)} 个词条, "
+                f"耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.error(f"搜索建议索引构建失败: {str(e)}")
+
+    async def run(self, interval: int) -> None:
+        """启动时构建索引，之后定时重建（同步参考数据与收藏热度）"""
+        while True:
+            await self.build()
+            await asyncio.sleep(interval)
+
+    def _search_type(self, prefix: str, entry_type: str, limit: int) -> List[Dict[str, str]]:
+        """查询单一类型的建议"""
+        cache_key = (prefix, entry_type)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached[:limit]
+
+        best: Dict[str, int] = {}
+        pos = bisect_left(self._keys, (prefix,))
+        while pos < len(self._keys):
+            key, offset, key_type, value = self._keys[pos]
+            if not key.startswith(prefix):
+                break
+            if key_type == entry_type and offset < best.get(value, MAX_INFIX_POSITIONS):
+                best[value] = offset
+            pos += 1
+
+        # 从开头匹配优先，其次按热度，最后按字典序保证结果稳定
+        ranked = sorted(
+            best,
+            key=lambda v: (best[v] > 0, -self._weights.get((entry_type, v), 0), v)
+        )
+        results = [
+            {
+                "type": entry_type,
+                "value": value,
+                "label": f"{SUGGESTION_LABELS[entry_type]}: {value}"
+            }
+            for value in ranked[:max(SUGGESTION_LIMITS.values())]
+        ]
+        if len(prefix) <= CACHED_PREFIX_LENGTH:
+            self._cache[cache_key] = results
+        return results[:limit]
+
+    def suggest(self, keyword: str, field: str = "all", limit: int = 10) -> Optional[List[Dict[str, str]]]:
+        """
+        获取搜索建议
+
+        Args:
+            keyword: 用户输入
+            field: 搜索字段 all / name / school / department
+            limit: 最多返回数量
+
+        Returns:
+            建议列表；索引尚未就绪时返回 None
+        """
+        if not self.ready:
+            return None
+        prefix = normalize_text(keyword).strip()
+        if not prefix:
+            return []
+
+        suggestions = []
+        for entry_type, type_limit in SUGGESTION_LIMITS.items():
+            if field in ("all", entry_type):
+                suggestions.extend(self._search_type(prefix, entry_type, type_limit))
+        return suggestions[:limit]
+
+
+# 全局建议引擎实例
+suggestion_engine = SuggestionEngine()
+on_tutor_change(suggestion_engine.apply_changes)
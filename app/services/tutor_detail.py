@@ -0,0 +1,394 @@
+"""
+导师详情组装与缓存
+导师文档一次聚合读取，大数组在服务端用 $slice 截断，coops 一次遍历拆分出论文与项目
+（论文/项目记录数取自 coops 统计，不再另查 papers/projects 集合）；
+组装结果按导师ID缓存在进程内，管理接口写入导师后立即失效；
+收藏状态按用户单独查询，不进入缓存
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config.app import app_settings
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.utils.fieldset import fieldset_projection, pick_fields
+
+# (详情数据, 论文记录数, 项目记录数)
+LoadedDetail = Tuple[Dict[str, Any], int, int]
+
+# 详情页返回的内嵌数组上限（统计数量仍按完整数组计算）
+DETAIL_ARRAY_LIMITS = {
+    "students": 100,
+    "socials": 20,
+    "growthPath": 50,
+    "risks": 50,
+}
+
+# coops 按类型分别截断，避免论文过多时项目被挤出截断范围
+COOP_TAG_LIMITS = {"论文": 200, "项目": 100}
+OTHER_COOPS_LIMIT = 50
+
+# 详情响应字段 -> 文档来源字段（用于 fields / exclude 稀疏字段集）
+DETAIL_FIELD_SOURCES: Dict[str, Tuple[str, ...]] = {
+    "id": ("id",),
+    "name": ("name",),
+    "title": ("jobname", "title"),
+    "school": ("school",),
+    "school_id": ("school_id",),
+    "department": ("department",),
+    "department_id": ("department_id",),
+    "avatar": ("avatar",),
+    "bio": ("bio",),
+    "achievements": ("achievements",),
+    "email": ("email",),
+    "phone": ("phone",),
+    "personal_page": ("personal_page",),
+    "research_direction": ("direction",),
+    "direction": ("direction",),
+    "tags": ("tags",),
+    "guidance": ("guidance",),
+    "paper_count": ("coops",),
+    "project_count": ("coops",),
+    "student_count": ("students",),
+    "coops": ("coops",),
+    "papers": ("coops",),
+    "projects": ("coops",),
+    "students": ("students",),
+    "socials": ("socials",),
+    "service": ("service",),
+    "growthPath": ("growthPath",),
+    "risks": ("risks",),
+    "created_at": ("created_at",),
+    "updated_at": ("updated_at",),
+    "crawled_at": ("crawled_at",),
+    "is_collected": (),
+}
+
+# 批量获取默认返回的卡片字段（不读取大数组）
+BATCH_DEFAULT_FIELDS = {
+    "id", "name", "title", "school", "department", "avatar",
+    "research_direction", "tags", "is_collected"
+}
+
+def detail_shaping_stages(projection: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """
+    导师文档的投影阶段：截断内嵌数组，同时在服务端计算完整数组的统计数量
+
+    Args:
+        projection: 稀疏字段集对应的投影，未投影的数组不读取也不计算统计
+    """
+    def wanted(field: str) -> bool:
+        return projection is None or field in projection
+
+    coops = {"$ifNull": ["$coops", []]}
+    capped_coops = {
+        "$concatArrays": [
+            {"$slice": [{"$filter": {"input": coops, "cond": {"$eq": ["$$this.tag", tag]}}}, limit]}
+            for tag, limit in COOP_TAG_LIMITS.items()
+        ] + [
+            {"$slice": [
+                {"$filter": {"input": coops, "cond": {"$not": [{"$in": ["$$this.tag", list(COOP_TAG_LIMITS)]}]}}},
+                OTHER_COOPS_LIMIT
+            ]}
+        ]
+    }
+
+    computed: Dict[str, Any] = {}
+    if wanted("coops"):
+        computed["_coop_total"] = {"$size": coops}
+        computed["_coop_project_total"] = {
+            "$size": {"$filter": {"input": coops, "cond": {"$eq": ["$$this.tag", "项目"]}}}
+        }
+        computed["coops"] = capped_coops
+    if wanted("students"):
+        computed["_student_total"] = {"$size": {"$ifNull": ["$students", []]}}
+    for field, limit in DETAIL_ARRAY_LIMITS.items():
+        if wanted(field):
+            computed[field] = {"$slice": [{"$ifNull": [f"${field}", []]}, limit]}
+
+    return [
+        {"$project": projection or {"_id": 0}},
+        *([{"$addFields": computed}] if computed else [])
+    ]
+
+
+def tutor_detail_pipeline(
+    tutor_id: str,
+    projection: Optional[Dict[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """读取单个导师文档的聚合管道"""
+    return [
+        {"$match": live_tutor_filter({"id": tutor_id})},
+        {"$limit": 1},
+        *detail_shaping_stages(projection)
+    ]
+
+
+def build_detail_data(tutor: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    由导师文档构建详情响应数据（字段名与导入数据保持一致）
+
+    Args:
+        tutor: tutor_detail_pipeline 返回的导师文档（可能只含部分字段）
+
+    Returns:
+        详情数据
+    """
+    # 一次遍历拆分论文与项目
+    coops = tutor.get("coops", [])
+    papers, projects = [], []
+    for coop in coops:
+        tag = coop.get("tag")
+        if tag == "论文":
+            papers.append(coop)
+        elif tag == "项目":
+            projects.append(coop)
+
+    return {
+        # 基本信息
+        "id": tutor["id"],
+        "name": tutor.get("name"),
+        "title": tutor.get("jobname") or tutor.get("title"),
+        "school": tutor.get("school", ""),
+        "school_id": tutor.get("school_id"),
+        "department": tutor.get("department", ""),
+        "department_id": tutor.get("department_id"),
+        "avatar": tutor.get("avatar"),
+        "bio": tutor.get("bio"),
+        "achievements": tutor.get("achievements"),
+
+        # 联系方式
+        "email": tutor.get("email"),
+        "phone": tutor.get("phone"),
+        "personal_page": tutor.get("personal_page"),
+
+        # 研究信息
+        "research_direction": tutor.get("direction"),
+        "direction": tutor.get("direction"),
+        "tags": tutor.get("tags", []),
+        "guidance": tutor.get("guidance"),
+
+        # 统计信息（按截断前的完整数组计算）
+        "paper_count": tutor.get("_coop_total", len(coops)),  # 合作信息中包含论文
+        "project_count": tutor.get("_coop_project_total", len(projects)),
+        "student_count": tutor.get("_student_total", len(tutor.get("students", []))),
+
+        # 学术成果/合作信息（从tutors集合的coops字段）
+        "coops": coops,
+        "papers": papers,
+        "projects": projects,
+
+        # 学生信息
+        "students": tutor.get("students", []),
+
+        # 社交/服务信息
+        "socials": tutor.get("socials", []),
+        "service": tutor.get("service"),
+
+        # 成长路径
+        "growthPath": tutor.get("growthPath", []),
+
+        # 风险信息
+        "risks": tutor.get("risks", []),
+
+        # 其他信息
+        "created_at": tutor.get("created_at"),
+        "updated_at": tutor.get("updated_at"),
+        "crawled_at": tutor.get("crawled_at"),
+
+        # 收藏状态（未登录用户默认未收藏）
+        "is_collected": False
+    }
+
+
+async def load_tutor_detail(
+    tutor_id: str,
+    fieldset: Optional[Set[str]] = None
+) -> Optional[LoadedDetail]:
+    """
+    读取并组装导师详情
+
+    Args:
+        tutor_id: 导师ID
+        fieldset: 需要返回的字段（None 表示全部）
+
+    Returns:
+        (详情数据, 论文记录数, 项目记录数)；导师不存在或已删除时返回 None
+    """
+    db = get_db()
+    projection = fieldset_projection(fieldset, DETAIL_FIELD_SOURCES, extra=("id",))
+    tutors = await db.tutors.aggregate(tutor_detail_pipeline(tutor_id, projection)).to_list(length=1)
+    if not tutors:
+        return None
+    detail = build_detail_data(tutors[0])
+    return pick_fields(detail, fieldset), detail["paper_count"], detail["project_count"]
+
+
+async def collected_tutor_ids(user_id: Optional[str], tutor_ids: List[str]) -> Set[str]:
+    """
+    查询用户已收藏的导师（命中 favorites 的 (user_id, target_type, target_id) 索引）
+
+    Args:
+        user_id: 用户ID，未登录时为 None
+        tutor_ids: 待查询的导师ID
+
+    Returns:
+        已收藏的导师ID集合
+    """
+    if not user_id or not tutor_ids:
+        return set()
+    favorites = await get_db().favorites.find(
+        {"user_id": user_id, "target_type": "tutor", "target_id": {"$in": tutor_ids}},
+        {"_id": 0, "target_id": 1}
+    ).to_list(length=len(tutor_ids))
+    return {favorite["target_id"] for favorite in favorites}
+
+
+async def load_tutor_batch(
+    tutor_ids: List[str],
+    fieldset: Optional[Set[str]] = None,
+    user_id: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    批量获取导师：一次 $in 查询读取导师，同时并发查询收藏状态
+
+    Args:
+        tutor_ids: 导师ID列表（已去重）
+        fieldset: 需要返回的字段，None 时返回 BATCH_DEFAULT_FIELDS
+        user_id: 当前用户ID（可选，用于填充 is_collected）
+
+    Returns:
+        (按输入顺序排列的导师数据, 不存在或已删除的导师ID)
+    """
+    fieldset = fieldset or BATCH_DEFAULT_FIELDS
+    projection = fieldset_projection(fieldset, DETAIL_FIELD_SOURCES, extra=("id",))
+    pipeline = [
+        {"$match": live_tutor_filter({"id": {"$in": tutor_ids}})},
+        *detail_shaping_stages(projection)
+    ]
+    tutors, collected = await asyncio.gather(
+        get_db().tutors.aggregate(pipeline).to_list(length=len(tutor_ids)),
+        collected_tutor_ids(user_id if "is_collected" in fieldset else None, tutor_ids)
+    )
+
+    by_id = {tutor["id"]: tutor for tutor in tutors}
+    items, missing = [], []
+    for tutor_id in tutor_ids:
+        tutor = by_id.get(tutor_id)
+        if tutor is None:
+            missing.append(tutor_id)
+            continue
+        data = build_detail_data(tutor)
+        data["is_collected"] = tutor_id in collected
+        items.append(pick_fields(data, fieldset))
+    return items, missing
+
+
+class TutorDetailCache:
+    """
+    导师详情缓存（LRU，可选 TTL 兜底）
+
+    命中时不访问 MongoDB；导师变更时按ID失效。
+    读取开始前记录失效计数，组装期间发生过失效时不写入，避免缓存写入前的旧数据
+    """
+
+    def __init__(self, max_entries: int, ttl: int = 0, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, LoadedDetail]]" = OrderedDict()
+
+    def get(self, tutor_id: str) -> Optional[LoadedDetail]:
+        """读取缓存，未命中或已过期时返回 None"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(tutor_id)
+        if entry is None or (self.ttl and entry[0] < time.monotonic()):
+            if entry is not None:
+                del self._entries[tutor_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(tutor_id)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, tutor_id: str, loaded: LoadedDetail, version: int) -> None:
+        """
+        写入缓存
+
+        Args:
+            tutor_id: 导师ID
+            loaded: load_tutor_detail 的结果（写入后不应再被修改）
+            version: 开始读取时的失效计数，与当前不一致时不写入
+        """
+        if not self.enabled or version != self.version:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        self._entries[tutor_id] = (expires_at, loaded)
+        self._entries.move_to_end(tutor_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, tutor_id: str) -> None:
+        """使单个导师的缓存失效"""
+        self.version += 1
+        self._entries.pop(tutor_id, None)
+
+    def handle_tutor_change(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理：失效被修改/删除/恢复的导师"""
+        for tutor_id in docs:
+            self.invalidate(tutor_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# 全局详情缓存实例
+tutor_detail_cache = TutorDetailCache(
+    max_entries=app_settings.DETAIL_CACHE_MAX_ENTRIES,
+    ttl=app_settings.DETAIL_CACHE_TTL,
+    enabled=app_settings.CACHE_ENABLED
+)
+on_tutor_change(tutor_detail_cache.handle_tutor_change)
+
+
+async def get_tutor_detail_cached(
+    tutor_id: str,
+    fieldset: Optional[Set[str]] = None
+) -> Optional[LoadedDetail]:
+    """
+    读取导师详情：优先使用详情缓存（按字段集裁剪），未命中时读取并组装；
+    稀疏字段集请求只读取所需字段，结果不写入缓存
+
+    Args:
+        tutor_id: 导师ID
+        fieldset: 需要返回的字段（None 表示全部）
+
+    Returns:
+        (详情数据, 论文记录数, 项目记录数)；导师不存在或已删除时返回 None
+    """
+    loaded = tutor_detail_cache.get(tutor_id)
+    if loaded is not None:
+        detail, paper_records, project_records = loaded
+        return pick_fields(detail, fieldset), paper_records, project_records
+    if fieldset is not None:
+        return await load_tutor_detail(tutor_id, fieldset)
+
+    cache_version = tutor_detail_cache.version
+    loaded = await load_tutor_detail(tutor_id)
+    if loaded is not None:
+        tutor_detail_cache.set(tutor_id, loaded, cache_version)
+    return loaded
@@ -0,0 +1,67 @@
+"""
+导师数据变更通知
+管理接口写入导师后统一广播变更，供各类内存索引/缓存增量更新
+"""
+
+import inspect
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from app.utils.logger import app_logger as logger
+
+# 变更处理函数：接收 {tutor_id: 最新导师文档（不存在时为None）}
+TutorChangeHandler = Callable[[Dict[str, Optional[Dict[str, Any]]]], Union[None, Awaitable[None]]]
+
+_handlers: List[TutorChangeHandler] = []
+
+
+def on_tutor_change(handler: TutorChangeHandler) -> TutorChangeHandler:
+    """
+    注册导师变更处理函数（可作为装饰器使用）
+    
+    Args:
+        handler: 变更处理函数，支持同步或异步
+    
+    Returns:
+        原处理函数
+    """
+    if handler not in _handlers:
+        _handlers.append(handler)
+    return handler
+
+
+async def publish_tutor_change(tutor_ids: Iterable[str]) -> None:
+    """
+    广播导师变更
+    
+    统一读取一次最新的导师文档后分发给所有处理函数，
+    单个处理函数失败只记录日志，不影响写操作本身
+    
+    Args:
+        tutor_ids: 发生变更的导师ID列表
+    """
+    # 延迟导入：注册处理函数的内存索引可以脱离数据库连接单独导入（如单元测试）
+    from app.db.mongo import get_collection
+    
+    ids = [tid for tid in dict.fromkeys(tutor_ids) if tid]
+    if not ids or not _handlers:
+        return
+    
+    docs: Dict[str, Optional[Dict[str, Any]]] = {tid: None for tid in ids}
+    try:
+        cursor = get_collection("tutors").find({"id": {"$in": ids}})
+        async for doc in cursor:
+            docs[doc["id"]] = doc
+    except Exception as e:
+        logger.error(f"读取变更导师失败: {str(e)}, tutors: {ids}")
+        return
+    
+    for handler in _handlers:
+        try:
+            result = handler(docs)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.error(
+                f"导师变更处理失败: {getattr(handler, '__qualname__', handler)} - {str(e)}\n"
+                f"tutors: {ids}"
+            )
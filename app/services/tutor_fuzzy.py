@@ -0,0 +1,385 @@
+"""
+导师模糊匹配索引
+对归一化后的导师姓名、研究方向短语、学校、院系建立 BK 树（编辑距离度量空间），
+精确匹配没有结果时查找编辑距离很小的词条作为纠错候选；
+每次查询最多访问固定数量的树节点并受耗时上限约束，编辑距离按带状区域计算并提前结束，
+耗时与导师总数无关；
+本进程写入时增量更新，其他进程/脚本的写入由与检索索引相同间隔的全量重建同步
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.services.tutor_index import FIELD_SOURCES, get_field_value, normalize_text
+from app.services.suggestions import SUGGESTION_LABELS, SUGGESTION_LIMITS
+from app.utils.logger import app_logger as logger
+
+# 参与模糊匹配的字段
+FUZZY_FIELDS = ("name", "research_direction", "school", "department")
+
+# 研究方向按分隔符拆成短语后分别索引
+_PHRASE_SPLIT_RE = re.compile(r"[、,，;；/|]+")
+
+# 词条/查询长度范围（过长的文本不参与编辑距离计算）
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+
+# 单次查询最多访问的 BK 树节点数、耗时上限（秒）；查询在事件循环中同步执行
+MAX_VISITS = 1500
+FUZZY_TIME_BUDGET = 0.03
+
+# 单次查询最多返回的纠错词条数
+MAX_FUZZY_TERMS = 5
+
+# 已失效节点超过该数量且多于有效节点时重建 BK 树
+REBUILD_THRESHOLD = 1000
+
+# 构建索引时读取的字段
+FUZZY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "is_deleted": 1,
+    **{source: 1 for field in FUZZY_FIELDS for source in FIELD_SOURCES[field]},
+}
+
+
+def _bit_parallel_distance(a: str, b: str) -> int:
+    """精确编辑距离（Myers 位并行算法，b 的每个位置对应一个比特，逐字符处理 a）"""
+    m = len(b)
+    if not m:
+        return len(a)
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def edit_distance(a: str, b: str, limit: Optional[int] = None) -> int:
+    """
+    Levenshtein 编辑距离
+
+    给定较小的 limit 时只计算主对角线两侧 limit 宽的带状区域，某一行的最小值超过 limit 即提前结束；
+    不限距离或带状区域超过较短字符串一半时改用位并行算法计算精确距离
+
+    Args:
+        a: 字符串
+        b: 字符串
+        limit: 关心的最大距离（None 表示计算精确距离）
+
+    Returns:
+        编辑距离；超过 limit 时返回 limit + 1
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is None:
+        return _bit_parallel_distance(a, b)
+    over = limit + 1
+    if len(a) - len(b) > limit:
+        return over
+    n = len(b)
+    if limit * 4 >= n:
+        return min(_bit_parallel_distance(a, b), over)
+    # 带外的格子真实距离必然超过 limit，统一记为 over
+    previous = [j if j <= limit else over for j in range(n + 1)]
+    for i, char_a in enumerate(a, 1):
+        current = [over] * (n + 1)
+        current[0] = row_min = min(i, over)
+        for j in range(max(1, i - limit), min(n, i + limit) + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != b[j - 1]),
+                over
+            )
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous = current
+    return previous[n]
+
+
+def max_distance(term: str) -> int:
+    """允许的编辑距离：短词（含两三个字的中文姓名）只容忍1处错误，长词容忍2处"""
+    return 1 if len(term) < 8 else 2
+
+
+def field_terms(doc: Dict[str, Any], field: str) -> List[Tuple[str, str]]:
+    """导师文档在某字段上的词条 [(归一化文本, 原始文本)]"""
+    value = get_field_value(doc, field)
+    if not isinstance(value, str) or not value:
+        return []
+    phrases = _PHRASE_SPLIT_RE.split(value) if field == "research_direction" else [value]
+    terms = []
+    for phrase in phrases:
+        term = normalize_text(phrase).strip()
+        if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH:
+            terms.append((term, phrase.strip()))
+    return terms
+
+
+class BKTree:
+    """
+    BK 树
+
+    子节点按与父节点的编辑距离分组，查询距离 d 以内的词条时，
+    由三角不等式只需进入距离在 [dist - d, dist + d] 之间的子树；不支持删除
+    """
+
+    def __init__(self):
+        self._root: Optional[Tuple[str, Dict[int, Any]]] = None
+        self.size = 0
+
+    def add(self, term: str) -> None:
+        """插入词条（已存在时忽略）"""
+        if self._root is None:
+            self._root = (term, {})
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            node_term, children = node
+            dist = edit_distance(term, node_term)
+            if dist == 0:
+                return
+            child = children.get(dist)
+            if child is None:
+                children[dist] = (term, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(
+        self,
+        term: str,
+        distance: int,
+        max_visits: int = MAX_VISITS,
+        time_budget: float = FUZZY_TIME_BUDGET
+    ) -> List[Tuple[int, str]]:
+        """
+        查找编辑距离不超过 distance 的词条
+
+        与节点的距离只需精确到 最大子节点键 + distance：超出时没有可进入的子树，
+        因此叶子节点只做 distance 宽的带状计算
+
+        Args:
+            term: 查询词
+            distance: 最大编辑距离
+            max_visits: 最多访问的节点数（超过后返回已找到的结果）
+            time_budget: 耗时上限（秒，超过后返回已找到的结果）
+
+        Returns:
+            [(编辑距离, 词条)]
+        """
+        if self._root is None:
+            return []
+        results = []
+        stack = [self._root]
+        visits = 0
+        deadline = time.perf_counter() + time_budget
+        while stack and visits < max_visits and time.perf_counter() < deadline:
+            node_term, children = stack.pop()
+            visits += 1
+            dist = edit_distance(term, node_term, max(children, default=0) + distance)
+            if dist <= distance:
+                results.append((dist, node_term))
+            for child_dist in range(max(1, dist - distance), dist + distance + 1):
+                child = children.get(child_dist)
+                if child is not None:
+                    stack.append(child)
+        return results
+
+
+class TutorFuzzyIndex:
+    """
+    导师模糊匹配索引
+
+    词条 -> 字段 -> 导师ID集合；BK 树只做插入，
+    词条不再被任何导师使用时在映射中删除并计为失效节点，失效节点过多时重建
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._tree = BKTree()
+        self._terms: Dict[str, Dict[str, Set[str]]] = {}
+        self._display: Dict[Tuple[str, str], str] = {}
+        self._tutor_terms: Dict[str, List[Tuple[str, str]]] = {}
+        # 全量构建期间收到的导师变更（构建完成后在新实例上重放）
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+    async def build(self, db) -> None:
+        """
+        从 tutors 集合全量构建索引
+
+        先在新实例中构建，完成后整体替换；构建期间本进程写入的导师在新实例上重放
+
+        Args:
+            db: 数据库实例
+        """
+        start = time.time()
+        pending = self._pending = {}
+        try:
+            fresh = TutorFuzzyIndex()
+            async for doc in db.tutors.find(live_tutor_filter(), FUZZY_PROJECTION):
+                fresh.upsert(doc)
+            fresh.apply_changes(pending)
+            self.__dict__.update(fresh.__dict__)
+            self.ready = True
+            logger.info(
+                f"导师模糊匹配索引构建完成: {len(self._terms)} 个词条, "
+                f"耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            self._pending = None
+            logger.error(f"导师模糊匹配索引构建失败: {str(e)}")
+
+    async def run(self, interval: int) -> None:
+        """启动时构建索引，之后定时重建（同步其他进程/脚本新增、修改与删除的导师）"""
+        while True:
+            await self.build(get_db())
+            await asyncio.sleep(interval)
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """新增或更新一位导师的词条；已软删除的导师只移除"""
+        tutor_id = doc.get("id")
+        if not tutor_id:
+            return
+        self.remove(tutor_id)
+        if doc.get("is_deleted"):
+            return
+
+        entries = []
+        for field in FUZZY_FIELDS:
+            for term, display in field_terms(doc, field):
+                if term not in self._terms:
+                    self._terms[term] = {}
+                    self._tree.add(term)
+                self._terms[term].setdefault(field, set()).add(tutor_id)
+                self._display.setdefault((field, term), display)
+                entries.append((field, term))
+        self._tutor_terms[tutor_id] = entries
+
+    def remove(self, tutor_id: str) -> None:
+        """移除一位导师的词条"""
+        for field, term in self._tutor_terms.pop(tutor_id, []):
+            fields = self._terms.get(term)
+            if fields is None or field not in fields:
+                continue
+            fields[field].discard(tutor_id)
+            if not fields[field]:
+                del fields[field]
+                self._display.pop((field, term), None)
+            if not fields:
+                del self._terms[term]
+
+        dead = self._tree.size - len(self._terms)
+        if dead > REBUILD_THRESHOLD and dead > len(self._terms):
+            self._tree = BKTree()
+            for term in self._terms:
+                self._tree.add(term)
+
+    def apply_changes(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理"""
+        if self._pending is not None:
+            self._pending.update(docs)
+        for tutor_id, doc in docs.items():
+            if doc is None:
+                self.remove(tutor_id)
+            else:
+                self.upsert(doc)
+
+    def _similar_terms(self, text: str, fields: Iterable[str]) -> List[Tuple[str, str]]:
+        """与查询编辑距离最小的词条 [(字段, 词条)]，按 (距离, 导师数) 排序"""
+        query = normalize_text(text).strip()
+        if not MIN_TERM_LENGTH <= len(query) <= MAX_TERM_LENGTH:
+            return []
+        fields = set(fields)
+        matches = []
+        for dist, term in self._tree.search(query, max_distance(query)):
+            for field, ids in self._terms.get(term, {}).items():
+                if field in fields:
+                    matches.append((dist, -len(ids), field, term))
+        matches.sort()
+        return [(field, term) for _, _, field, term in matches]
+
+    def match(
+        self,
+        text: str,
+        fields: Iterable[str] = FUZZY_FIELDS
+    ) -> Optional[Tuple[Set[str], List[str]]]:
+        """
+        查询与 text 相近的词条对应的导师
+
+        Args:
+            text: 查询文本
+            fields: 参与匹配的字段
+
+        Returns:
+            (导师ID集合, 纠错词条)；索引未就绪时返回 None
+        """
+        if not self.ready:
+            return None
+        ids: Set[str] = set()
+        terms: List[str] = []
+        for field, term in self._similar_terms(text, fields)[:MAX_FUZZY_TERMS]:
+            ids |= self._terms[term][field]
+            display = self._display.get((field, term), term)
+            if display not in terms:
+                terms.append(display)
+        return ids, terms
+
+    def suggest(self, text: str, field: str = "all", limit: int = 10) -> List[Dict[str, str]]:
+        """
+        纠错建议（格式与搜索建议一致）
+
+        Args:
+            text: 用户输入
+            field: 建议类型 all / name / school / department
+            limit: 最多返回数量
+        """
+        if not self.ready:
+            return []
+        entry_types = [t for t in SUGGESTION_LIMITS if field in ("all", t)]
+        suggestions = []
+        seen = set()
+        for entry_type, term in self._similar_terms(text, entry_types):
+            value = self._display.get((entry_type, term), term)
+            if (entry_type, value) in seen:
+                continue
+            seen.add((entry_type, value))
+            suggestions.append({
+                "type": entry_type,
+                "value": value,
+                "label": f"{SUGGESTION_LABELS[entry_type]}: {value}"
+            })
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+
+# 全局模糊匹配索引实例
+tutor_fuzzy_index = TutorFuzzyIndex()
+on_tutor_change(tutor_fuzzy_index.apply_changes)
@@ -0,0 +1,481 @@
+"""
+导师检索内存索引
+启动时从 tutors 集合构建倒排索引（中文单字/二元组 + 拉丁词元）及拼音键有序表，
+拉丁词另按 1~3 字符子串建立 n-gram -> 词 映射，词中间的子串查询不必扫描词表；
+用倒排表求交集代替无法走索引的 $regex 全表扫描；
+研究方向与标签另按同义词组建立倒排表，查询同义词时直接取整组的导师；
+本进程写入时增量更新，其他进程/脚本的写入由定时全量重建同步
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.services.tutor_events import on_tutor_change
+from app.services.tutor_pinyin import (
+    PINYIN_FIELDS,
+    normalize_pinyin_query,
+    pinyin_field,
+    pinyin_keys
+)
+from app.services.tutor_synonyms import SynonymDictionary, load_synonyms
+from app.utils.logger import app_logger as logger
+
+# 中文连续片段 或 拉丁字母/数字连续片段
+_TOKEN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+")
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+# 索引字段 -> 文档中的候选字段（导入数据与管理接口写入的数据字段名不一致）
+FIELD_SOURCES: Dict[str, tuple] = {
+    "name": ("name",),
+    "school": ("school", "school_name"),
+    "department": ("department", "department_name"),
+    "research_direction": ("research_direction", "direction"),
+    "title": ("jobname", "title"),
+    "city": ("city",),
+}
+
+# keyword 参数覆盖的字段（姓名/研究方向/院校/院系）
+KEYWORD_FIELDS = ("name", "research_direction", "school", "department")
+
+# 拉丁词 n-gram 的最大长度（更长的查询词元取其中导师最少的三元组再逐词校验）
+GRAM_SIZE = 3
+
+# 按同义词组扩展的字段（标签单独处理）
+SYNONYM_FIELDS = ("research_direction",)
+
+# 构建索引时读取的字段
+INDEX_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "is_deleted": 1,
+    "tags": 1,
+    **{source: 1 for sources in FIELD_SOURCES.values() for source in sources},
+    **{pinyin_field(field): 1 for field in PINYIN_FIELDS},
+}
+
+
+def normalize_text(value: Any) -> str:
+    """统一全角/半角与大小写，列表值以空格拼接"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = " ".join(str(v) for v in value if v)
+    return unicodedata.normalize("NFKC", str(value)).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    切分索引词元
+
+    中文片段产出单字和相邻二元组，拉丁片段产出整词
+
+    Args:
+        text: 已归一化的文本
+
+    Returns:
+        词元列表（可能重复）
+    """
+    tokens = []
+    for segment in _TOKEN_RE.findall(text):
+        if _CJK_RE.match(segment):
+            tokens.extend(segment)
+            tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            tokens.append(segment)
+    return tokens
+
+
+def query_tokens(query: str) -> List[str]:
+    """
+    切分查询词元（去重）
+
+    中文片段取二元组（单字片段取单字），拉丁片段取整词
+
+    Args:
+        query: 已归一化的查询文本
+    """
+    tokens = []
+    for segment in _TOKEN_RE.findall(query):
+        if _CJK_RE.match(segment) and len(segment) > 1:
+            tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+        else:
+            tokens.append(segment)
+    return list(dict.fromkeys(tokens))
+
+
+def word_grams(word: str) -> Set[str]:
+    """拉丁词的全部 1~GRAM_SIZE 字符子串"""
+    return {
+        word[i:i + n]
+        for n in range(1, GRAM_SIZE + 1)
+        for i in range(len(word) - n + 1)
+    }
+
+
+def get_field_value(doc: Dict[str, Any], field: str) -> Any:
+    """按 FIELD_SOURCES 从导师文档中取第一个非空字段值"""
+    for source in FIELD_SOURCES[field]:
+        value = doc.get(source)
+        if value:
+            return value
+    return None
+
+
+class TutorSearchIndex:
+    """
+    导师倒排索引
+
+    每个字段维护 词元 -> 导师ID集合 的倒排表，查询时对词元倒排表求交集，
+    再用归一化原文做子串校验，语义与原先的不区分大小写 $regex 子串匹配一致；
+    姓名/学校/院系另维护 (拼音键, 导师ID) 有序表，拼音查询按前缀匹配；
+    研究方向与标签维护 同义词组 -> 导师ID集合，查询文本整体是同义词时并入整组结果
+    """
+
+    # 候选ID超过该数量时交回 MongoDB 处理，避免生成过大的 $in
+    MAX_CANDIDATES = 20000
+
+    def __init__(self, synonyms: Optional[SynonymDictionary] = None, bulk: bool = False):
+        self.ready = False
+        # 全量构建时拼音键先追加、最后统一排序（逐条 insort 为平方级）
+        self._bulk = bulk
+        self._synonyms = synonyms or SynonymDictionary()
+        self._synonym_postings: Dict[str, Dict[int, Set[str]]] = {f: {} for f in SYNONYM_FIELDS}
+        self._synonym_tag_postings: Dict[int, Set[str]] = {}
+        self._synonym_refs: Dict[str, List[Tuple[Optional[str], int]]] = {}
+        self._texts: Dict[str, Dict[str, str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Dict[str, Set[str]]] = {f: {} for f in FIELD_SOURCES}
+        self._grams: Dict[str, Dict[str, Set[str]]] = {f: {} for f in FIELD_SOURCES}
+        self._tag_postings: Dict[str, Set[str]] = {}
+        self._pinyin: Dict[str, Dict[str, List[str]]] = {}
+        self._pinyin_vocab: Dict[str, List[Tuple[str, str]]] = {f: [] for f in PINYIN_FIELDS}
+        # 全量构建期间收到的导师变更（构建完成后在新实例上重放）
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+    @property
+    def size(self) -> int:
+        """已索引的导师数量"""
+        return len(self._texts)
+
+    @property
+    def synonym_groups(self) -> int:
+        """已编译进索引的同义词组数量"""
+        return self._synonyms.size
+
+    async def build(self, db) -> None:
+        """
+        从 tutors 集合全量构建索引
+
+        先在新实例中构建，完成后整体替换，构建期间查询继续使用旧数据；
+        构建期间本进程写入的导师（游标可能已读过旧文档）在新实例上重放
+
+        Args:
+            db: 数据库实例
+        """
+        start = time.time()
+        pending = self._pending = {}
+        try:
+            fresh = TutorSearchIndex(await load_synonyms(db), bulk=True)
+            async for doc in db.tutors.find(live_tutor_filter(), INDEX_PROJECTION):
+                fresh.upsert(doc)
+            for vocab in fresh._pinyin_vocab.values():
+                vocab.sort()
+            fresh._bulk = False
+            fresh.apply_changes(pending)
+            self.__dict__.update(fresh.__dict__)
+            self.ready = True
+            logger.info(
+                f"导师检索索引构建完成: {self.size} 位导师, {self.synonym_groups} 个同义词组, "
+                f"耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            self._pending = None
+            logger.error(f"导师检索索引构建失败，查询将回退到 $regex: {str(e)}")
+
+    async def run(self, interval: int) -> None:
+        """启动时构建索引，之后定时重建（同步其他进程、迁移与导入脚本写入的导师）"""
+        # 延迟导入：索引本身是纯内存结构，不在导入时创建数据库连接
+        from app.db.mongo import get_db
+        while True:
+            await self.build(get_db())
+            await asyncio.sleep(interval)
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """新增或更新一位导师；已软删除的导师从索引移除"""
+        tutor_id = doc.get("id")
+        if not tutor_id:
+            return
+        self.remove(tutor_id)
+        if doc.get("is_deleted"):
+            return
+
+        texts = {}
+        for field in FIELD_SOURCES:
+            text = normalize_text(get_field_value(doc, field))
+            if not text:
+                continue
+            texts[field] = text
+            postings = self._postings[field]
+            for token in set(tokenize(text)):
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = set()
+                    if not _CJK_RE.match(token):
+                        grams = self._grams[field]
+                        for gram in word_grams(token):
+                            grams.setdefault(gram, set()).add(token)
+                ids.add(tutor_id)
+        self._texts[tutor_id] = texts
+
+        # 优先使用写入时预计算的拼音键，尚未回填的旧文档现场计算
+        pinyin = {}
+        for field in PINYIN_FIELDS:
+            keys = doc.get(pinyin_field(field))
+            if not isinstance(keys, list):
+                keys = pinyin_keys(get_field_value(doc, field))
+            if keys:
+                pinyin[field] = keys
+                vocab = self._pinyin_vocab[field]
+                for key in keys:
+                    if self._bulk:
+                        vocab.append((key, tutor_id))
+                    else:
+                        insort(vocab, (key, tutor_id))
+        self._pinyin[tutor_id] = pinyin
+
+        tags = {t for t in (doc.get("tags") or []) if isinstance(t, str) and t}
+        self._tags[tutor_id] = tags
+        for tag in tags:
+            self._tag_postings.setdefault(tag, set()).add(tutor_id)
+
+        # 同义词组倒排表（字段为 None 表示标签）
+        refs = [
+            (field, group)
+            for field in SYNONYM_FIELDS
+            for group in self._synonyms.groups_in(texts.get(field, ""))
+        ]
+        refs.extend(
+            (None, group)
+            for group in {self._synonyms.group_of(tag) for tag in tags} - {None}
+        )
+        for field, group in refs:
+            postings = self._synonym_tag_postings if field is None else self._synonym_postings[field]
+            postings.setdefault(group, set()).add(tutor_id)
+        self._synonym_refs[tutor_id] = refs
+
+    def remove(self, tutor_id: str) -> None:
+        """从索引中移除一位导师"""
+        texts = self._texts.pop(tutor_id, None)
+        if texts:
+            for field, text in texts.items():
+                postings = self._postings[field]
+                for token in set(tokenize(text)):
+                    ids = postings.get(token)
+                    if ids is None:
+                        continue
+                    ids.discard(tutor_id)
+                    if not ids:
+                        del postings[token]
+                        if not _CJK_RE.match(token):
+                            grams = self._grams[field]
+                            for gram in word_grams(token):
+                                words = grams.get(gram)
+                                if words is not None:
+                                    words.discard(token)
+                                    if not words:
+                                        del grams[gram]
+        for field, keys in self._pinyin.pop(tutor_id, {}).items():
+            vocab = self._pinyin_vocab[field]
+            for key in keys:
+                if self._bulk:
+                    # 全量构建中的重复导师（尚未排序，线性查找）
+                    if (key, tutor_id) in vocab:
+                        vocab.remove((key, tutor_id))
+                    continue
+                pos = bisect_left(vocab, (key, tutor_id))
+                if pos < len(vocab) and vocab[pos] == (key, tutor_id):
+                    vocab.pop(pos)
+        for tag in self._tags.pop(tutor_id, set()):
+            ids = self._tag_postings.get(tag)
+            if ids is not None:
+                ids.discard(tutor_id)
+                if not ids:
+                    del self._tag_postings[tag]
+        for field, group in self._synonym_refs.pop(tutor_id, []):
+            postings = self._synonym_tag_postings if field is None else self._synonym_postings[field]
+            ids = postings.get(group)
+            if ids is not None:
+                ids.discard(tutor_id)
+                if not ids:
+                    del postings[group]
+
+    def apply_changes(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理：文档不存在或已删除时移除，否则重建该导师的索引"""
+        if self._pending is not None:
+            self._pending.update(docs)
+        for tutor_id, doc in docs.items():
+            if doc is None:
+                self.remove(tutor_id)
+            else:
+                self.upsert(doc)
+
+    def _token_candidates(self, field: str, token: str) -> Set[str]:
+        """
+        单个查询词元的候选集合：中文精确命中，拉丁词元展开为包含该词元的全部词
+        （如 "ai" 命中 "domain"，与 $regex 子串语义一致）；
+        不超过 GRAM_SIZE 的词元直接查 n-gram 映射，更长的词元取词最少的三元组后逐词校验
+        """
+        postings = self._postings[field]
+        if _CJK_RE.match(token):
+            return postings.get(token, set())
+        grams = self._grams[field]
+        if len(token) <= GRAM_SIZE:
+            words = grams.get(token, set())
+        else:
+            words = min(
+                (grams.get(token[i:i + GRAM_SIZE], set()) for i in range(len(token) - GRAM_SIZE + 1)),
+                key=len
+            )
+            words = {word for word in words if token in word}
+        result: Set[str] = set()
+        for word in words:
+            result |= postings.get(word, set())
+        return result
+
+    def match_pinyin(self, field: str, query: str) -> Set[str]:
+        """查询拼音键（全拼或首字母）以 query 开头的导师"""
+        vocab = self._pinyin_vocab.get(field)
+        if not vocab:
+            return set()
+        result: Set[str] = set()
+        pos = bisect_left(vocab, (query,))
+        while pos < len(vocab) and vocab[pos][0].startswith(query):
+            result.add(vocab[pos][1])
+            pos += 1
+        return result
+
+    def match_field(self, field: str, text: str) -> Optional[Set[str]]:
+        """
+        查询字段中包含 text 子串的导师；姓名/学校/院系同时按拼音前缀匹配，
+        研究方向查询文本整体是同义词时并入同组任一词命中的导师
+
+        Args:
+            field: 索引字段
+            text: 查询文本
+
+        Returns:
+            导师ID集合；文本中没有可索引的词元时返回 None（由调用方回退到 $regex）
+        """
+        query = normalize_text(text).strip()
+        tokens = query_tokens(query)
+        if not tokens:
+            return None
+
+        extra_ids: Set[str] = set()
+        if field in SYNONYM_FIELDS:
+            group = self._synonyms.group_of(query)
+            if group is not None:
+                extra_ids = self._synonym_postings[field].get(group, set())
+
+        pinyin_ids: Set[str] = set()
+        if field in PINYIN_FIELDS:
+            pinyin_query = normalize_pinyin_query(text)
+            if pinyin_query:
+                pinyin_ids = self.match_pinyin(field, pinyin_query)
+
+        # 从最短的倒排表开始求交集
+        candidate_sets = sorted(
+            (self._token_candidates(field, token) for token in tokens),
+            key=len
+        )
+        candidates = set(candidate_sets[0])
+        for ids in candidate_sets[1:]:
+            if not candidates:
+                break
+            candidates &= ids
+
+        return extra_ids | pinyin_ids | {
+            tutor_id for tutor_id in candidates
+            if query in self._texts[tutor_id].get(field, "")
+        }
+
+    def match_any(self, fields: Iterable[str], text: str) -> Optional[Set[str]]:
+        """查询任一字段包含 text 子串的导师（各字段结果取并集）"""
+        result: Set[str] = set()
+        for field in fields:
+            ids = self.match_field(field, text)
+            if ids is None:
+                return None
+            result |= ids
+        return result
+
+    def match_tags(self, tags: Iterable[str]) -> Set[str]:
+        """查询包含任一标签（或其同义词标签）的导师"""
+        result: Set[str] = set()
+        for tag in tags:
+            result |= self._tag_postings.get(tag, set())
+            group = self._synonyms.group_of(tag)
+            if group is not None:
+                result |= self._synonym_tag_postings.get(group, set())
+        return result
+
+    def candidate_ids(
+        self,
+        keyword: Optional[str] = None,
+        keyword_fields: Iterable[str] = KEYWORD_FIELDS,
+        tags: Optional[List[str]] = None,
+        **field_filters: Optional[str]
+    ) -> Optional[Set[str]]:
+        """
+        计算满足关键词与文本类筛选条件的候选导师ID
+
+        Args:
+            keyword: 关键词（匹配 keyword_fields 中任一字段）
+            keyword_fields: 关键词覆盖的字段
+            tags: 标签列表（任意匹配）
+            **field_filters: 字段子串筛选，如 school="清华"
+
+        Returns:
+            候选ID集合；索引未就绪、没有可用索引回答的条件，
+            或候选数量超过 MAX_CANDIDATES 时返回 None
+        """
+        if not self.ready:
+            return None
+
+        candidate_sets = []
+        if keyword:
+            ids = self.match_any(keyword_fields, keyword)
+            if ids is None:
+                return None
+            candidate_sets.append(ids)
+        for field, value in field_filters.items():
+            if not value:
+                continue
+            ids = self.match_field(field, value)
+            if ids is None:
+                return None
+            candidate_sets.append(ids)
+        if tags:
+            candidate_sets.append(self.match_tags(tags))
+
+        if not candidate_sets:
+            return None
+
+        candidate_sets.sort(key=len)
+        result = set(candidate_sets[0])
+        for ids in candidate_sets[1:]:
+            result &= ids
+
+        if len(result) > self.MAX_CANDIDATES:
+            return None
+        return result
+
+
+# 全局索引实例
+tutor_search_index = TutorSearchIndex()
+on_tutor_change(tutor_search_index.apply_changes)
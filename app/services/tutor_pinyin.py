@@ -0,0 +1,100 @@
+"""
+导师拼音检索键
+写入导师时为姓名/学校/院系预计算全拼与首字母键，存为 name_pinyin 等数组字段（建有多键索引），
+拼音查询（如 "zhangsan"、"zs"）展开为对这些键的前缀匹配，不再依赖中文字段的 $regex 扫描
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # 未安装 pypinyin 时不生成拼音键，拼音查询不命中
+    Style = lazy_pinyin = None
+
+# 生成拼音键的字段
+PINYIN_FIELDS = ("name", "school", "department")
+
+_HAN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+# 拼音查询：字母开头，允许空格与隔音符（"zhang san"、"xi'an"）
+_PINYIN_QUERY_RE = re.compile(r"^[a-z][a-z' ]*$")
+
+PINYIN_AVAILABLE = lazy_pinyin is not None
+
+
+def pinyin_field(field: str) -> str:
+    """字段对应的拼音键字段名"""
+    return f"{field}_pinyin"
+
+
+def pinyin_keys(value: Any) -> List[str]:
+    """
+    计算文本的拼音键
+
+    Args:
+        value: 原始文本，如 "张三"
+
+    Returns:
+        [全拼, 首字母]，如 ["zhangsan", "zs"]；文本不含汉字或未安装 pypinyin 时返回空列表
+    """
+    if not PINYIN_AVAILABLE or not isinstance(value, str):
+        return []
+    text = unicodedata.normalize("NFKC", value).lower()
+    if not _HAN_RE.search(text):
+        return []
+
+    full = "".join(_NON_ALNUM_RE.sub("", s) for s in lazy_pinyin(text))
+    initials = "".join(
+        _NON_ALNUM_RE.sub("", s) for s in lazy_pinyin(text, style=Style.FIRST_LETTER)
+    )
+    return list(dict.fromkeys(key for key in (full, initials) if key))
+
+
+def pinyin_fields(values: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    计算需要写入导师文档的拼音键字段
+
+    Args:
+        values: 字段 -> 原始文本，只包含本次写入的字段，如 {"name": "张三"}
+
+    Returns:
+        {"name_pinyin": ["zhangsan", "zs"], ...}
+    """
+    return {
+        pinyin_field(field): pinyin_keys(value)
+        for field, value in values.items()
+        if field in PINYIN_FIELDS
+    }
+
+
+def normalize_pinyin_query(text: Optional[str]) -> Optional[str]:
+    """
+    将用户输入规整为拼音查询
+
+    Returns:
+        去掉空格与隔音符后的小写字母串；输入不像拼音时返回 None
+    """
+    if not text or not PINYIN_AVAILABLE:
+        return None
+    query = unicodedata.normalize("NFKC", text).lower().strip()
+    if not _PINYIN_QUERY_RE.match(query):
+        return None
+    return query.replace(" ", "").replace("'", "")
+
+
+def pinyin_conditions(text: Optional[str], fields: Iterable[str] = PINYIN_FIELDS) -> List[Dict[str, Any]]:
+    """
+    拼音查询对应的 MongoDB 条件（内存索引不可用时的回退路径）
+
+    锚定开头、区分大小写的前缀 $regex 可以直接使用拼音键字段上的索引
+
+    Returns:
+        可放入 $or 的条件列表；输入不像拼音时返回空列表
+    """
+    query = normalize_pinyin_query(text)
+    if not query:
+        return []
+    return [{pinyin_field(field): {"$regex": f"^{query}"}} for field in fields]
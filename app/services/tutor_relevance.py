@@ -0,0 +1,271 @@
+"""
+导师搜索相关度排序
+启动时为姓名/研究方向/标签/简介预计算 BM25 词项统计（词频、文档长度、文档频率），
+查询时用 NumPy 对候选集合批量打分，只取当前页的导师ID再回数据库读取文档；
+本进程写入时增量更新，其他进程/脚本的写入由定时全量重建同步
+"""
+
+import asyncio
+import math
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.services.tutor_index import (
+    FIELD_SOURCES,
+    get_field_value,
+    normalize_text,
+    query_tokens,
+    tokenize
+)
+from app.utils.logger import app_logger as logger
+
+# 参与打分的字段及权重（各字段 BM25 分数加权求和）
+FIELD_WEIGHTS: Dict[str, float] = {
+    "name": 3.0,
+    "tags": 2.0,
+    "research_direction": 1.5,
+    "bio": 1.0,
+}
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 构建统计时读取的字段
+RELEVANCE_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "is_deleted": 1,
+    "tags": 1,
+    "bio": 1,
+    **{source: 1 for field in ("name", "research_direction") for source in FIELD_SOURCES[field]},
+}
+
+
+def _field_text(doc: Dict[str, Any], field: str) -> str:
+    """打分字段的归一化文本"""
+    if field in FIELD_SOURCES:
+        return normalize_text(get_field_value(doc, field))
+    return normalize_text(doc.get(field))
+
+
+class TutorRelevanceIndex:
+    """
+    导师 BM25 词项统计
+
+    每位导师分配一个行号，各字段的文档长度保存在按行号索引的数组中；
+    词项 -> {行号: 词频} 的倒排表在首次查询时编译为 NumPy 数组并缓存，
+    导师变更时只丢弃受影响词项的编译结果
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._lengths: Dict[str, np.ndarray] = {f: np.zeros(0) for f in FIELD_WEIGHTS}
+        self._total_lengths: Dict[str, float] = {f: 0.0 for f in FIELD_WEIGHTS}
+        self._postings: Dict[str, Dict[str, Dict[int, int]]] = {f: {} for f in FIELD_WEIGHTS}
+        self._doc_terms: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._compiled: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        # 全量构建期间收到的导师变更（构建完成后在新实例上重放）
+        self._pending: Optional[Dict[str, Optional[Dict[str, Any]]]] = None
+
+    @property
+    def size(self) -> int:
+        """已统计的导师数量"""
+        return len(self._rows)
+
+    async def build(self, db) -> None:
+        """
+        从 tutors 集合全量构建词项统计
+
+        先在新实例中构建，完成后整体替换，构建期间查询继续使用旧数据；
+        构建期间本进程写入的导师在新实例上重放
+
+        Args:
+            db: 数据库实例
+        """
+        start = time.time()
+        pending = self._pending = {}
+        try:
+            fresh = TutorRelevanceIndex()
+            async for doc in db.tutors.find(live_tutor_filter(), RELEVANCE_PROJECTION):
+                fresh.upsert(doc)
+            fresh.apply_changes(pending)
+            self.__dict__.update(fresh.__dict__)
+            self.ready = True
+            logger.info(
+                f"导师相关度统计构建完成: {self.size} 位导师, "
+                f"耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            self._pending = None
+            logger.error(f"导师相关度统计构建失败，相关度排序暂不可用: {str(e)}")
+
+    async def run(self, interval: int) -> None:
+        """启动时构建统计，之后定时重建（同步其他进程/脚本写入的导师，校正文档频率与长度）"""
+        while True:
+            await self.build(get_db())
+            await asyncio.sleep(interval)
+
+    def _allocate_row(self, tutor_id: str) -> int:
+        """为导师分配行号（优先复用已删除导师的行号）"""
+        if self._free:
+            row = self._free.pop()
+            self._ids[row] = tutor_id
+        else:
+            row = len(self._ids)
+            self._ids.append(tutor_id)
+            if row >= len(next(iter(self._lengths.values()))):
+                capacity = max(1024, row * 2)
+                for field, lengths in self._lengths.items():
+                    grown = np.zeros(capacity)
+                    grown[:len(lengths)] = lengths
+                    self._lengths[field] = grown
+        self._rows[tutor_id] = row
+        return row
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """新增或更新一位导师；已软删除的导师移除"""
+        tutor_id = doc.get("id")
+        if not tutor_id:
+            return
+        self.remove(tutor_id)
+        if doc.get("is_deleted"):
+            return
+
+        row = self._allocate_row(tutor_id)
+        doc_terms = {}
+        for field in FIELD_WEIGHTS:
+            tokens = tokenize(_field_text(doc, field))
+            if not tokens:
+                continue
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            doc_terms[field] = counts
+            self._lengths[field][row] = len(tokens)
+            self._total_lengths[field] += len(tokens)
+            postings = self._postings[field]
+            for term, tf in counts.items():
+                postings.setdefault(term, {})[row] = tf
+                self._compiled.pop((field, term), None)
+        self._doc_terms[tutor_id] = doc_terms
+
+    def remove(self, tutor_id: str) -> None:
+        """移除一位导师"""
+        row = self._rows.pop(tutor_id, None)
+        if row is None:
+            return
+        for field, counts in self._doc_terms.pop(tutor_id, {}).items():
+            postings = self._postings[field]
+            for term in counts:
+                rows = postings.get(term)
+                if rows is not None:
+                    rows.pop(row, None)
+                    if not rows:
+                        del postings[term]
+                self._compiled.pop((field, term), None)
+            self._total_lengths[field] -= self._lengths[field][row]
+            self._lengths[field][row] = 0
+        self._ids[row] = None
+        self._free.append(row)
+
+    def apply_changes(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理：文档不存在或已删除时移除，否则重新统计该导师"""
+        if self._pending is not None:
+            self._pending.update(docs)
+        for tutor_id, doc in docs.items():
+            if doc is None:
+                self.remove(tutor_id)
+            else:
+                self.upsert(doc)
+
+    def _posting_arrays(self, field: str, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """词项倒排表的 (行号数组, 词频数组)，编译结果缓存到该词项下次变更"""
+        key = (field, term)
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            postings = self._postings[field].get(term, {})
+            compiled = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            )
+            self._compiled[key] = compiled
+        return compiled
+
+    def _score_rows(self, terms: List[str]) -> np.ndarray:
+        """按行号计算全部导师的 BM25 加权分数（只遍历查询词项的倒排表）"""
+        scores = np.zeros(len(self._ids))
+        n_docs = self.size
+        if not n_docs:
+            return scores
+        for field, weight in FIELD_WEIGHTS.items():
+            avg_length = self._total_lengths[field] / n_docs or 1.0
+            lengths = self._lengths[field]
+            for term in terms:
+                rows, tfs = self._posting_arrays(field, term)
+                if not len(rows):
+                    continue
+                idf = math.log(1 + (n_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[rows] / avg_length)
+                scores[rows] += weight * idf * tfs * (BM25_K1 + 1) / (tfs + norm)
+        return scores
+
+    def rank(
+        self,
+        keyword: str,
+        tutor_ids: Iterable[str],
+        limit: int,
+        skip: int = 0,
+        after: Optional[Tuple[float, str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        对候选导师按相关度排序并返回当前页
+
+        排序为 (分数降序, id 降序)，与游标分页的 cursor_sort 语义一致
+
+        Args:
+            keyword: 搜索关键词
+            tutor_ids: 候选导师ID（已满足全部筛选条件）
+            limit: 每页数量
+            skip: 跳过的数量（页码分页）
+            after: 上一页最后一条记录的 (分数, id)（游标分页）
+
+        Returns:
+            [(导师ID, 分数)]，长度不超过 limit
+        """
+        ids = np.array(list(tutor_ids), dtype=str)
+        if not len(ids):
+            return []
+        rows = np.fromiter((self._rows.get(tid, -1) for tid in ids), dtype=np.int64, count=len(ids))
+        known = rows >= 0
+        scores = np.zeros(len(ids))
+        scores[known] = self._score_rows(query_tokens(normalize_text(keyword)))[rows[known]]
+
+        if after is not None:
+            last_score, last_id = after
+            mask = (scores < last_score) | ((scores == last_score) & (ids < last_id))
+            ids, scores = ids[mask], scores[mask]
+
+        # 只对前 k 个分数做完整排序；与第 k 名同分的记录全部保留，按 id 决定先后
+        k = skip + limit
+        if k <= 0 or not len(ids):
+            return []
+        if k < len(ids):
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= threshold
+            ids, scores = ids[keep], scores[keep]
+        ranked = sorted(zip(scores.tolist(), ids.tolist()), reverse=True)
+        return [(tutor_id, score) for score, tutor_id in ranked[skip:k]]
+
+
+# 全局相关度统计实例
+tutor_relevance_index = TutorRelevanceIndex()
+on_tutor_change(tutor_relevance_index.apply_changes)
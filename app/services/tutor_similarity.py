@@ -0,0 +1,240 @@
+"""
+相似导师索引（MinHash + LSH）
+每位导师的特征集合 = 标签 + 研究方向词元 + 参与的合作记录（coops）标签，
+用 MinHash 签名近似 Jaccard 相似度，签名按 band 分桶（局部敏感哈希）：
+查询时只扫描与该导师落入同一桶的导师，并限制扫描数量，耗时与导师总数无关
+"""
+
+import asyncio
+import hashlib
+import time
+from itertools import islice
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.services.tutor_index import FIELD_SOURCES, get_field_value, normalize_text, query_tokens
+from app.utils.logger import app_logger as logger
+
+# 签名长度 = 分桶数 × 每桶行数；约 Jaccard ≥ (1/BANDS)^(1/ROWS) ≈ 0.42 的导师对大概率成为候选
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+# 单个桶最多扫描的导师数、单次查询最多精确比较的候选数
+MAX_BUCKET_SCAN = 200
+MAX_CANDIDATES = 300
+
+# 特征前缀
+TAG_PREFIX = "tag:"
+DIRECTION_PREFIX = "dir:"
+COOP_TAG_PREFIX = "coop:"
+
+# 固定种子的哈希参数（奇数乘数的 multiply-shift 哈希族），保证重启后签名一致
+_rng = np.random.default_rng(20261021)
+_HASH_A = _rng.integers(1, 2 ** 63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_HASH_B = _rng.integers(0, 2 ** 63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+# 构建索引时读取的字段
+SIMILARITY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "is_deleted": 1,
+    "tags": 1,
+    **{source: 1 for source in FIELD_SOURCES["research_direction"]},
+}
+
+
+def _tag_values(values: Any) -> List[str]:
+    """标签数组的归一化文本（忽略非字符串与空值）"""
+    if not isinstance(values, list):
+        return []
+    return [normalize_text(v).strip() for v in values if isinstance(v, str) and v.strip()]
+
+
+def tutor_features(doc: Dict[str, Any], coop_tags: Iterable[str] = ()) -> FrozenSet[str]:
+    """导师的特征集合（标签、研究方向词元、合作记录标签）"""
+    features = {TAG_PREFIX + tag for tag in _tag_values(doc.get("tags"))}
+    direction = normalize_text(get_field_value(doc, "research_direction"))
+    features.update(DIRECTION_PREFIX + token for token in query_tokens(direction))
+    features.update(COOP_TAG_PREFIX + tag for tag in coop_tags)
+    return frozenset(features)
+
+
+def minhash(features: Iterable[str]) -> np.ndarray:
+    """
+    MinHash 签名
+
+    特征先用 blake2b 映射为 64 位整数，再用 NUM_PERM 个 multiply-shift 哈希取最小值
+    """
+    base = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little")
+         for f in features),
+        dtype=np.uint64
+    )
+    return ((_HASH_A[:, None] * base[None, :] + _HASH_B[:, None]) >> _SHIFT).min(axis=1)
+
+
+def band_keys(signature: np.ndarray) -> List[bytes]:
+    """签名按 band 切分后的桶键（带 band 序号，不同 band 的桶互不混用）"""
+    return [
+        band.to_bytes(1, "little") + signature[band * ROWS:(band + 1) * ROWS].tobytes()
+        for band in range(BANDS)
+    ]
+
+
+async def load_coop_tags(db) -> Dict[str, List[str]]:
+    """
+    各导师参与的合作记录标签（一次聚合）
+
+    Returns:
+        {导师ID: [归一化标签]}
+    """
+    pipeline = [
+        {"$match": {"members.id": {"$exists": True}, "tags.0": {"$exists": True}}},
+        {"$project": {"_id": 0, "members.id": 1, "tags": 1}},
+        {"$unwind": "$members"},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$members.id", "tags": {"$addToSet": "$tags"}}},
+    ]
+    coop_tags = {}
+    async for row in db.coops.aggregate(pipeline):
+        if row["_id"]:
+            coop_tags[row["_id"]] = _tag_values(row["tags"])
+    return coop_tags
+
+
+class TutorSimilarityIndex:
+    """
+    相似导师索引
+
+    _features 保存每位未删除导师的特征集合（用于精确 Jaccard 与判断导师是否存在），
+    _buckets 为 桶键 -> 导师ID集合；导师变更时按 _bands 中记录的旧桶键移除后重新签名
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.version = 0
+        self._features: Dict[str, FrozenSet[str]] = {}
+        self._bands: Dict[str, List[bytes]] = {}
+        self._buckets: Dict[bytes, Dict[str, None]] = {}
+        self._coop_tags: Dict[str, List[str]] = {}
+
+    @property
+    def size(self) -> int:
+        """已索引的导师数量"""
+        return len(self._features)
+
+    async def build(self, db) -> None:
+        """
+        全量构建索引（合作记录标签一次聚合读取，之后逐位导师签名）
+
+        Args:
+            db: 数据库实例
+        """
+        start = time.time()
+        try:
+            fresh = TutorSimilarityIndex()
+            fresh._coop_tags = await load_coop_tags(db)
+            async for doc in db.tutors.find(live_tutor_filter(), SIMILARITY_PROJECTION):
+                fresh.upsert(doc)
+            fresh.version = self.version + 1
+            self.__dict__.update(fresh.__dict__)
+            self.ready = True
+            logger.info(
+                f"相似导师索引构建完成: {self.size} 位导师, {len(self._buckets)} 个桶, "
+                f"耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.error(f"相似导师索引构建失败: {str(e)}")
+
+    async def run(self, interval: int) -> None:
+        """启动时构建索引，之后定时重建（同步 coops 中的合作记录标签）"""
+        while True:
+            await self.build(get_db())
+            await asyncio.sleep(interval)
+
+    def upsert(self, doc: Dict[str, Any]) -> None:
+        """新增或更新一位导师的签名；已软删除的导师只移除"""
+        tutor_id = doc.get("id")
+        if not tutor_id:
+            return
+        self.remove(tutor_id)
+        if doc.get("is_deleted"):
+            return
+
+        features = tutor_features(doc, self._coop_tags.get(tutor_id, ()))
+        self._features[tutor_id] = features
+        if not features:
+            return
+        keys = band_keys(minhash(features))
+        self._bands[tutor_id] = keys
+        for key in keys:
+            self._buckets.setdefault(key, {})[tutor_id] = None
+
+    def remove(self, tutor_id: str) -> None:
+        """移除一位导师"""
+        self._features.pop(tutor_id, None)
+        for key in self._bands.pop(tutor_id, []):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(tutor_id, None)
+                if not bucket:
+                    del self._buckets[key]
+
+    def apply_changes(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理"""
+        for tutor_id, doc in docs.items():
+            if doc is None:
+                self.remove(tutor_id)
+            else:
+                self.upsert(doc)
+        self.version += 1
+
+    def similar(self, tutor_id: str, limit: int = 10) -> Optional[List[Tuple[str, float, List[str]]]]:
+        """
+        与导师最相似的导师
+
+        候选按共同落入的桶数排序，取前 MAX_CANDIDATES 位计算精确 Jaccard 相似度
+
+        Args:
+            tutor_id: 导师ID
+            limit: 最多返回数量
+
+        Returns:
+            [(导师ID, Jaccard 相似度, 共同的标签)]（相似度降序）；导师不存在或已删除时返回 None
+        """
+        features = self._features.get(tutor_id)
+        if features is None:
+            return None
+
+        hits: Dict[str, int] = {}
+        for key in self._bands.get(tutor_id, []):
+            for other in islice(self._buckets.get(key, {}), MAX_BUCKET_SCAN):
+                if other != tutor_id:
+                    hits[other] = hits.get(other, 0) + 1
+        candidates = sorted(hits, key=lambda other: (-hits[other], other))[:MAX_CANDIDATES]
+
+        scored = []
+        for other in candidates:
+            other_features = self._features.get(other, frozenset())
+            common = features & other_features
+            if common:
+                scored.append((len(common) / len(features | other_features), other, common))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        return [
+            (other, round(score, 4), sorted({
+                f.split(":", 1)[1] for f in common if not f.startswith(DIRECTION_PREFIX)
+            }))
+            for score, other, common in scored[:limit]
+        ]
+
+
+# 全局相似导师索引实例
+tutor_similarity_index = TutorSimilarityIndex()
+on_tutor_change(tutor_similarity_index.apply_changes)
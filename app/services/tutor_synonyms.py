@@ -0,0 +1,120 @@
+"""
+研究方向同义词词典
+同义词组来自 tutor_synonyms 集合（每个文档 {"terms": [...]}），集合为空时使用内置词组；
+词典在构建倒排索引时编译进索引：每个同义词组维护一张导师倒排表，
+查询命中组内任一词时直接取该组的倒排表，不再生成多个 $regex 条件
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.utils.logger import app_logger as logger
+
+# 同义词组集合
+SYNONYM_COLLECTION = "tutor_synonyms"
+
+# 内置同义词组（tutor_synonyms 集合为空时使用）
+DEFAULT_SYNONYM_GROUPS: List[List[str]] = [
+    ["人工智能", "AI", "Artificial Intelligence", "机器学习", "Machine Learning"],
+    ["深度学习", "Deep Learning", "神经网络", "Neural Network"],
+    ["自然语言处理", "NLP", "Natural Language Processing"],
+    ["计算机视觉", "Computer Vision", "图像识别", "Image Recognition"],
+    ["数据挖掘", "Data Mining", "大数据", "Big Data"],
+    ["强化学习", "Reinforcement Learning"],
+    ["物联网", "IoT", "Internet of Things"],
+    ["区块链", "Blockchain"],
+]
+
+_LATIN_RE = re.compile(r"[a-z0-9]")
+
+
+def normalize_term(text: str) -> str:
+    """归一化同义词（与倒排索引的 normalize_text 一致：NFKC + 小写）"""
+    return unicodedata.normalize("NFKC", text).lower().strip()
+
+
+class SynonymDictionary:
+    """
+    同义词词典
+
+    包含公共词的词组合并为同一组；文本中的同义词用一个正则一次扫描找出，
+    拉丁词要求词边界完整（避免 "ai" 命中 "domain"）
+    """
+
+    def __init__(self, groups: Iterable[Iterable[str]] = ()):
+        self._group_of: Dict[str, int] = {}
+        self._terms: Dict[int, Set[str]] = {}
+        self._next_id = 0
+        for group in groups:
+            self._add_group(group)
+        self._pattern = self._compile()
+
+    def _add_group(self, terms: Iterable[str]) -> None:
+        """加入一个同义词组（与已有词组有公共词时合并）"""
+        normalized = {normalize_term(term) for term in terms if term}
+        normalized.discard("")
+        if len(normalized) < 2:
+            return
+        group_ids = {self._group_of[term] for term in normalized if term in self._group_of}
+        if group_ids:
+            group_id = min(group_ids)
+        else:
+            group_id, self._next_id = self._next_id, self._next_id + 1
+        merged = set(normalized)
+        for other in group_ids:
+            merged |= self._terms.pop(other)
+        self._terms[group_id] = merged
+        for term in merged:
+            self._group_of[term] = group_id
+
+    def _compile(self) -> Optional["re.Pattern"]:
+        """编译扫描文本用的正则（长词优先，零宽前瞻允许重叠命中）"""
+        if not self._group_of:
+            return None
+        alternatives = []
+        for term in sorted(self._group_of, key=len, reverse=True):
+            escaped = re.escape(term)
+            if _LATIN_RE.match(term[0]):
+                escaped = rf"(?<![a-z0-9]){escaped}"
+            if _LATIN_RE.match(term[-1]):
+                escaped = rf"{escaped}(?![a-z0-9])"
+            alternatives.append(escaped)
+        return re.compile(rf"(?=({'|'.join(alternatives)}))")
+
+    @property
+    def size(self) -> int:
+        """同义词组数量"""
+        return len(self._terms)
+
+    def group_of(self, text: str) -> Optional[int]:
+        """查询文本（整体）所属的同义词组"""
+        return self._group_of.get(normalize_term(text))
+
+    def groups_in(self, text: str) -> Set[int]:
+        """已归一化的文本中出现的全部同义词组"""
+        if self._pattern is None or not text:
+            return set()
+        return {self._group_of[match.group(1)] for match in self._pattern.finditer(text)}
+
+
+async def load_synonyms(db) -> SynonymDictionary:
+    """
+    读取同义词词典
+
+    Args:
+        db: 数据库实例
+
+    Returns:
+        同义词词典；集合为空或读取失败时使用内置词组
+    """
+    groups = []
+    try:
+        async for doc in db[SYNONYM_COLLECTION].find({}, {"_id": 0, "terms": 1}):
+            terms = doc.get("terms")
+            if isinstance(terms, list):
+                groups.append([t for t in terms if isinstance(t, str)])
+    except Exception as e:
+        logger.error(f"读取同义词词典失败，使用内置词组: {str(e)}")
+        groups = []
+    return SynonymDictionary(groups or DEFAULT_SYNONYM_GROUPS)
@@ -0,0 +1,165 @@
+"""
+导师数据版本
+维护导师集合级版本号（持久化在 tutor_meta 集合，每次管理接口写入递增）
+以及每位导师的 updated_at，供 HTTP 条件缓存在查询数据库之前判断内容是否变化；
+导入脚本、离线任务等其他写入方不经过管理接口，因此定时重新读取 tutor_meta 与修改时间，
+并把修改时间的指纹并入 ETag，发现变化时清空结果缓存、失效修改时间变化的导师详情缓存
+"""
+
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pymongo import ReturnDocument
+
+from app.crud.tutor_crud import live_tutor_filter
+from app.db.mongo import get_db
+from app.services.tutor_events import on_tutor_change
+from app.services.query_cache import query_cache
+from app.services.tutor_detail import tutor_detail_cache
+from app.utils.logger import app_logger as logger
+
+# 版本号持久化集合与文档ID
+META_COLLECTION = "tutor_meta"
+META_ID = "tutors"
+
+
+async def bump_tutor_meta(db) -> int:
+    """
+    递增持久化的导师数据版本（不经过管理接口写入 tutors 的脚本/任务写入后调用）
+
+    Args:
+        db: 数据库实例
+
+    Returns:
+        递增后的版本号
+    """
+    meta = await db[META_COLLECTION].find_one_and_update(
+        {"_id": META_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return meta["version"]
+
+
+class TutorVersions:
+    """导师数据版本（进程内单例）"""
+
+    def __init__(self):
+        self.ready = False
+        self.version = 0
+        self.fingerprint = ""
+        self.last_modified: Optional[datetime] = None
+        self._stamps: Dict[str, datetime] = {}
+
+    @property
+    def token(self) -> str:
+        """ETag 使用的数据版本：集合版本号 + 修改时间指纹（其他写入方只改了 updated_at 时也会变化）"""
+        return f"{self.version}-{self.fingerprint}"
+
+    @staticmethod
+    def _fingerprint(stamps: Dict[str, datetime]) -> str:
+        """修改时间指纹（导师数量、最新修改时间、修改时间之和）"""
+        if not stamps:
+            return "0"
+        raw = f"{len(stamps)}|{max(stamps.values()).isoformat()}|{sum(s.timestamp() for s in stamps.values())}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+    @staticmethod
+    def _doc_stamp(doc: Dict[str, Any]) -> Optional[datetime]:
+        """导师文档的修改时间（导入数据可能只有 created_at）"""
+        stamp = doc.get("updated_at") or doc.get("created_at")
+        return stamp if isinstance(stamp, datetime) else None
+
+    async def build(self) -> None:
+        """
+        加载持久化的版本号与全部未删除导师的修改时间
+
+        重新加载时版本号或指纹发生变化（其他进程/脚本写入过导师）则清空结果缓存；
+        修改时间变化或已删除的导师失效详情缓存，避免新修改时间的 ETag 搭配旧详情
+        """
+        start = time.time()
+        db = get_db()
+        try:
+            meta = await db[META_COLLECTION].find_one({"_id": META_ID})
+            stamps = {}
+            async for doc in db.tutors.find(
+                live_tutor_filter(), {"_id": 0, "id": 1, "updated_at": 1, "created_at": 1}
+            ):
+                stamp = self._doc_stamp(doc)
+                if doc.get("id") and stamp:
+                    stamps[doc["id"]] = stamp
+
+            version = max(self.version, meta.get("version", 0)) if meta else self.version
+            fingerprint = self._fingerprint(stamps)
+            changed = self.ready and (version != self.version or fingerprint != self.fingerprint)
+
+            candidates = [
+                self.last_modified,
+                meta.get("updated_at") if meta else None,
+                max(stamps.values()) if stamps else None
+            ]
+            last_modified = max((c for c in candidates if isinstance(c, datetime)), default=None)
+            if changed and last_modified == self.last_modified:
+                # 删除等不留下修改时间的变化
+                last_modified = datetime.now()
+
+            stale = {
+                tutor_id for tutor_id in self._stamps.keys() | stamps.keys()
+                if self._stamps.get(tutor_id) != stamps.get(tutor_id)
+            } if self.ready else set()
+
+            self.version, self.fingerprint = version, fingerprint
+            self.last_modified = last_modified
+            self._stamps = stamps
+            self.ready = True
+            for tutor_id in stale:
+                tutor_detail_cache.invalidate(tutor_id)
+            if changed:
+                query_cache.invalidate()
+                logger.info(
+                    f"检测到导师数据外部变更，已清空结果缓存: version={version}, "
+                    f"{len(stale)} 位导师的详情缓存已失效"
+                )
+            logger.info(
+                f"导师数据版本加载完成: version={self.version}, {len(stamps)} 位导师, "
+                f"耗时 {(time.time() - start) * 1000:.0f}ms"
+            )
+        except Exception as e:
+            logger.error(f"导师数据版本加载失败，条件缓存暂不可用: {str(e)}")
+
+    async def run(self, interval: int) -> None:
+        """启动时加载，之后定时重新加载（发现其他写入方的变更）"""
+        while True:
+            await self.build()
+            await asyncio.sleep(interval)
+
+    def tutor_stamp(self, tutor_id: str) -> Optional[datetime]:
+        """导师的修改时间；未加载、已删除或未知时返回 None"""
+        if not self.ready:
+            return None
+        return self._stamps.get(tutor_id)
+
+    async def handle_tutor_change(self, docs: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        """导师变更处理：更新单个导师的修改时间并递增集合版本号"""
+        for tutor_id, doc in docs.items():
+            stamp = self._doc_stamp(doc) if doc and not doc.get("is_deleted") else None
+            if stamp:
+                self._stamps[tutor_id] = stamp
+            else:
+                self._stamps.pop(tutor_id, None)
+
+        self.version += 1
+        self.last_modified = datetime.now()
+        try:
+            self.version = max(self.version, await bump_tutor_meta(get_db()))
+        except Exception as e:
+            logger.error(f"持久化导师数据版本失败: {str(e)}")
+
+
+# 全局版本实例
+tutor_versions = TutorVersions()
+on_tutor_change(tutor_versions.handle_tutor_change)
@@ -22,6 +22,25 @@ from .logger import (
     log_db_operation
 )
 
+from .cursor import (
+    encode_cursor,
+    decode_cursor,
+    build_cursor_filter,
+    cursor_sort,
+    next_cursor
+)
+
+from .fieldset import (
+    parse_fieldset,
+    fieldset_projection,
+    pick_fields
+)
+
+from .http_cache import (
+    make_etag,
+    conditional_response
+)
+
 from .security import (
     verify_password,
     get_password_hash,
@@ -57,6 +76,22 @@ __all__ = [
     'log_request',
     'log_db_operation',
     
+    # cursor
+    'encode_cursor',
+    'decode_cursor',
+    'build_cursor_filter',
+    'cursor_sort',
+    'next_cursor',
+    
+    # fieldset
+    'parse_fieldset',
+    'fieldset_projection',
+    'pick_fields',
+    
+    # http_cache
+    'make_etag',
+    'conditional_response',
+    
     # security
     'verify_password',
     'get_password_hash',
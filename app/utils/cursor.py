@@ -0,0 +1,140 @@
+"""
+游标分页工具
+将上一页最后一条记录的 (排序字段值, id) 编码为不透明游标，
+翻页时转换为范围条件，深分页与第一页代价相同
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _encode_value(value: Any) -> Any:
+    """序列化排序字段值（datetime 单独标记类型）"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """反序列化排序字段值"""
+    if isinstance(value, dict) and "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    return value
+
+
+def encode_cursor(sort_field: str, sort_direction: int, doc: Dict[str, Any]) -> str:
+    """
+    根据当前页最后一条记录生成游标
+
+    Args:
+        sort_field: 排序字段
+        sort_direction: 排序方向（1 升序 / -1 降序）
+        doc: 当前页最后一条记录
+
+    Returns:
+        URL 安全的游标字符串
+    """
+    payload = {
+        "f": sort_field,
+        "d": sort_direction,
+        "v": _encode_value(doc.get(sort_field)),
+        "id": doc["id"]
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_field: str, sort_direction: int) -> Tuple[Any, str]:
+    """
+    解析游标
+
+    Args:
+        cursor: 游标字符串
+        sort_field: 本次请求的排序字段
+        sort_direction: 本次请求的排序方向
+
+    Returns:
+        (最后一条记录的排序字段值, 最后一条记录的id)
+
+    Raises:
+        ValueError: 游标格式错误或与本次排序条件不一致
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        last_value = _decode_value(payload["v"])
+        last_id = payload["id"]
+        field, direction = payload["f"], payload["d"]
+    except Exception:
+        raise ValueError("游标格式错误")
+
+    if field != sort_field or direction != sort_direction:
+        raise ValueError("游标与当前排序条件不一致")
+    if not isinstance(last_id, str):
+        raise ValueError("游标格式错误")
+    return last_value, last_id
+
+
+def build_cursor_filter(
+    sort_field: str,
+    sort_direction: int,
+    last_value: Any,
+    last_id: str
+) -> Dict[str, Any]:
+    """
+    构建"位于游标之后"的查询条件
+
+    MongoDB 排序时 null/缺失值最小：降序时排在最后，升序时排在最前
+
+    Args:
+        sort_field: 排序字段
+        sort_direction: 排序方向（1 升序 / -1 降序）
+        last_value: 上一页最后一条记录的排序字段值
+        last_id: 上一页最后一条记录的id
+
+    Returns:
+        MongoDB 查询条件
+    """
+    if sort_direction < 0:
+        if last_value is None:
+            return {sort_field: None, "id": {"$lt": last_id}}
+        return {
+            "$or": [
+                {sort_field: {"$lt": last_value}},
+                {sort_field: last_value, "id": {"$lt": last_id}},
+                {sort_field: None}
+            ]
+        }
+
+    if last_value is None:
+        return {
+            "$or": [
+                {sort_field: {"$ne": None}},
+                {sort_field: None, "id": {"$gt": last_id}}
+            ]
+        }
+    return {
+        "$or": [
+            {sort_field: {"$gt": last_value}},
+            {sort_field: last_value, "id": {"$gt": last_id}}
+        ]
+    }
+
+
+def cursor_sort(sort_field: str, sort_direction: int) -> List[Tuple[str, int]]:
+    """游标分页的排序条件：以 id 作为同值记录的次级排序，保证顺序稳定"""
+    return [(sort_field, sort_direction), ("id", sort_direction)]
+
+
+def next_cursor(
+    docs: List[Dict[str, Any]],
+    page_size: int,
+    sort_field: str,
+    sort_direction: int
+) -> Optional[str]:
+    """当前页已取满时返回下一页游标，否则返回 None（没有更多数据）"""
+    if len(docs) < page_size or not docs:
+        return None
+    return encode_cursor(sort_field, sort_direction, docs[-1])
@@ -0,0 +1,80 @@
+"""
+稀疏字段集工具
+把 fields / exclude 查询参数解析为响应字段集合，并转换为 MongoDB 投影，
+未请求的字段（尤其是大数组）不会被读取、解码和序列化
+"""
+
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+def _split(value: Optional[str]) -> Set[str]:
+    """逗号分隔的字段列表"""
+    return {item.strip() for item in (value or "").split(",") if item.strip()}
+
+
+def parse_fieldset(
+    fields: Optional[str],
+    exclude: Optional[str],
+    available: Iterable[str],
+    required: Iterable[str] = ("id",)
+) -> Optional[Set[str]]:
+    """
+    解析稀疏字段集参数
+
+    Args:
+        fields: 需要返回的字段（逗号分隔）
+        exclude: 不需要返回的字段（逗号分隔），与 fields 同时传入时在 fields 基础上排除
+        available: 接口支持的响应字段
+        required: 始终返回的字段
+
+    Returns:
+        需要返回的响应字段集合；两个参数都未传入时返回 None（返回全部字段）
+
+    Raises:
+        ValueError: 包含接口不支持的字段
+    """
+    requested, excluded = _split(fields), _split(exclude)
+    if not requested and not excluded:
+        return None
+
+    available = set(available)
+    unknown = (requested | excluded) - available
+    if unknown:
+        raise ValueError(f"不支持的字段: {', '.join(sorted(unknown))}")
+
+    fieldset = (requested or available) - excluded
+    return fieldset | set(required)
+
+
+def fieldset_projection(
+    fieldset: Optional[Set[str]],
+    sources: Dict[str, Tuple[str, ...]],
+    extra: Iterable[str] = ()
+) -> Optional[Dict[str, int]]:
+    """
+    将响应字段集合转换为 MongoDB 投影
+
+    Args:
+        fieldset: parse_fieldset 的结果，None 表示不限制
+        sources: 响应字段 -> 文档中的来源字段
+        extra: 始终需要读取的文档字段（如排序/游标字段）
+
+    Returns:
+        投影字典；fieldset 为 None 时返回 None
+    """
+    if fieldset is None:
+        return None
+    projection = {"_id": 0}
+    for field in fieldset:
+        for source in sources.get(field, ()):
+            projection[source] = 1
+    for source in extra:
+        projection[source] = 1
+    return projection
+
+
+def pick_fields(data: Dict, fieldset: Optional[Set[str]]) -> Dict:
+    """按字段集合裁剪响应数据，fieldset 为 None 时原样返回"""
+    if fieldset is None:
+        return data
+    return {key: value for key, value in data.items() if key in fieldset}
@@ -0,0 +1,109 @@
+"""
+HTTP 条件缓存工具
+生成 ETag / Last-Modified / Cache-Control 响应头，
+客户端缓存仍然有效时直接返回 304，不再执行查询和序列化
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    由版本信息生成弱 ETag
+
+    Args:
+        *parts: 决定响应内容的版本信息（如数据版本号、更新时间、查询参数）
+
+    Returns:
+        形如 W/"3f2a..." 的 ETag
+    """
+    raw = "|".join(
+        part.isoformat() if isinstance(part, datetime) else str(part)
+        for part in parts
+    )
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]}"'
+
+
+def _http_date(value: datetime) -> str:
+    """datetime 转 HTTP 日期（无时区的时间按 UTC 处理，精确到秒）"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc).replace(microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 比较（弱比较，忽略 W/ 前缀）"""
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    """If-Modified-Since 比较"""
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str,
+    last_modified: Optional[datetime] = None,
+    vary: Optional[str] = None
+) -> Optional[Response]:
+    """
+    设置缓存响应头并处理条件请求
+
+    If-None-Match 优先；未携带时才比较 If-Modified-Since
+
+    Args:
+        request: 请求对象
+        response: 本次响应对象（用于写入响应头）
+        etag: 当前内容的 ETag
+        cache_control: Cache-Control 响应头
+        last_modified: 内容最后修改时间（可选）
+        vary: Vary 响应头（可选，响应内容随请求头变化时设置）
+
+    Returns:
+        客户端缓存有效时返回 304 响应，否则返回 None（调用方继续正常处理）
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = _http_date(last_modified)
+    if vary is not None:
+        headers["Vary"] = vary
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        not_modified = bool(
+            if_modified_since and last_modified is not None
+            and _not_modified_since(if_modified_since, last_modified)
+        )
+
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -7,6 +7,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from app.api.api import api_router
+from app.services.tutor_index import tutor_search_index
+from app.services.filter_options import filter_options_snapshot
+from app.services.suggestions import suggestion_engine
+from app.services.tutor_versions import tutor_versions
+from app.services.tutor_relevance import tutor_relevance_index
+from app.services.tutor_fuzzy import tutor_fuzzy_index
+from app.services.coop_graph import coop_graph
+from app.services.tutor_similarity import tutor_similarity_index
 from app.core import (
     app_settings, 
     security_settings, 
@@ -24,6 +32,7 @@ from app.utils import (
 )
 import time
 import uuid
+import asyncio
 import traceback
 
 # 设置全局日志
@@ -111,6 +120,45 @@ async def request_logging_middleware(request: Request, call_next):
     return response
 
 
+# 启动时在后台构建导师内存索引与快照（构建完成前查询自动回退到数据库）
+@app.on_event("startup")
+async def start_tutor_services():
+    """启动导师检索相关的后台任务"""
+    app.state.background_tasks = [
+        asyncio.create_task(
+            tutor_search_index.run(app_settings.TUTOR_INDEX_REBUILD_INTERVAL)
+        ),
+        asyncio.create_task(
+            tutor_relevance_index.run(app_settings.TUTOR_INDEX_REBUILD_INTERVAL)
+        ),
+        asyncio.create_task(
+            tutor_fuzzy_index.run(app_settings.TUTOR_INDEX_REBUILD_INTERVAL)
+        ),
+        asyncio.create_task(
+            tutor_versions.run(app_settings.TUTOR_VERSIONS_REFRESH_INTERVAL)
+        ),
+        asyncio.create_task(
+            filter_options_snapshot.run(app_settings.FILTER_OPTIONS_REFRESH_INTERVAL)
+        ),
+        asyncio.create_task(
+            suggestion_engine.run(app_settings.SUGGESTION_REBUILD_INTERVAL)
+        ),
+        asyncio.create_task(
+            coop_graph.run(app_settings.COOP_GRAPH_REBUILD_INTERVAL)
+        ),
+        asyncio.create_task(
+            tutor_similarity_index.run(app_settings.SIMILAR_TUTOR_REBUILD_INTERVAL)
+        ),
+    ]
+
+
+@app.on_event("shutdown")
+async def stop_tutor_services():
+    """停止后台任务"""
+    for task in getattr(app.state, "background_tasks", []):
+        task.cancel()
+
+
 # 挂载所有API路由（api_router 自身已含 prefix="/api"，此处不再重复加 API_PREFIX，否则会变成 /api/api/v1/...）
 app.include_router(api_router)
 
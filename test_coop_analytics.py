@@ -0,0 +1,80 @@
+"""
+导师合作图离线分析测试脚本
+在小型合作图上校验 PageRank、连通分量与标签传播社区划分（纯 NumPy 计算，不需要启动服务和数据库）
+
+运行: python -m pytest test_coop_analytics.py
+"""
+
+import numpy as np
+
+from app.services.coop_analytics import (
+    PAGERANK_MAX_ITER,
+    CoopEdges,
+    connected_components,
+    label_propagation,
+    pagerank,
+    rank_labels
+)
+
+
+def build_edges() -> CoopEdges:
+    """星形（二部）分量 a-b/c/d、单边分量 e-f，以及由 g-h 桥接的两个三角形"""
+    return CoopEdges.from_pair_weights({
+        ("a", "b"): {"paper": 1},
+        ("a", "c"): {"paper": 1},
+        ("a", "d"): {"project": 1},
+        ("e", "f"): {"paper": 2},
+        ("g", "h"): {"paper": 1},
+        ("g", "i"): {"paper": 3},
+        ("h", "i"): {"paper": 3},
+        ("h", "j"): {"paper": 1},
+        ("j", "k"): {"paper": 3},
+        ("j", "l"): {"paper": 3},
+        ("k", "l"): {"paper": 3},
+    })
+
+
+def test_pagerank_converges_on_bipartite_component():
+    """二部图分量也在迭代上限内收敛，分数和为 1，对称节点分数相同"""
+    edges = build_edges()
+    scores, iterations = pagerank(edges)
+    index = {tutor_id: i for i, tutor_id in enumerate(edges.ids)}
+    assert iterations < PAGERANK_MAX_ITER
+    assert abs(scores.sum() - 1) < 1e-9
+    assert scores[index["a"]] > scores[index["b"]]
+    assert abs(scores[index["b"]] - scores[index["c"]]) < 1e-9
+    assert abs(scores[index["e"]] - scores[index["f"]]) < 1e-9
+
+
+def test_pagerank_empty_graph():
+    """空图"""
+    scores, iterations = pagerank(CoopEdges.from_pair_weights({}))
+    assert len(scores) == 0 and iterations == 0
+
+
+def test_connected_components():
+    """连通分量按规模降序编号"""
+    edges = build_edges()
+    labels = dict(zip(edges.ids, rank_labels(connected_components(edges)).tolist()))
+    assert labels["g"] == labels["l"] == 0
+    assert labels["a"] == labels["b"] == labels["c"] == labels["d"] == 1
+    assert labels["e"] == labels["f"] == 2
+
+
+def test_label_propagation_splits_bridged_triangles():
+    """弱连接桥两侧的三角形划分为不同社区"""
+    edges = build_edges()
+    communities, iterations = label_propagation(edges)
+    labels = dict(zip(edges.ids, communities.tolist()))
+    assert labels["g"] == labels["h"] == labels["i"]
+    assert labels["j"] == labels["k"] == labels["l"]
+    assert labels["g"] != labels["j"]
+    assert np.array_equal(np.unique(rank_labels(communities)), np.arange(len(set(labels.values()))))
+
+
+if __name__ == "__main__":
+    test_pagerank_converges_on_bipartite_component()
+    test_pagerank_empty_graph()
+    test_connected_components()
+    test_label_propagation_splits_bridged_triangles()
+    print("导师合作图分析测试通过")
@@ -0,0 +1,57 @@
+"""
+导师倒排索引测试脚本
+校验索引匹配与原先不区分大小写的 $regex 子串匹配语义一致（不需要启动服务和数据库）
+
+运行: python -m pytest test_tutor_index.py（导入索引模块不会创建数据库连接，无需配置 MONGO_URI）
+"""
+
+from app.services.tutor_index import TutorSearchIndex
+
+
+def build_index() -> TutorSearchIndex:
+    """构建只含少量导师的索引"""
+    index = TutorSearchIndex()
+    index.upsert({"id": "t1", "name": "Zhang Wei", "direction": "Domain Adaptation, Chairs Design"})
+    index.upsert({"id": "t2", "name": "李四", "direction": "人工智能"})
+    index.upsert({"id": "t3", "name": "Wang Fang", "direction": "Hair Modeling"})
+    return index
+
+
+def test_latin_keyword_in_middle_of_word():
+    """拉丁关键词出现在词中间时也能命中（"ai" 命中 "domain"，"hair" 命中 "chairs"）"""
+    index = build_index()
+    assert index.match_field("research_direction", "ai") == {"t1", "t3"}
+    assert index.match_field("research_direction", "hair") == {"t1", "t3"}
+    assert index.match_field("research_direction", "MAIN ADA") == {"t1"}
+
+
+def test_latin_keyword_prefix_and_miss():
+    """前缀命中与无结果的情况"""
+    index = build_index()
+    assert index.match_field("research_direction", "adapt") == {"t1"}
+    assert index.match_field("research_direction", "xyz") == set()
+
+
+def test_latin_substring_after_update():
+    """长于三元组的词中子串命中；导师更新后旧词不再命中"""
+    index = build_index()
+    assert index.match_field("research_direction", "aptatio") == {"t1"}
+    index.upsert({"id": "t1", "name": "Zhang Wei", "direction": "Robotics"})
+    assert index.match_field("research_direction", "aptatio") == set()
+    assert index.match_field("research_direction", "botic") == {"t1"}
+    assert index.match_field("research_direction", "hair") == {"t3"}
+
+
+def test_cjk_keyword():
+    """中文关键词按子串匹配"""
+    index = build_index()
+    assert index.match_field("research_direction", "智能") == {"t2"}
+    assert index.match_field("research_direction", "工智") == {"t2"}
+
+
+if __name__ == "__main__":
+    test_latin_keyword_in_middle_of_word()
+    test_latin_keyword_prefix_and_miss()
+    test_latin_substring_after_update()
+    test_cjk_keyword()
+    print("导师倒排索引测试通过")